@@ -4,33 +4,80 @@ import argparse
 import os.path
 import os
 
-from rscript.file.scr import CompiledScript
-
 
 def main():
     parser = argparse.ArgumentParser(
         description="Make dump of given script"
     )
     parser.add_argument(metavar="FILE", dest="infile",
-                        help="Path to dump file")
+                        help="Path to dump file or directory of dump "
+                             "shards")
     parser.add_argument("-o", "--output", default="", dest="outfile",
                         help="Path to output file", nargs="?")
+    parser.add_argument("-f", "--format", default=None, dest="format",
+                        choices=("txt", "jsonl"),
+                        help="Dump format: BlockPar text (default) or "
+                             "JSON lines")
+    parser.add_argument("-c", "--cache", default="", dest="cache",
+                        help="Path to cache of encoded records; records "
+                             "unchanged in the dump are taken from it "
+                             "instead of parsing and encoding")
+    parser.add_argument("-j", "--jobs", default=None, type=int, dest="jobs",
+                        help="Number of worker processes reading shards; "
+                             "by default only many shards are read in "
+                             "parallel")
     args = parser.parse_args()
 
-    basepath, filename = os.path.split(args.infile)
+    if os.path.isdir(args.infile) and \
+            (args.cache != '' or args.format is not None):
+        # Shards keep their own cache next to them
+        parser.error("-c and -f can't be used with a directory of shards")
+
+    basepath, filename = os.path.split(os.path.normpath(args.infile))
     dumpname = os.path.splitext(filename)[0]
     outfile = dumpname + ".scr"
 
     if args.outfile != '':
         outfile = args.outfile
 
+    from rscript.file.scr import CompiledScript
+
     script = CompiledScript()
     script.basepath = basepath
-    with open(args.infile, 'rt', encoding='cp1251', newline='') as f:
-        script.restore(f)
+
+    cache = None
+    if args.cache != '':
+        from rscript.file.cache import RecordCache
+
+        cache = RecordCache()
+        cache.load(args.cache)
+
+    if os.path.isdir(args.infile):
+        # Shards read last time are kept next to them, only changed ones
+        # are read again
+        script.restore_shards(args.infile, jobs=args.jobs,
+                              cache=os.path.join(args.infile, "shards.cache"))
+    elif args.format == "jsonl":
+        with open(args.infile, 'rt', encoding='utf-8', newline='') as f:
+            if cache is None:
+                script.restore_jsonl(f)
+            else:
+                cache.restore_jsonl(script, f)
+    else:
+        with open(args.infile, 'rt', encoding='cp1251', newline='') as f:
+            if cache is None:
+                script.restore(f)
+            else:
+                cache.restore(script, f)
 
     with open(outfile, 'wb') as f:
-        script.save(f)
+        if cache is None:
+            script.save(f)
+        else:
+            cache.save(script, f)
+
+    if cache is not None:
+        cache.dump(args.cache)
 
 
 if __name__ == '__main__':
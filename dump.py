@@ -4,8 +4,6 @@ import argparse
 import os.path
 import os
 
-from rscript.file.scr import CompiledScript
-
 
 def main():
     parser = argparse.ArgumentParser(
@@ -15,29 +13,62 @@ def main():
                         help="Path to compiled script")
     parser.add_argument("-o", "--output", default="", dest="outfile",
                         help="Path to output file", nargs="?")
+    parser.add_argument("-f", "--format", default="txt", dest="format",
+                        choices=("txt", "jsonl", "shards"),
+                        help="Dump format: BlockPar text, JSON lines or "
+                             "a directory of BlockPar text shards")
+    parser.add_argument("-s", "--section", action="append", default=None,
+                        dest="sections", metavar="NAME",
+                        help="Dump only this section (GlobalVars, Stars, "
+                             "States, Dialogs, ...), may be repeated")
+    parser.add_argument("-r", "--records", default=None, dest="records",
+                        metavar="PATTERN",
+                        help="Dump only records with names matching "
+                             "the pattern (*, ? and [...] wildcards)")
     args = parser.parse_args()
 
     basepath = ''
     filename = os.path.split(args.infile)[1]
     scriptname = os.path.splitext(filename)[0]
-    outfile = scriptname + "_d.txt"
+    outfile = scriptname + "_d." + args.format
+    if args.format == "shards":
+        outfile = scriptname + "_d"
 
     if args.outfile != '':
         basepath, filename = os.path.split(args.outfile)
         outfile = args.outfile
 
+    if args.format == "shards" and \
+            (args.sections is not None or args.records is not None):
+        # Shards of the left out sections and records would be removed
+        parser.error("-s and -r can't be used with -f shards")
+
+    from rscript.file.scr import CompiledScript
+
+    if args.sections is not None:
+        unknown = set(args.sections).difference(CompiledScript.sections)
+        if unknown:
+            parser.error("unknown sections: " + ", ".join(sorted(unknown)) +
+                         "; choose from " + ", ".join(CompiledScript.sections))
+
     script = CompiledScript()
     script.basepath = basepath
     with open(args.infile, 'rb') as f:
-        script.load(f)
+        script.load(f, args.sections)
 
     if basepath != '' and not os.path.exists(basepath):
         os.mkdir(basepath)
     if script.basepath != '' and not os.path.exists(script.basepath):
         os.mkdir(script.basepath)
 
-    with open(outfile, 'wt', encoding='cp1251',  newline='') as f:
-        script.dump(f)
+    if args.format == "shards":
+        script.dump_shards(outfile)
+    elif args.format == "jsonl":
+        with open(outfile, 'wt', encoding='utf-8', newline='') as f:
+            script.dump_jsonl(f, args.sections, args.records)
+    else:
+        with open(outfile, 'wt', encoding='cp1251',  newline='') as f:
+            script.dump(f, args.sections, args.records)
 
 
 if __name__ == '__main__':
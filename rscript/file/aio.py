@@ -0,0 +1,76 @@
+__all__ = [
+    "aload", "aload_many",
+]
+
+import asyncio
+import io
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, Iterable, Optional, Tuple
+
+from rscript.file.scr import CompiledScript
+
+
+def _read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _decode(data: bytes) -> CompiledScript:
+    script = CompiledScript()
+    script.load(io.BytesIO(data))
+    return script
+
+
+async def aload(path: str, *,
+                executor: Optional[Executor] = None) -> CompiledScript:
+    """
+    Loads compiled script without blocking the event loop.
+
+    The file is read as a whole buffer and decoded in the executor
+    (default executor of the loop if none is given).
+    """
+    loop = asyncio.get_running_loop()
+    data = await loop.run_in_executor(executor, _read, path)
+    return await loop.run_in_executor(executor, _decode, data)
+
+
+async def aload_many(paths: Iterable[str], *, limit: int = 4,
+                     executor: Optional[Executor] = None
+                     ) -> AsyncIterator[Tuple[str, CompiledScript]]:
+    """
+    Loads compiled scripts and yields (path, script) pairs in input order.
+
+    No more than `limit` scripts are read or decoded at once, so at most
+    `limit` file buffers are held in memory besides the yielded scripts.
+    Reading of the next files overlaps with decoding of the current ones
+    and with the caller's work on yielded scripts.
+    When no executor is given, a thread pool of `limit` workers is used.
+    An error of a load is raised when its script is due, the remaining
+    loads are cancelled.
+    """
+    if limit < 1:
+        raise ValueError("aload_many. Limit must be positive")
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=limit)
+
+    async def load(path):
+        return path, await aload(path, executor=executor)
+
+    paths = iter(paths)
+    pending = deque(asyncio.ensure_future(load(path))
+                    for path in islice(paths, limit))
+    try:
+        while pending:
+            result = await pending.popleft()
+            for path in islice(paths, 1):
+                pending.append(asyncio.ensure_future(load(path)))
+            yield result
+    finally:
+        for task in pending:
+            task.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
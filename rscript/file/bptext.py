@@ -0,0 +1,238 @@
+__all__ = [
+    "BlockParWriter", "BlockParReader",
+]
+
+import io
+from typing import Iterator, Tuple, TextIO, Union
+
+from rangers.blockpar import BlockPar
+from rscript.file.utils import str_to_heredoc
+
+_INDENT = '\x20' * 4
+_EOL = '\x0d\x0a'
+
+
+class _Output:
+    __slots__ = "f", "depth", "sorted"
+
+    def __init__(self, f: TextIO, depth: int = 0):
+        self.f = f
+        self.depth = depth
+        # depth of an open sorted block -> its children as (name, writer),
+        # each child buffered by its own writer until the block is closed
+        self.sorted = {}
+
+
+class BlockParWriter:
+    """
+    Writes BlockPar text format straight to a file while elements are added.
+
+    Implements the building part of BlockPar interface (add, add_par,
+    add_block), so dump() methods of script records can use it instead of
+    a BlockPar tree. A block is closed as soon as an element is added to
+    one of its parents; close() finishes all blocks that are still open.
+    Children of a sorted block are buffered and written ordered by name
+    when the block is closed, as BlockPar keeps them. The produced text is
+    the same as BlockPar.save_txt gives for the tree built by the same
+    calls.
+    """
+    __slots__ = "_out", "_level"
+
+    def __init__(self, f: TextIO, *, _out: _Output = None, _level: int = 0):
+        self._out = _out if _out is not None else _Output(f, _level)
+        self._level = _level
+
+    def _enter(self):
+        out = self._out
+        level = self._level
+        if out.depth < level:
+            raise ValueError("BlockParWriter. Block is already closed")
+        while out.depth > level:
+            children = out.sorted.pop(out.depth, None)
+            if children is not None:
+                children.sort(key=lambda child: child[0])
+                for _, child in children:
+                    child.close()
+                    out.f.write(child._out.f.getvalue())
+            out.depth -= 1
+            out.f.write(_INDENT * out.depth + '}' + _EOL)
+
+    def _child(self, name):
+        """
+        Writer for a new child of a sorted block, or None when the block
+        of this writer is not sorted
+        """
+        children = self._out.sorted.get(self._level)
+        if children is None:
+            return None
+        child = BlockParWriter(io.StringIO(newline=''), _level=self._level)
+        children.append((name, child))
+        return child
+
+    def add_par(self, name: str, value: str):
+        self._enter()
+        child = self._child(name)
+        if child is not None:
+            child.add_par(name, value)
+            return
+        if '\x0a' in value or '\x0d' in value:
+            value = str_to_heredoc(value)
+        self._out.f.write(_INDENT * self._level + name + '=' + value + _EOL)
+
+    def add_block(self, name: str, sort: bool = True) -> 'BlockParWriter':
+        self._enter()
+        child = self._child(name)
+        if child is not None:
+            return child.add_block(name, sort)
+        out = self._out
+        mark = '^' if sort else '~'
+        out.f.write(_INDENT * self._level + name + ' ' + mark + '{' + _EOL)
+        out.depth += 1
+        if sort:
+            out.sorted[out.depth] = []
+        return BlockParWriter(None, _out=out, _level=self._level + 1)
+
+    def add(self, name: str, value: str):
+        self.add_par(name, value)
+
+    def close(self):
+        """
+        Closes all blocks opened through this writer and its children
+        """
+        self._enter()
+
+
+class BlockParReader:
+    """
+    Pull-based reader of BlockPar text format.
+
+    Iterating the reader yields top level elements as (name, value) pairs.
+    Value of a parameter is a string, value of a block is a Section which is
+    read from the file only while it is iterated. A section left unfinished
+    by the caller is skipped when the next element of its parent is
+    requested, so only the element being processed is kept in memory.
+    """
+    __slots__ = "_lines",
+
+    def __init__(self, f: TextIO):
+        self._lines = iter(f)
+
+    def __iter__(self) -> Iterator[Tuple[str, Union[str, 'Section']]]:
+        return self._elements(None)
+
+    def to_blockpar(self, root: BlockPar = None) -> BlockPar:
+        """
+        Reads the rest of the file into a BlockPar tree
+        """
+        return _to_blockpar(self, BlockPar(sort=False) if root is None
+                            else root)
+
+    def _elements(self, section):
+        for line in self._lines:
+            text = line.rstrip(_EOL).lstrip('\x20')
+            if not text:
+                continue
+            if text == '}':
+                if section is None:
+                    raise ValueError("BlockParReader. Unexpected end of block")
+                section.closed = True
+                return
+            if '=' not in text and text.endswith(('^{', '~{')):
+                child = Section(self, text[:-2].rstrip('\x20'), text[-2] == '^')
+                yield child.name, child
+                if not child.closed and child._reader is self:
+                    child.skip()
+                continue
+            name, value = text.split('=', 1)
+            if value == '<<<':
+                value = self._heredoc()
+            yield name, value
+        if section is not None:
+            raise ValueError("BlockParReader. Unexpected end of file")
+
+    def _heredoc(self):
+        text = ''.join(self._heredoc_lines())
+        return text[:-len(_EOL)] if text.endswith(_EOL) else text
+
+    def _heredoc_lines(self):
+        result = []
+        for line in self._lines:
+            if line.rstrip(_EOL) == '>>>' and \
+                    (not result or result[-1].endswith(_EOL)):
+                return result
+            result.append(line)
+        raise ValueError("BlockParReader. Unterminated heredoc")
+
+    def _text(self, section):
+        result = []
+        depth = 0
+        for line in self._lines:
+            text = line.rstrip(_EOL).lstrip('\x20')
+            if text == '}':
+                if not depth:
+                    section.closed = True
+                    return ''.join(result)
+                depth -= 1
+            elif '=' in text:
+                if text.partition('=')[2] == '<<<':
+                    result.append(line)
+                    result.extend(self._heredoc_lines())
+                    line = '>>>' + _EOL
+            elif text.endswith(('^{', '~{')):
+                depth += 1
+            result.append(line)
+        raise ValueError("BlockParReader. Unexpected end of file")
+
+
+class Section:
+    """
+    Block of BlockPar text that is being read by BlockParReader
+    """
+    __slots__ = "_reader", "name", "sorted", "closed"
+
+    def __init__(self, reader: BlockParReader, name: str, sort: bool):
+        self._reader = reader
+        self.name = name
+        self.sorted = sort
+        self.closed = False
+
+    def __iter__(self) -> Iterator[Tuple[str, Union[str, 'Section']]]:
+        if self.closed:
+            raise ValueError("BlockParReader. Section is already read")
+        return self._reader._elements(self)
+
+    def skip(self):
+        for _ in self:
+            pass
+
+    def text(self) -> str:
+        """
+        Reads the rest of the section without parsing it. The section can
+        still be iterated afterwards, elements are then parsed from the
+        returned text
+
+        :return: lines of the section as they are in the file
+        """
+        if self.closed:
+            raise ValueError("BlockParReader. Section is already read")
+        text = self._reader._text(self)
+        self._reader = BlockParReader(io.StringIO(text + '}' + _EOL,
+                                                  newline=''))
+        self.closed = False
+        return text
+
+    def to_blockpar(self, root: BlockPar = None) -> BlockPar:
+        """
+        Reads the rest of the section into a BlockPar tree
+        """
+        return _to_blockpar(self, BlockPar(sort=self.sorted) if root is None
+                            else root)
+
+
+def _to_blockpar(elements, root):
+    for name, value in elements:
+        if isinstance(value, Section):
+            _to_blockpar(value, root.add_block(name, value.sorted))
+        else:
+            root.add_par(name, value)
+    return root
@@ -0,0 +1,112 @@
+__all__ = [
+    "RecordCache",
+]
+
+import io
+import marshal
+import os
+from hashlib import blake2b
+from typing import BinaryIO, TextIO
+
+from rangers.io import Stream
+
+# Bumped whenever binary layout of records or key calculation changes
+_FORMAT = 2
+
+
+class RecordCache:
+    """
+    Cache of encoded records for incremental build of compiled scripts.
+
+    Record is looked up by a hash of its text in the dump, together with
+    its class, name and script version. On a hit the record is neither
+    parsed nor encoded, its stored bytes are written by save as is; on a
+    miss the record is restored, encoded and remembered. Records are not
+    added to the restored script: it is written by save of the cache.
+    Only records used by the latest restore are kept when the cache is
+    written to disk.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._used = {}
+        self._encoded = {}
+        self.hits = 0
+        self.misses = 0
+
+    def restore(self, script: 'CompiledScript', f: TextIO):
+        """
+        Restores the script from a BlockPar text dump for saving
+        """
+        from rscript.file.bptext import BlockParReader
+        self._restore(script, BlockParReader(f))
+
+    def restore_jsonl(self, script: 'CompiledScript', f: TextIO):
+        """
+        Restores the script from a JSON lines dump for saving
+        """
+        from rscript.file.jsonl import JsonLinesReader
+        self._restore(script, JsonLinesReader(f))
+
+    def _restore(self, script, reader):
+        self._encoded = {}
+        script._restore(reader, records=self.records(script))
+
+    def records(self, script: 'CompiledScript'):
+        """
+        :return: section reader for CompiledScript._restore, which encodes
+                 records instead of adding them to the script
+        """
+        def records(name, cls, content):
+            encoded = self._encoded.setdefault(name, [])
+            codec = None
+            for ename, block in content:
+                key = blake2b(
+                    f"{script.version}\0{cls.__name__}\0{ename}\0"
+                    f"{block.text()}".encode('utf-8', 'surrogatepass'),
+                    digest_size=16).digest()
+                data = self._used.get(key)
+                if data is None:
+                    data = self._entries.get(key)
+                if data is None:
+                    if codec is None:
+                        codec = cls.codec(script.version)
+                    e = cls(script, ename)
+                    codec.restore(e, block.to_blockpar())
+                    buf = io.BytesIO()
+                    codec.save(e, Stream.from_io(buf))
+                    data = buf.getvalue()
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                self._used[key] = data
+                encoded.append((ename, data))
+        return records
+
+    def save(self, script: 'CompiledScript', f: BinaryIO):
+        """
+        Saves the script restored by the latest restore, writing stored
+        bytes of its records
+        """
+        script._save(Stream.from_io(f), self._encoded)
+
+    def load(self, path: str):
+        """
+        Reads cache file; missing or incompatible file gives an empty cache
+        """
+        try:
+            with open(path, 'rb') as f:
+                fmt, entries = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if fmt == _FORMAT and isinstance(entries, dict):
+            self._entries = entries
+
+    def dump(self, path: str):
+        """
+        Writes records used by the latest restore to the cache file
+        """
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            marshal.dump((_FORMAT, self._used), f)
+        os.replace(tmp, path)
@@ -0,0 +1,119 @@
+__all__ = [
+    "GROUP_DTYPE", "GROUPLINK_DTYPE",
+    "groups_to_array", "groups_from_array",
+    "grouplinks_to_array", "grouplinks_from_array",
+]
+
+from operator import attrgetter
+
+import numpy as np
+
+from rscript.file.enums import o_, t_, w_, f_, rel_
+
+# Column layout mirrors the binary record: int32/uint32 fields stay 4 bytes
+# wide and strength/war weight are single precision, as in the .scr file.
+# Strings are kept as object columns so a table can be imported back.
+GROUP_DTYPE = np.dtype([
+    ("name", object), ("planet", object), ("state", "<i4"),
+    ("owner", "<u4"), ("type", "<u4"),
+    ("count_min", "<i4"), ("count_max", "<i4"),
+    ("speed_min", "<i4"), ("speed_max", "<i4"),
+    ("weapon", "<u4"), ("cargohook", "<i4"), ("emptyspace", "<i4"),
+    ("friendship", "<u4"), ("add_player", "?"),
+    ("rating_min", "<i4"), ("rating_max", "<i4"),
+    ("score_min", "<i4"), ("score_max", "<i4"),
+    ("status_trader_min", "<i4"), ("status_trader_max", "<i4"),
+    ("status_warrior_min", "<i4"), ("status_warrior_max", "<i4"),
+    ("status_pirate_min", "<i4"), ("status_pirate_max", "<i4"),
+    ("search_distance", "<i4"), ("dialog", object),
+    ("strength_min", "<f4"), ("strength_max", "<f4"),
+    ("ruins", object),
+])
+
+GROUPLINK_DTYPE = np.dtype([
+    ("name", object), ("begin", "<i4"), ("end", "<i4"),
+    ("relation_begin", "<u4"), ("relation_end", "<u4"),
+    ("war_weight_min", "<f4"), ("war_weight_max", "<f4"),
+])
+
+# Record attribute behind every group column; MinMax and Status columns map
+# to the inline slots of scr.Group.
+_group_attrs = tuple(
+    name if name in ("name", "planet", "state", "owner", "type", "weapon",
+                     "cargohook", "emptyspace", "friendship", "add_player",
+                     "search_distance", "dialog", "ruins")
+    else '_' + name
+    for name in GROUP_DTYPE.names
+)
+
+_group_enums = {"owner": o_, "type": t_, "weapon": w_, "friendship": f_}
+
+
+def groups_to_array(groups):
+    """
+    :type groups: list[scr.Group]
+    :rtype: np.ndarray
+    """
+    row = attrgetter(*_group_attrs)
+    return np.array([row(e) for e in groups], dtype=GROUP_DTYPE)
+
+
+def groups_from_array(script, table):
+    """
+    Builds Group records from a table laid out as GROUP_DTYPE.
+
+    :type script: scr.CompiledScript
+    :type table: np.ndarray
+    :rtype: list[scr.Group]
+    """
+    from rscript.file.scr import Group
+
+    columns = []
+    for name in GROUP_DTYPE.names:
+        values = table[name].tolist()
+        if name in _group_enums:
+            cls = _group_enums[name]
+            values = [cls(v) for v in values]
+        columns.append(values)
+
+    result = []
+    for row in zip(*columns):
+        e = Group(script, row[0])
+        for attr, value in zip(_group_attrs[1:], row[1:]):
+            setattr(e, attr, value)
+        result.append(e)
+    return result
+
+
+def grouplinks_to_array(grouplinks):
+    """
+    :type grouplinks: list[scr.GroupLink]
+    :rtype: np.ndarray
+    """
+    return np.array([(e.name, e.begin, e.end,
+                      e.relations[0], e.relations[1],
+                      e._war_weight_min, e._war_weight_max)
+                     for e in grouplinks], dtype=GROUPLINK_DTYPE)
+
+
+def grouplinks_from_array(script, table):
+    """
+    Builds GroupLink records from a table laid out as GROUPLINK_DTYPE.
+
+    :type script: scr.CompiledScript
+    :type table: np.ndarray
+    :rtype: list[scr.GroupLink]
+    """
+    from rscript.file.scr import GroupLink
+
+    result = []
+    for row in zip(*(table[name].tolist() for name in GROUPLINK_DTYPE.names)):
+        name, begin, end, rel_begin, rel_end, ww_min, ww_max = row
+        e = GroupLink(script, name)
+        e.begin = begin
+        e.end = end
+        e.relations = (rel_(rel_begin), rel_(rel_end))
+        e._war_weight_min = ww_min
+        e._war_weight_max = ww_max
+        result.append(e)
+    return result
@@ -5,6 +5,58 @@ __all__ = [
 
 from enum import IntFlag, IntEnum
 
+# Upper bound for cached string forms of flag combinations
+_FLAGS_CACHE_SIZE = 4096
+
+
+def _flags_str(cls, names):
+    """
+    Builds __str__ for a bitwise enum. Flags are listed in declaration
+    order; formatted combinations are cached per value. The member table
+    is built on first use.
+    """
+    members = None
+    cache = {}
+
+    def __str__(self):
+        nonlocal members
+        value = int(self)
+        result = cache.get(value)
+        if result is None:
+            if members is None:
+                members = tuple((int(f), names[f]) for f in cls)
+            result = ','.join(n for f, n in members if value & f == f)
+            if len(cache) < _FLAGS_CACHE_SIZE:
+                cache[value] = result
+        return result
+
+    return __str__
+
+
+def _flags_from_str(rnames):
+    """
+    Builds from_str for a bitwise enum. Unknown labels are ignored.
+    The label table is built on first use.
+    """
+    flags = None
+    cache = {}
+
+    def from_str(cls, s):
+        nonlocal flags
+        result = cache.get(s)
+        if result is None:
+            if flags is None:
+                flags = {l: int(f) for l, f in rnames.items()}
+            value = 0
+            for l in s.strip().split(','):
+                value |= flags.get(l, 0)
+            result = cls(value)
+            if len(cache) < _FLAGS_CACHE_SIZE:
+                cache[s] = result
+        return result
+
+    return from_str
+
 
 class Race(IntEnum):
     MALOC = 0
@@ -45,20 +97,8 @@ _map_r = {r_.USE: "Use", r_.MALOC: "Maloc", r_.PELENG: "Peleng",
           r_.PEOPLE: "People", r_.FEI: "Fei", r_.GAAL: "Gaal"}
 _rmap_r = {v: k for k, v in _map_r.items()}
 
-def _r_str(self):
-    flags = [_map_r[f] for f in self.__class__ if f in self]
-    return ','.join(flags)
-
-def _r_from_str(cls, s):
-    flags = s.strip().split(',')
-    result = cls(0)
-    for l, f in _rmap_r.items():
-        if l in flags:
-            result |= f
-    return result
-
-setattr(r_, "__str__", _r_str)
-setattr(r_, "from_str", classmethod(_r_from_str))
+setattr(r_, "__str__", _flags_str(r_, _map_r))
+setattr(r_, "from_str", classmethod(_flags_from_str(_rmap_r)))
 
 
 # Owner bitwise
@@ -84,20 +124,8 @@ _map_o = {o_.USE: "Use", o_.MALOC: "Maloc", o_.PELENG: "Peleng",
           o_.AS_PLAYER: "AsPlayer"}
 _rmap_o = {v: k for k, v in _map_o.items()}
 
-def _o_str(self):
-    flags = [_map_o[f] for f in self.__class__ if f in self]
-    return ','.join(flags)
-
-def _o_from_str(cls, s):
-    flags = s.strip().split(',')
-    result = cls(0)
-    for l, f in _rmap_o.items():
-        if l in flags:
-            result |= f
-    return result
-
-setattr(o_, "__str__", _o_str)
-setattr(o_, "from_str", classmethod(_o_from_str))
+setattr(o_, "__str__", _flags_str(o_, _map_o))
+setattr(o_, "from_str", classmethod(_flags_from_str(_rmap_o)))
 
 
 # Type bitwise
@@ -153,20 +181,8 @@ _map_t = {t_.USE: "Use", t_.RANGER: "Ranger", t_.WARRIOR: "Warrior",
           t_.TERRON_K7: "TerronK7", t_.TRANCLUCATOR: "Tranclucator"}
 _rmap_t = {v: k for k, v in _map_t.items()}
 
-def _t_str(self):
-    flags = [_map_t[f] for f in self.__class__ if f in self]
-    return ','.join(flags)
-
-def _t_from_str(cls, s):
-    flags = s.strip().split(',')
-    result = cls(0)
-    for l, f in _rmap_t.items():
-        if l in flags:
-            result |= f
-    return result
-
-setattr(t_, "__str__", _t_str)
-setattr(t_, "from_str", classmethod(_t_from_str))
+setattr(t_, "__str__", _flags_str(t_, _map_t))
+setattr(t_, "from_str", classmethod(_flags_from_str(_rmap_t)))
 
 
 # Economy bitwise
@@ -181,20 +197,8 @@ _map_e = {e_.USE: "Use", e_.AGRICULTURE: "Agriculture",
           e_.INDUSTRIAL: "Industrial", e_.MIXED: "Mixed"}
 _rmap_e = {v: k for k, v in _map_e.items()}
 
-def _e_str(self):
-    flags = [_map_e[f] for f in self.__class__ if f in self]
-    return ','.join(flags)
-
-def _e_from_str(cls, s):
-    flags = s.strip().split(',')
-    result = cls(0)
-    for l, f in _rmap_e.items():
-        if l in flags:
-            result |= f
-    return result
-
-setattr(e_, "__str__", _e_str)
-setattr(e_, "from_str", classmethod(_e_from_str))
+setattr(e_, "__str__", _flags_str(e_, _map_e))
+setattr(e_, "from_str", classmethod(_flags_from_str(_rmap_e)))
 
 
 # Government bitwise
@@ -212,20 +216,8 @@ _map_g = {g_.USE: "Use", g_.ANARCHY: "Anarchy",
           g_.REPUBLIC: "Republic", g_.DEMOCRACY: "Democracy"}
 _rmap_g = {v: k for k, v in _map_g.items()}
 
-def _g_str(self):
-    flags = [_map_g[f] for f in self.__class__ if f in self]
-    return ','.join(flags)
-
-def _g_from_str(cls, s):
-    flags = s.strip().split(',')
-    result = cls(0)
-    for l, f in _rmap_g.items():
-        if l in flags:
-            result |= f
-    return result
-
-setattr(g_, "__str__", _g_str)
-setattr(g_, "from_str", classmethod(_g_from_str))
+setattr(g_, "__str__", _flags_str(g_, _map_g))
+setattr(g_, "from_str", classmethod(_flags_from_str(_rmap_g)))
 
 
 # Weapon
@@ -0,0 +1,340 @@
+__all__ = [
+    "GroupGraph", "StarGraph",
+]
+
+from array import array
+from collections import OrderedDict, deque
+from heapq import heappop, heappush
+from typing import Dict, List, Optional, Tuple
+
+from rscript.file.enums import rel_
+
+
+def _csr(count, edges):
+    """
+    Packs (source, target, payload) edges into CSR arrays
+
+    :type count: int
+    :type edges: list[tuple[int, int, int]]
+    :rtype: tuple[array, array, array]
+    """
+    offsets = array('l', [0]) * (count + 1)
+    for source, _, _ in edges:
+        offsets[source + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+    targets = array('l', [0]) * len(edges)
+    payload = array('l', [0]) * len(edges)
+    fill = offsets[:-1]
+    for source, target, p in edges:
+        pos = fill[source]
+        targets[pos] = target
+        payload[pos] = p
+        fill[source] = pos + 1
+    return offsets, targets, payload
+
+
+class GroupGraph:
+    """
+    Index of group links of a compiled script.
+
+    Groups are graph vertices (indices in CompiledScript.groups) and every
+    GroupLink is an edge from its begin group to its end group. Relations
+    of a link are stored as (begin towards end, end towards begin).
+
+    Adjacency is kept in CSR arrays for both directions; relations are kept
+    in a sparse matrix keyed by (begin, end).
+    """
+    __slots__ = ("count", "_out_offsets", "_out_targets", "_out_links",
+                 "_in_offsets", "_in_targets", "_in_links",
+                 "_relations", "_grouplinks")
+
+    def __init__(self, script):
+        """
+        :type script: scr.CompiledScript
+        """
+        count = len(script.groups)
+        edges = []
+        for i, e in enumerate(script.grouplinks):
+            if not (0 <= e.begin < count and 0 <= e.end < count):
+                raise ValueError(f"GroupGraph. Link {e.name} refers to "
+                                 f"missing group")
+            edges.append((e.begin, e.end, i))
+
+        self.count: int = count
+        self._grouplinks = script.grouplinks
+        self._out_offsets, self._out_targets, self._out_links = \
+            _csr(count, edges)
+        self._in_offsets, self._in_targets, self._in_links = \
+            _csr(count, [(end, begin, i) for begin, end, i in edges])
+        self._relations: Dict[Tuple[int, int], Tuple[rel_, rel_]] = {
+            (e.begin, e.end): e.relations for e in script.grouplinks
+        }
+
+    def successors(self, group: int) -> List[int]:
+        """
+        Groups linked from the given one
+        """
+        begin, end = self._out_offsets[group], self._out_offsets[group + 1]
+        return self._out_targets[begin:end].tolist()
+
+    def predecessors(self, group: int) -> List[int]:
+        """
+        Groups linked to the given one
+        """
+        begin, end = self._in_offsets[group], self._in_offsets[group + 1]
+        return self._in_targets[begin:end].tolist()
+
+    def relation(self, begin: int, end: int) -> Optional[Tuple[rel_, rel_]]:
+        """
+        Relations of the link begin -> end, None if there is no such link.
+        For several links between the same groups the last one wins.
+        """
+        return self._relations.get((begin, end))
+
+    def towards(self, group: int, relation: rel_) -> List[int]:
+        """
+        Groups that get the given relation towards the group
+        """
+        result = []
+        links = self._grouplinks
+        offsets = self._in_offsets
+        for pos in range(offsets[group], offsets[group + 1]):
+            if links[self._in_links[pos]].relations[0] == relation:
+                result.append(self._in_targets[pos])
+        offsets = self._out_offsets
+        for pos in range(offsets[group], offsets[group + 1]):
+            if links[self._out_links[pos]].relations[1] == relation:
+                result.append(self._out_targets[pos])
+        return result
+
+    def hostile(self, group: int) -> List[int]:
+        """
+        Groups that become hostile (WAR) to the group
+        """
+        return self.towards(group, rel_.WAR)
+
+    def reachable(self, group: int) -> List[int]:
+        """
+        Groups reachable from the given one by links, in BFS order
+        """
+        offsets, targets = self._out_offsets, self._out_targets
+        seen = bytearray(self.count)
+        seen[group] = 1
+        order = []
+        queue = deque((group,))
+        while queue:
+            v = queue.popleft()
+            for pos in range(offsets[v], offsets[v + 1]):
+                w = targets[pos]
+                if not seen[w]:
+                    seen[w] = 1
+                    order.append(w)
+                    queue.append(w)
+        return order
+
+    def components(self) -> List[List[int]]:
+        """
+        Strongly connected components (iterative Tarjan's algorithm)
+        """
+        offsets, targets = self._out_offsets, self._out_targets
+        count = self.count
+        index = [-1] * count
+        low = [0] * count
+        on_stack = bytearray(count)
+        stack = []
+        result = []
+        counter = 0
+
+        for root in range(count):
+            if index[root] != -1:
+                continue
+            work = [(root, offsets[root])]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            while work:
+                v, pos = work[-1]
+                if pos < offsets[v + 1]:
+                    work[-1] = (v, pos + 1)
+                    w = targets[pos]
+                    if index[w] == -1:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = 1
+                        work.append((w, offsets[w]))
+                    elif on_stack[w] and index[w] < low[v]:
+                        low[v] = index[w]
+                    continue
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = 0
+                        component.append(w)
+                        if w == v:
+                            break
+                    result.append(component)
+        return result
+
+
+class StarGraph:
+    """
+    Index of star links of a compiled script.
+
+    Stars are graph vertices (indices in CompiledScript.stars). A StarLink
+    connects its owner star and end star in both directions. Adjacency is
+    kept in CSR arrays with min and max link distance as edge weights.
+
+    Routes of the recently queried source stars are cached, so repeated
+    queries with the same source only walk the cached predecessor table.
+    """
+    __slots__ = ("count", "_offsets", "_targets", "_weights", "_routes",
+                 "_cached", "_all_pairs")
+
+    # weight name -> index in _weights
+    _WEIGHTS = {"min": 0, "max": 1}
+
+    def __init__(self, script, *, holes: bool = True, cached: int = 64):
+        """
+        :type script: scr.CompiledScript
+        :param holes: include links marked as holes
+        :param cached: number of (source, weight) routes kept in cache
+        """
+        count = len(script.stars)
+        edges = []
+        dmin = []
+        dmax = []
+        for i, star in enumerate(script.stars):
+            for sl in star.starlinks:
+                if sl.is_hole and not holes:
+                    continue
+                if not 0 <= sl.end_star < count:
+                    raise ValueError(f"StarGraph. Link {sl.name} of star "
+                                     f"{star.name} refers to missing star")
+                edge = len(dmin)
+                dmin.append(sl.distance.min)
+                dmax.append(sl.distance.max)
+                edges.append((i, sl.end_star, edge))
+                edges.append((sl.end_star, i, edge))
+
+        self.count: int = count
+        self._offsets, self._targets, links = _csr(count, edges)
+        self._weights = (array('l', (dmin[e] for e in links)),
+                         array('l', (dmax[e] for e in links)))
+        self._routes = OrderedDict()
+        self._cached = cached
+        self._all_pairs = {}
+
+    def neighbors(self, star: int) -> List[int]:
+        """
+        Stars directly linked with the given one
+        """
+        begin, end = self._offsets[star], self._offsets[star + 1]
+        return self._targets[begin:end].tolist()
+
+    def _route(self, source, weight):
+        routes = self._routes
+        key = (source, weight)
+        route = routes.get(key)
+        if route is not None:
+            routes.move_to_end(key)
+            return route
+
+        route = self._search(source, weight)
+        if self._cached > 0:
+            routes[key] = route
+            if len(routes) > self._cached:
+                routes.popitem(last=False)
+        return route
+
+    def _search(self, source, weight):
+        """
+        :return: distances and predecessors of single-source shortest routes
+        :rtype: tuple[list[int], list[int]]
+        """
+        offsets, targets = self._offsets, self._targets
+        dist = [-1] * self.count
+        prev = [-1] * self.count
+        dist[source] = 0
+        if weight == "hops":
+            queue = deque((source,))
+            while queue:
+                v = queue.popleft()
+                d = dist[v] + 1
+                for pos in range(offsets[v], offsets[v + 1]):
+                    w = targets[pos]
+                    if dist[w] == -1:
+                        dist[w] = d
+                        prev[w] = v
+                        queue.append(w)
+        else:
+            weights = self._weights[self._WEIGHTS[weight]]
+            done = bytearray(self.count)
+            heap = [(0, source)]
+            while heap:
+                d, v = heappop(heap)
+                if done[v]:
+                    continue
+                done[v] = 1
+                for pos in range(offsets[v], offsets[v + 1]):
+                    w = targets[pos]
+                    nd = d + weights[pos]
+                    if not done[w] and (dist[w] == -1 or nd < dist[w]):
+                        dist[w] = nd
+                        prev[w] = v
+                        heappush(heap, (nd, w))
+
+        return dist, prev
+
+    def distances(self, source: int, weight: str = "min") -> List[int]:
+        """
+        Shortest distances from the star to every star, -1 if unreachable
+
+        :param weight: "min" or "max" link distance, or "hops"
+        """
+        return self._route(source, weight)[0]
+
+    def distance(self, source: int, target: int, weight: str = "min") -> int:
+        """
+        Shortest distance between two stars, -1 if unreachable
+        """
+        table = self._all_pairs.get(weight)
+        if table is not None:
+            return table[source][target]
+        return self._route(source, weight)[0][target]
+
+    def path(self, source: int, target: int,
+             weight: str = "min") -> Optional[List[int]]:
+        """
+        Stars of a shortest route including both ends, None if unreachable
+        """
+        dist, prev = self._route(source, weight)
+        if dist[target] == -1:
+            return None
+        result = [target]
+        while target != source:
+            target = prev[target]
+            result.append(target)
+        result.reverse()
+        return result
+
+    def all_pairs(self, weight: str = "min") -> List[List[int]]:
+        """
+        Shortest distances between all stars, computed once per weight.
+        Routes found on the way are not cached
+        """
+        table = self._all_pairs.get(weight)
+        if table is None:
+            table = self._all_pairs[weight] = [
+                self._search(source, weight)[0]
+                for source in range(self.count)
+            ]
+        return table
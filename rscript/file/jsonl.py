@@ -0,0 +1,194 @@
+__all__ = [
+    "JsonLinesWriter", "JsonLinesReader",
+]
+
+import json
+from collections import namedtuple
+from typing import TextIO
+
+# Dump in JSON lines format holds one JSON array per line:
+#   [name, value]                 top level parameter
+#   [section]                     start of a section, so empty ones are kept
+#   [section, name, elements]     record of a section
+# where elements is a list of [name, value] pairs and value is either
+# a string or a nested list of pairs (block).
+
+Element = namedtuple("Element", "name content")
+
+_encode = json.JSONEncoder(ensure_ascii=False, check_circular=False).encode
+
+
+class JsonLinesWriter:
+    """
+    Writes dump in JSON lines format.
+
+    Implements the building part of BlockPar interface like BlockParWriter
+    does, so the same dump code produces either format.
+    """
+    __slots__ = "_f", "_record"
+
+    def __init__(self, f: TextIO):
+        self._f = f
+        self._record = None
+
+    def _write(self, item):
+        self._f.write(_encode(item) + '\n')
+
+    def _flush(self):
+        if self._record is not None:
+            self._write(self._record)
+            self._record = None
+
+    def add_par(self, name: str, value: str):
+        self._flush()
+        self._write((name, value))
+
+    def add(self, name: str, value: str):
+        self.add_par(name, value)
+
+    def add_block(self, name: str, sort: bool = True) -> '_Section':
+        self._flush()
+        self._write((name,))
+        return _Section(self, name)
+
+    def close(self):
+        self._flush()
+
+
+class _Section:
+    __slots__ = "_writer", "_name"
+
+    def __init__(self, writer: JsonLinesWriter, name: str):
+        self._writer = writer
+        self._name = name
+
+    def add_par(self, name, value):
+        raise ValueError("JsonLinesWriter. Section may contain only blocks")
+
+    add = add_par
+
+    def add_block(self, name: str, sort: bool = True) -> '_Block':
+        self._writer._flush()
+        elements = []
+        self._writer._record = (self._name, name, elements)
+        return _Block(elements)
+
+
+class _Block:
+    __slots__ = "_elements",
+
+    def __init__(self, elements: list):
+        self._elements = elements
+
+    def add_par(self, name: str, value: str):
+        self._elements.append((name, value))
+
+    def add(self, name: str, value: str):
+        self.add_par(name, value)
+
+    def add_block(self, name: str, sort: bool = True) -> '_Block':
+        elements = []
+        self._elements.append((name, elements))
+        return _Block(elements)
+
+
+class JsonLinesReader:
+    """
+    Pull-based reader of dump in JSON lines format.
+
+    Yields the same (name, value) pairs as BlockParReader: consecutive
+    records of a section are grouped into a lazy iterator of
+    (name, JsonBlock) pairs.
+    """
+    __slots__ = "_lines", "_pending"
+
+    def __init__(self, f: TextIO):
+        self._lines = iter(f)
+        self._pending = None
+
+    def _next(self):
+        """
+        :return: (item, line) or None at the end of file
+        """
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            return pending
+        for line in self._lines:
+            if line.strip():
+                return json.loads(line), line
+        return None
+
+    def __iter__(self):
+        while True:
+            pending = self._next()
+            if pending is None:
+                return
+            item = pending[0]
+            if len(item) == 2:
+                yield item[0], item[1]
+                continue
+            if len(item) != 1:
+                self._pending = pending
+            records = self._records(item[0])
+            yield item[0], records
+            for _ in records:
+                pass
+
+    def _records(self, section):
+        while True:
+            pending = self._next()
+            if pending is None:
+                return
+            item, line = pending
+            if len(item) != 3 or item[0] != section:
+                self._pending = pending
+                return
+            yield item[1], JsonBlock(item[2], line)
+
+
+class JsonBlock:
+    """
+    Read-only view of a JSON lines record with BlockPar access methods
+    """
+    __slots__ = "_elements", "_pars", "_line"
+
+    def __init__(self, elements: list, line: str = None):
+        self._elements = elements
+        self._pars = None
+        self._line = line
+
+    def to_blockpar(self) -> 'JsonBlock':
+        return self
+
+    def text(self) -> str:
+        """
+        :return: line of the record as it is in the file
+        """
+        if self._line is None:
+            return _encode(self._elements)
+        return self._line
+
+    def __iter__(self):
+        for name, value in self._elements:
+            if isinstance(value, list):
+                value = JsonBlock(value)
+            yield Element(name, value)
+
+    def get_par(self, name: str) -> str:
+        pars = self._pars
+        if pars is None:
+            # the first element of a name wins, as in BlockPar
+            pars = self._pars = dict(reversed(self._elements))
+        value = pars.get(name)
+        if isinstance(value, str):
+            return value
+        for n, value in self._elements:
+            if n == name and isinstance(value, str):
+                return value
+        raise KeyError(name)
+
+    def get_block(self, name: str) -> 'JsonBlock':
+        for n, value in self._elements:
+            if n == name and isinstance(value, list):
+                return JsonBlock(value)
+        raise KeyError(name)
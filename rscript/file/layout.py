@@ -0,0 +1,204 @@
+__all__ = [
+    "layout",
+]
+
+from collections import deque
+
+import numpy as np
+
+from rscript.file.utils import Point, Rect
+
+# Maximum number of density grid cells along an axis. Cells of a sprawling
+# layout grow instead, so the grid never exceeds _GRID ** 2 cells
+_GRID = 512
+
+
+def _state_layers(states, edges):
+    """
+    Layer of every state: BFS depth from states without incoming links.
+    States left in cycles start new BFS runs in their list order.
+
+    :type states: list[int]
+    :type edges: list[tuple[int, int]]
+    :rtype: dict[int, int]
+    """
+    succ = {v: [] for v in states}
+    incoming = dict.fromkeys(states, 0)
+    for begin, end in edges:
+        succ[begin].append(end)
+        incoming[end] += 1
+
+    layer = {}
+    roots = [v for v in states if not incoming[v]]
+    for start in roots + states:
+        if start in layer:
+            continue
+        layer[start] = 0
+        queue = deque((start,))
+        while queue:
+            v = queue.popleft()
+            for w in succ[v]:
+                if w not in layer:
+                    layer[w] = layer[v] + 1
+                    queue.append(w)
+    return layer
+
+
+def _blur(grid, passes=3):
+    """
+    Box blur of a 2D array, repeated to approximate a gaussian
+    """
+    for _ in range(passes):
+        p = np.pad(grid, 1, mode='edge')
+        grid = (p[:-2, 1:-1] + p[2:, 1:-1] + p[1:-1, :-2] + p[1:-1, 2:] +
+                p[1:-1, 1:-1]) / 5
+    return grid
+
+
+def _initial(n, states, state_edges, edges, spacing, rng):
+    pos = np.zeros((n, 2))
+    placed = np.zeros(n, dtype=bool)
+
+    layers = _state_layers(states, state_edges)
+    rows = {}
+    for v in states:
+        layer = layers[v]
+        row = rows.get(layer, 0)
+        rows[layer] = row + 1
+        pos[v] = (layer * spacing, row * spacing)
+    placed[states] = True
+
+    neighbours = [[] for _ in range(n)]
+    for begin, end in edges:
+        neighbours[begin].append(end)
+        neighbours[end].append(begin)
+
+    def spread(queue):
+        # unplaced points start next to an already placed neighbour
+        while queue:
+            v = queue.popleft()
+            for w in neighbours[v]:
+                if not placed[w]:
+                    pos[w] = pos[v] + rng.normal(0, spacing / 2, 2)
+                    placed[w] = True
+                    queue.append(w)
+
+    spread(deque(states))
+
+    # components without states are seeded on a grid below the states
+    rest = np.flatnonzero(~placed)
+    if len(rest):
+        top = pos[placed, 1].max() + 2 * spacing if placed.any() else 0
+        width = int(np.ceil(np.sqrt(len(rest))))
+        slot = 0
+        for v in rest:
+            if placed[v]:
+                continue
+            pos[v] = ((slot % width) * 2 * spacing,
+                      top + (slot // width) * 2 * spacing)
+            placed[v] = True
+            slot += 1
+            spread(deque((v,)))
+    return pos
+
+
+def layout(script, *, iterations=60, spacing=80, rect=Rect(80, 0, 800, 1000),
+           seed=0):
+    """
+    Computes positions of all graph points of a source script at once.
+
+    States are placed in layers along StateLink chains (a layer is a
+    column), other points start next to their linked neighbours. Then
+    a force-directed refinement runs: links attract their ends and
+    density of points repels them. Repulsion is taken from a blurred
+    grid histogram of positions, so an iteration is O(n) and the whole
+    step is vectorized. The grid has cells of `spacing` size unless the
+    layout is too wide for _GRID cells along an axis, then the cells are
+    coarser. States keep their layer column.
+
+    :type script: svr.SourceScript
+    :param spacing: desired distance between linked points
+    :param rect: the top left corner of the result is put into its corner
+    :param seed: seed of the random jitter, the result is deterministic
+    """
+    from rscript.file.svr import State, StateLink
+
+    points = script.graphpoints
+    n = len(points)
+    if not n:
+        return
+    index = {id(gp): i for i, gp in enumerate(points)}
+    edges = []
+    state_edges = []
+    for gl in script.graphlinks:
+        begin, end = index.get(id(gl.begin)), index.get(id(gl.end))
+        if begin is None or end is None or begin == end:
+            continue
+        edges.append((begin, end))
+        if isinstance(gl, StateLink) and \
+                isinstance(gl.begin, State) and isinstance(gl.end, State):
+            state_edges.append((begin, end))
+    states = [i for i, gp in enumerate(points) if isinstance(gp, State)]
+
+    rng = np.random.default_rng(seed)
+    pos = _initial(n, states, state_edges, edges, spacing, rng)
+    pos += rng.uniform(-1, 1, pos.shape)
+
+    is_state = np.zeros(n, dtype=bool)
+    is_state[states] = True
+    state_x = pos[is_state, 0].copy()
+
+    if edges:
+        src, dst = np.array(edges, dtype=np.intp).T
+    else:
+        src = dst = np.empty(0, dtype=np.intp)
+
+    k = float(spacing)
+    temperature = k
+    cooling = temperature / max(iterations, 1)
+    for _ in range(iterations):
+        disp = np.zeros_like(pos)
+
+        # attraction along links, Fruchterman-Reingold d^2/k
+        if len(src):
+            delta = pos[dst] - pos[src]
+            dist = np.hypot(delta[:, 0], delta[:, 1])[:, None]
+            force = delta * (dist / k)
+            for axis in (0, 1):
+                disp[:, axis] += np.bincount(src, force[:, axis], n)
+                disp[:, axis] -= np.bincount(dst, force[:, axis], n)
+
+        # repulsion down the gradient of blurred point density
+        low = pos.min(axis=0)
+        extent = pos.max(axis=0) - low
+        # one cell of the 5 cell margin is left for rounding of the ratio
+        cell = max(k, extent.max() / (_GRID - 6))
+        low -= 2 * cell
+        shape = np.ceil((extent + 4 * cell) / cell)
+        shape = shape.astype(np.intp) + 1
+        cells = (pos - low) / cell
+        ij = cells.astype(np.intp)
+        density = np.zeros(shape)
+        np.add.at(density, (ij[:, 0], ij[:, 1]), 1.0)
+        density = _blur(density)
+        gx, gy = np.gradient(density)
+        # bilinear interpolation of the gradient at every point
+        fx, fy = (cells - ij).T
+        i0, j0 = ij[:, 0], ij[:, 1]
+        i1 = np.minimum(i0 + 1, shape[0] - 1)
+        j1 = np.minimum(j0 + 1, shape[1] - 1)
+        for g, axis in ((gx, 0), (gy, 1)):
+            value = (g[i0, j0] * (1 - fx) * (1 - fy) + g[i1, j0] * fx * (1 - fy)
+                     + g[i0, j1] * (1 - fx) * fy + g[i1, j1] * fx * fy)
+            disp[:, axis] -= value * k * k
+
+        # limit the step by the temperature
+        length = np.hypot(disp[:, 0], disp[:, 1])[:, None]
+        pos += disp / np.maximum(length, 1e-9) * np.minimum(length, temperature)
+        pos[is_state, 0] = state_x
+        temperature -= cooling
+
+    pos -= pos.min(axis=0)
+    pos += (rect.left, rect.top)
+    for gp, (x, y) in zip(points, np.rint(pos).astype(np.int64).tolist()):
+        gp.pos = Point(x, y)
@@ -0,0 +1,506 @@
+__all__ = [
+    "Field", "INT", "UINT", "BOOL", "SINGLE", "DOUBLE", "STR", "STRIPPED",
+    "STRLIST", "ARRAY", "Enum", "EnumPair", "Pair", "STATUS", "Ref",
+    "Records", "Variant", "Codec", "generate",
+]
+
+import re
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from typing import Dict, Optional, Sequence
+
+from rscript.file.utils import MinMax, Status, str_to_bool
+
+# Функции типа элемента для одной версии скрипта. skip(s) читает элемент
+# из потока, ничего не сохраняя
+Codec = namedtuple("Codec", "load save dump restore skip")
+
+
+class _Kind(ABC):
+    """
+    Тип поля: строки кода, которые читают, записывают, сохраняют в дамп,
+    восстанавливают и пропускают поле этого типа. Код генерируется для
+    атрибута a и параметра дампа k и может ссылаться на имена из env()
+
+    :cvar size: размер поля в байтах, если он постоянный; тогда поле
+                пропускается одним seek
+    """
+    size: Optional[int] = None
+
+    def env(self, version, classes) -> dict:
+        return {}
+
+    @abstractmethod
+    def load(self, a):
+        pass
+
+    @abstractmethod
+    def save(self, a):
+        pass
+
+    def dump(self, a, k):
+        return [f'bp.add_par("{k}", str(self.{a}))']
+
+    @abstractmethod
+    def restore(self, a, k):
+        pass
+
+    def skip(self, a):
+        # Типы переменного размера читают поле сами
+        return [f"s.seek(s.pos() + {self.size})"]
+
+
+class _Scalar(_Kind):
+    def __init__(self, get, add, parse, size=None):
+        self._get = get
+        self._add = add
+        self._parse = parse
+        self.size = size
+
+    def load(self, a):
+        return [f"self.{a} = s.{self._get}()"]
+
+    def save(self, a):
+        return [f"s.{self._add}(self.{a})"]
+
+    def restore(self, a, k):
+        return [f'self.{a} = {self._parse}(source.get_par("{k}"))']
+
+    def skip(self, a):
+        if self.size is None:
+            return [f"s.{self._get}()"]
+        return super().skip(a)
+
+
+INT = _Scalar("get_int", "add_int", "int", 4)
+BOOL = _Scalar("get_bool", "add_bool", "str_to_bool", 1)
+SINGLE = _Scalar("get_single", "add_single", "float", 4)
+DOUBLE = _Scalar("get_double", "add_double", "float", 8)
+STR = _Scalar("get_widestr", "add_widestr", "")
+
+
+class _UInt(_Scalar):
+    def save(self, a):
+        return [f"s.add_uint(int(self.{a}))"]
+
+
+UINT = _UInt("get_uint", "add_uint", "int", 4)
+
+
+class _Stripped(_Scalar):
+    def load(self, a):
+        return [f"self.{a} = s.{self._get}().strip()"]
+
+
+# Строка, у которой при чтении отбрасываются пробелы по краям
+STRIPPED = _Stripped("get_widestr", "add_widestr", "")
+
+
+class _StrList(_Kind):
+    """
+    Список строк: количество (uint) и сами строки; в дампе - блок
+    параметров с именами-индексами
+    """
+
+    def load(self, a):
+        return [f"for i in range(s.get_uint()):",
+                f"    self.{a}.append(s.get_widestr())"]
+
+    def save(self, a):
+        return [f"s.add_uint(len(self.{a}))",
+                f"for value in self.{a}:",
+                f"    s.add_widestr(value)"]
+
+    def dump(self, a, k):
+        return [f'nbp = bp.add_block("{k}", False)',
+                f"for i, value in enumerate(self.{a}):",
+                f"    nbp.add_par(str(i), str(value))"]
+
+    def restore(self, a, k):
+        return [f'for par in source.get_block("{k}"):',
+                f"    self.{a}.append(par.content)"]
+
+    def skip(self, a):
+        return [f"for i in range(s.get_uint()):",
+                f"    s.get_widestr()"]
+
+
+STRLIST = _StrList()
+
+
+class _Array(_Kind):
+    """
+    Размер переменной-массива, за которым идут её пустые элементы
+    """
+
+    def load(self, a):
+        return [f"self.{a} = s.get_int()",
+                f"for i in range(self.{a}):",
+                f"    s.get_widestr()",
+                f"    s.get_byte()"]
+
+    def save(self, a):
+        return [f"s.add_int(self.{a})",
+                f"for i in range(self.{a}):",
+                f"    s.add_widestr('')",
+                f"    s.add_byte(0)"]
+
+    def restore(self, a, k):
+        return INT.restore(a, k)
+
+    def skip(self, a):
+        return [f"for i in range(s.get_int()):",
+                f"    s.get_widestr()",
+                f"    s.get_byte()"]
+
+
+ARRAY = _Array()
+
+
+class Enum(_Kind):
+    """
+    Перечисление, записанное как uint, или как байт при byte=True
+    """
+
+    def __init__(self, cls, byte: bool = False):
+        self._cls = cls
+        self._name = cls.__name__
+        self._byte = byte
+        self.size = 1 if byte else 4
+
+    def env(self, version, classes):
+        return {self._name: self._cls}
+
+    def load(self, a):
+        get = "get_byte" if self._byte else "get_uint"
+        return [f"self.{a} = {self._name}(s.{get}())"]
+
+    def save(self, a):
+        add = "add_byte" if self._byte else "add_uint"
+        return [f"s.{add}(int(self.{a}))"]
+
+    def restore(self, a, k):
+        return [f'self.{a} = {self._name}.from_str(source.get_par("{k}"))']
+
+
+class EnumPair(Enum):
+    """
+    Пара значений перечисления, в дампе - (первое, второе)
+    """
+
+    def __init__(self, cls):
+        super().__init__(cls)
+        self.size = 8
+
+    def load(self, a):
+        return [f"self.{a} = ({self._name}(s.get_uint()), "
+                f"{self._name}(s.get_uint()))"]
+
+    def save(self, a):
+        return [f"s.add_int(int(self.{a}[0]))",
+                f"s.add_int(int(self.{a}[1]))"]
+
+    def dump(self, a, k):
+        return [f'bp.add_par("{k}", f"({{self.{a}[0]}}, {{self.{a}[1]}})")']
+
+    def restore(self, a, k):
+        return [f'first, second = source.get_par("{k}").strip("()")'
+                f'.split(",")',
+                f"self.{a} = ({self._name}.from_str(first.strip()), "
+                f"{self._name}.from_str(second.strip()))"]
+
+
+class Pair(_Kind):
+    """
+    MinMax, хранящийся в слотах _<имя>_min и _<имя>_max
+    """
+
+    def __init__(self, get, add, parse):
+        self._get = get
+        self._add = add
+        self._parse = parse
+        self.size = 8
+
+    def load(self, a):
+        return [f"self._{a}_min, self._{a}_max = s.{self._get}(), "
+                f"s.{self._get}()"]
+
+    def save(self, a):
+        return [f"s.{self._add}(self._{a}_min)",
+                f"s.{self._add}(self._{a}_max)"]
+
+    def dump(self, a, k):
+        return [f'bp.add_par("{k}", f"{{self._{a}_min}}..{{self._{a}_max}}")']
+
+    def restore(self, a, k):
+        return self.parse(a, f'source.get_par("{k}")')
+
+    def parse(self, a, value):
+        return [f"lo, hi = {value}.split('..', 1)",
+                f"self._{a}_min, self._{a}_max = "
+                f"{self._parse}(lo), {self._parse}(hi)"]
+
+
+Pair.INT = Pair("get_int", "add_int", "int")
+Pair.SINGLE = Pair("get_single", "add_single", "float")
+
+
+class _Status(_Kind):
+    """
+    Status, хранящийся в слотах _<имя>_<часть>_min/_max; в дампе - блок
+    """
+    _parts = (("trader", "Trader"), ("warrior", "Warrior"),
+              ("pirate", "Pirate"))
+    size = 24
+
+    def load(self, a):
+        return [line for p, _ in self._parts
+                for line in Pair.INT.load(f"{a}_{p}")]
+
+    def save(self, a):
+        return [line for p, _ in self._parts
+                for line in Pair.INT.save(f"{a}_{p}")]
+
+    def dump(self, a, k):
+        return [f'st = bp.add_block("{k}", False)'] + \
+               [f'st.add_par("{key}", '
+                f'f"{{self._{a}_{p}_min}}..{{self._{a}_{p}_max}}")'
+                for p, key in self._parts]
+
+    def restore(self, a, k):
+        return [f'status = source.get_block("{k}")'] + \
+               [line for p, key in self._parts
+                for line in Pair.INT.parse(f"{a}_{p}",
+                                           f'status.get_par("{key}")')]
+
+
+STATUS = _Status()
+
+
+class Ref(_Kind):
+    """
+    Индекс элемента раздела скрипта, в дампе - имя(индекс)
+    """
+    size = 4
+
+    def __init__(self, section):
+        self._section = section
+
+    def load(self, a):
+        return INT.load(a)
+
+    def save(self, a):
+        return INT.save(a)
+
+    def dump(self, a, k):
+        return [f'bp.add_par("{k}", '
+                f'str(self._script.{self._section}[self.{a}].name) + '
+                f"'(' + str(self.{a}) + ')')"]
+
+    def restore(self, a, k):
+        return [f'value = source.get_par("{k}")',
+                f"self.{a} = int(value[value.find('(') + 1:value.find(')')])"]
+
+
+class Records(_Kind):
+    """
+    Список вложенных элементов: количество (uint), затем элементы, перед
+    каждым - его имя, если элементы именованные. Безымянные элементы
+    получают имя-индекс. В дампе - блок
+    """
+
+    def __init__(self, cls_name: str, named: bool = False):
+        self._cls = cls_name
+        self._named = named
+
+    def env(self, version, classes):
+        cls = classes[self._cls]
+        codec = cls.codec(version)
+        env = {f"_{self._cls}": cls}
+        env.update((f"_{self._cls}_{n}", f)
+                   for n, f in zip(Codec._fields, codec))
+        return env
+
+    def load(self, a):
+        name = "s.get_widestr()" if self._named else "str(i)"
+        return [f"items = self.{a}",
+                f"for i in range(s.get_uint()):",
+                f"    e = _{self._cls}(self._script, {name})",
+                f"    _{self._cls}_load(e, s)",
+                f"    items.append(e)"]
+
+    def save(self, a):
+        return [f"items = self.{a}",
+                f"s.add_uint(len(items))",
+                f"for e in items:"] + \
+               ([f"    s.add_widestr(e.name)"] if self._named else []) + \
+               [f"    _{self._cls}_save(e, s)"]
+
+    def dump(self, a, k):
+        return [f'nbp = bp.add_block("{k}", False)',
+                f"for e in self.{a}:",
+                f"    _{self._cls}_dump(e, nbp)"]
+
+    def restore(self, a, k):
+        return [f"items = self.{a}",
+                f'for name, block in source.get_block("{k}"):',
+                f"    e = _{self._cls}(self._script, name)",
+                f"    _{self._cls}_restore(e, block)",
+                f"    items.append(e)"]
+
+    def skip(self, a):
+        return [f"for i in range(s.get_uint()):"] + \
+               ([f"    s.get_widestr()"] if self._named else []) + \
+               [f"    _{self._cls}_skip(s)"]
+
+
+class Variant(_Kind):
+    """
+    Значение, тип которого задан полем-перечислением элемента. У типов,
+    которых нет в kinds, значение в двоичном виде отсутствует
+    """
+
+    def __init__(self, selector: str, cls, kinds: Dict):
+        self._selector = selector
+        self._cls = cls
+        self._kinds = kinds
+
+    @property
+    def selector(self):
+        return self._selector
+
+    def env(self, version, classes):
+        env = {self._cls.__name__: self._cls}
+        for kind in self._kinds.values():
+            env.update(kind.env(version, classes))
+        return env
+
+    def _cases(self, code):
+        lines = []
+        for i, (value, kind) in enumerate(self._kinds.items()):
+            lines.append(f"{'elif' if i else 'if'} self.{self._selector} "
+                         f"is {self._cls.__name__}.{value.name}:")
+            lines += _indent(code(kind))
+        return lines
+
+    def load(self, a):
+        return self._cases(lambda kind: kind.load(a))
+
+    def save(self, a):
+        return self._cases(lambda kind: kind.save(a))
+
+    def restore(self, a, k):
+        return self._cases(lambda kind: kind.restore(a, k))
+
+    def skip(self, a):
+        return self._cases(lambda kind: kind.skip(a))
+
+
+class Field:
+    """
+    Поле схемы элемента
+
+    :param attr: атрибут элемента
+    :param kind: тип поля (INT, Enum(o_), Pair.INT, ...)
+    :param key: имя параметра в дампе
+    :param until: первая версия скрипта, в которой поля нет
+    :param when: условие на предыдущие поля - выражение от self; поле
+                 присутствует, только если оно выполняется
+    """
+    __slots__ = "attr", "kind", "key", "until", "when"
+
+    def __init__(self, attr: str, kind: _Kind, key: str,
+                 until: Optional[int] = None, when: Optional[str] = None):
+        self.attr = attr
+        self.kind = kind
+        self.key = key
+        self.until = until
+        self.when = when
+
+
+def _indent(lines):
+    return [f"    {line}" for line in lines] or ["    pass"]
+
+
+def _function(name, body):
+    return '\n'.join([f"def {name}:"] + _indent(body))
+
+
+def _guarded(field, lines):
+    if field.when is None:
+        return lines
+    return [f"if {field.when}:"] + _indent(lines)
+
+
+def _skip(fields):
+    """
+    Тело skip(s). Поля, от которых зависят другие, читаются во
+    временный объект вместо self, подряд идущие поля постоянного размера
+    пропускаются одним seek
+    """
+    selectors = set()
+    for f in fields:
+        if f.when is not None:
+            selectors.update(re.findall(r"\bself\.(\w+)", f.when))
+        if isinstance(f.kind, Variant):
+            selectors.add(f.kind.selector)
+
+    lines = ["self = _Scratch()"] if selectors else []
+    pending = 0
+    for f in fields:
+        if f.attr in selectors:
+            code = f.kind.load(f.attr)
+        elif f.when is None and f.kind.size is not None:
+            pending += f.kind.size
+            continue
+        else:
+            code = f.kind.skip(f.attr)
+        if pending:
+            lines.append(f"s.seek(s.pos() + {pending})")
+            pending = 0
+        lines += _guarded(f, code)
+    if pending:
+        lines.append(f"s.seek(s.pos() + {pending})")
+    return lines
+
+
+class _Scratch:
+    """
+    Заменяет элемент в skip(): хранит поля, от которых зависят другие
+    """
+
+
+def generate(cls_name: str, schema: Sequence[Field], version: int,
+             classes: Dict[str, type]) -> Codec:
+    """
+    Генерирует функции load, save, dump, restore и skip типа элемента для
+    версии скрипта. Полей, которых нет в этой версии, в функциях просто
+    нет, так что версия в них не проверяется
+
+    :param classes: типы элементов по имени, для вложенных элементов
+    """
+    env = {"MinMax": MinMax, "Status": Status, "str_to_bool": str_to_bool,
+           "_Scratch": _Scratch}
+    fields = [f for f in schema if f.until is None or version < f.until]
+    for f in fields:
+        env.update(f.kind.env(version, classes))
+
+    source = '\n\n'.join((
+        _function("load(self, s)",
+                  [line for f in fields
+                   for line in _guarded(f, f.kind.load(f.attr))]),
+        _function("save(self, s)",
+                  [line for f in fields
+                   for line in _guarded(f, f.kind.save(f.attr))]),
+        _function("dump(self, root)",
+                  ["bp = root.add_block(str(self.name), False)"] +
+                  [line for f in fields
+                   for line in _guarded(f, f.kind.dump(f.attr, f.key))]),
+        _function("restore(self, source)",
+                  [line for f in fields
+                   for line in _guarded(f, f.kind.restore(f.attr, f.key))]),
+        _function("skip(s)", _skip(fields)),
+    ))
+    code = compile(source, f"<{cls_name} codec v{version}>", "exec")
+    exec(code, env)
+    return Codec(*(env[n] for n in Codec._fields))
@@ -2,17 +2,29 @@ __all__ = [
     "CompiledScript",
 ]
 
-from abc import ABC, abstractmethod
-from typing import List, Tuple, Union, BinaryIO, TextIO
+from abc import ABC
+from typing import (Callable, Dict, Iterable, List, Set, Tuple, Union,
+                    BinaryIO, TextIO)
 
 from rangers.io import Stream
 from rangers.blockpar import BlockPar
+from rscript.file.bptext import BlockParWriter, BlockParReader
 from rscript.file.enums import *
-from rscript.file.utils import MinMax, Status, str_to_bool
+from rscript.file.schema import (Field, INT, UINT, BOOL, SINGLE, DOUBLE, STR,
+                                 STRIPPED, STRLIST, ARRAY, Enum, EnumPair,
+                                 Pair, STATUS, Ref, Records, Variant, Codec,
+                                 generate)
+from rscript.file.utils import MinMax, Status
 
 
 class CompiledScript:
     supported = (6, 7)
+    # Разделы скрипта в порядке их следования в файле
+    sections = (
+        "GlobalVars", "GlobalCode", "LocalVars", "Constellations", "Stars",
+        "Places", "Items", "Groups", "GroupLinks", "InitCode", "TurnCode",
+        "DialogBegin", "States", "Dialogs", "DialogMsgs", "DialogAnswers",
+    )
 
     def __init__(self):
         self.basepath: str = ""
@@ -36,17 +48,37 @@ class CompiledScript:
         self.dialog_answers: List[DialogAnswer] = []
 
     def save(self, f: BinaryIO):
-        s = Stream.from_io(f)
+        self._save(Stream.from_io(f))
+
+    def _save(self, s: Stream, encoded: Dict[str, list] = None):
+        """
+        :param encoded: уже закодированные элементы разделов
+                        {раздел: [(имя, байты), ...]}, записываются вместо
+                        элементов скрипта (см. rscript.file.cache)
+        """
+        def records(name, cls, items, named=True):
+            if encoded is not None and name in encoded:
+                items = encoded[name]
+                s.add_int(len(items))
+                for ename, data in items:
+                    if named:
+                        s.add_widestr(ename)
+                    s.add(data)
+                return
+            # Функции элемента берутся один раз на раздел
+            save = cls.codec(self.version).save
+            s.add_int(len(items))
+            for e in items:
+                if named:
+                    s.add_widestr(e.name)
+                save(e, s)
 
         s.add_uint(self.version)
 
         pos = s.pos()
         s.add_uint(0)
 
-        s.add_int(len(self.globalvars))
-        for e in self.globalvars:
-            s.add_widestr(e.name)
-            e.save(s)
+        records("GlobalVars", Var, self.globalvars)
 
         s.add_widestr(self.globalcode)
 
@@ -55,369 +87,552 @@ class CompiledScript:
         s.add_uint(offset)
         s.seek(offset)
 
-        s.add_int(len(self.localvars))
-        for e in self.localvars:
-            s.add_widestr(e.name)
-            e.save(s)
+        records("LocalVars", Var, self.localvars)
 
         s.add_int(self.constellations)
 
-        s.add_int(len(self.stars))
-        for e in self.stars:
-            s.add_widestr(e.name)
-            e.save(s)
-
-        s.add_int(len(self.places))
-        for e in self.places:
-            s.add_widestr(e.name)
-            e.save(s)
-
-        s.add_int(len(self.items))
-        for e in self.items:
-            s.add_widestr(e.name)
-            e.save(s)
-
-        s.add_int(len(self.groups))
-        for e in self.groups:
-            s.add_widestr(e.name)
-            e.save(s)
-
-        s.add_int(len(self.grouplinks))
-        for e in self.grouplinks:
-            e.save(s)
+        records("Stars", Star, self.stars)
+        records("Places", Place, self.places)
+        records("Items", Item, self.items)
+        records("Groups", Group, self.groups)
+        records("GroupLinks", GroupLink, self.grouplinks, False)
 
         s.add_widestr(self.initcode)
         s.add_widestr(self.turncode)
         s.add_widestr(self.dialogbegincode)
 
-        s.add_int(len(self.states))
-        for e in self.states:
-            s.add_widestr(e.name)
-            e.save(s)
-
-        s.add_int(len(self.dialogs))
-        for e in self.dialogs:
-            s.add_widestr(e.name)
-            e.save(s)
+        records("States", State, self.states)
+        records("Dialogs", Dialog, self.dialogs)
+        records("DialogMsgs", DialogMsg, self.dialog_msgs, False)
+        records("DialogAnswers", DialogAnswer, self.dialog_answers, False)
 
-        s.add_int(len(self.dialog_msgs))
-        for e in self.dialog_msgs:
-            e.save(s)
-
-        s.add_int(len(self.dialog_answers))
-        for e in self.dialog_answers:
-            e.save(s)
+    def load(self, f: BinaryIO, sections: Iterable[str] = None):
+        """
+        :param sections: имена разделов (см. CompiledScript.sections),
+                         которые нужно прочитать. Остальные разделы
+                         пропускаются, а чтение заканчивается после
+                         последнего нужного раздела
+        """
+        want = self._wanted(sections)
+        # Дамп групп ссылается на имена состояний
+        if "Groups" in want:
+            want.add("States")
+        pending = set(want)
 
-    def load(self, f: BinaryIO):
         s = Stream.from_io(f)
 
         self.version = s.get_uint()
 
         if self.version not in CompiledScript.supported:
             s.close()
-            raise Exception("CompiledScript.load. Unsupported version")
+            raise ValueError("CompiledScript.load. Unsupported version")
+
+        def records(name, cls, items, named=True):
+            count = s.get_int()
+            codec = cls.codec(self.version)
+            if name in want:
+                load = codec.load
+                for i in range(count):
+                    e = cls(self, s.get_widestr() if named else str(i))
+                    load(e, s)
+                    items.append(e)
+            else:
+                # Ненужные элементы не создаются: поля постоянного размера
+                # пропускаются целиком, читаются только строки и поля,
+                # от которых зависит состав остальных
+                skip = codec.skip
+                for i in range(count):
+                    if named:
+                        s.get_widestr()
+                    skip(s)
+            pending.discard(name)
+            return not pending
+
+        def value(name, get, default):
+            v = get()
+            pending.discard(name)
+            return v if name in want else default
+
+        offset = s.get_uint()
+
+        if "GlobalVars" in want or "GlobalCode" in want:
+            records("GlobalVars", Var, self.globalvars)
+            self.globalcode = value("GlobalCode", s.get_widestr, "")
+        else:
+            # Смещение локальных переменных записано в заголовке
+            s.seek(offset)
+        if not pending:
+            return
+
+        if records("LocalVars", Var, self.localvars):
+            return
+
+        self.constellations = value("Constellations", s.get_int, 0)
+        if not pending:
+            return
+
+        if records("Stars", Star, self.stars) or \
+                records("Places", Place, self.places) or \
+                records("Items", Item, self.items) or \
+                records("Groups", Group, self.groups) or \
+                records("GroupLinks", GroupLink, self.grouplinks, False):
+            return
+
+        self.initcode = value("InitCode", s.get_widestr, "")
+        self.turncode = value("TurnCode", s.get_widestr, "")
+        self.dialogbegincode = value("DialogBegin", s.get_widestr, "")
+        if not pending:
+            return
+
+        records("States", State, self.states) or \
+            records("Dialogs", Dialog, self.dialogs) or \
+            records("DialogMsgs", DialogMsg, self.dialog_msgs, False) or \
+            records("DialogAnswers", DialogAnswer, self.dialog_answers, False)
+
+    def dump(self, f: TextIO, sections: Iterable[str] = None,
+             records: Union[str, Callable[['CompiledPoint'], bool]] = None):
+        """
+        :param sections: имена разделов, которые попадут в дамп
+        :param records: шаблон имени (fnmatch) или предикат элемента;
+                        в дамп попадут только подходящие элементы разделов
+        """
+        self._dump(BlockParWriter(f), sections, records)
 
-        s.get_uint()
+    def dump_jsonl(self, f: TextIO, sections: Iterable[str] = None,
+                   records: Union[str,
+                                  Callable[['CompiledPoint'], bool]] = None):
+        """
+        Сохраняет дамп в формате JSON lines: по одному элементу на строку.
+        Параметры sections и records те же, что и у dump
+        """
+        from rscript.file.jsonl import JsonLinesWriter
+        self._dump(JsonLinesWriter(f), sections, records)
+
+    def _wanted(self, sections):
+        if sections is None:
+            return set(CompiledScript.sections)
+        want = set(sections)
+        unknown = want.difference(CompiledScript.sections)
+        if unknown:
+            raise ValueError("CompiledScript. Unknown sections: " +
+                             ", ".join(sorted(unknown)))
+        return want
+
+    def _dump(self, bp: Union[BlockParWriter, 'JsonLinesWriter'],
+              sections=None, records=None):
+        want = self._wanted(sections)
+        if isinstance(records, str):
+            from fnmatch import fnmatchcase
+            pattern = records
+            records = lambda e: fnmatchcase(e.name, pattern)
+
+        def block(name, cls, items, sort=False):
+            if name in want:
+                nbp = bp.add_block(name, sort)
+                dump = cls.codec(self.version).dump
+                for e in items:
+                    if records is None or records(e):
+                        dump(e, nbp)
 
-        for i in range(s.get_int()):
-            e = Var(self, s.get_widestr())
-            e.load(s)
-            self.globalvars.append(e)
+        bp.add_par("Version", str(self.version))
 
-        self.globalcode = s.get_widestr()
+        block("GlobalVars", Var, self.globalvars)
 
-        for i in range(s.get_int()):
-            e = Var(self, s.get_widestr())
-            e.load(s)
-            self.localvars.append(e)
+        if "GlobalCode" in want:
+            bp.add_par("GlobalCode", self.globalcode)
 
-        self.constellations = s.get_int()
+        block("LocalVars", Var, self.localvars)
 
-        for i in range(s.get_int()):
-            e = Star(self, s.get_widestr())
-            e.load(s)
-            self.stars.append(e)
+        if "Constellations" in want:
+            bp.add_par("Constellations", str(self.constellations))
 
-        for i in range(s.get_int()):
-            e = Place(self, s.get_widestr())
-            e.load(s)
-            self.places.append(e)
+        block("Stars", Star, self.stars)
+        block("Places", Place, self.places)
+        block("Items", Item, self.items)
+        block("Groups", Group, self.groups)
+        block("GroupLinks", GroupLink, self.grouplinks)
 
-        for i in range(s.get_int()):
-            e = Item(self, s.get_widestr())
-            e.load(s)
-            self.items.append(e)
+        if "InitCode" in want:
+            bp.add("InitCode", self.initcode)
 
-        for i in range(s.get_int()):
-            e = Group(self, s.get_widestr())
-            e.load(s)
-            self.groups.append(e)
+        if "TurnCode" in want:
+            bp.add("TurnCode", self.turncode)
 
-        for i in range(s.get_int()):
-            e = GroupLink(self, str(i))
-            e.load(s)
-            self.grouplinks.append(e)
+        if "DialogBegin" in want:
+            bp.add("DialogBegin", self.dialogbegincode)
 
-        self.initcode = s.get_widestr()
-        self.turncode = s.get_widestr()
-        self.dialogbegincode = s.get_widestr()
+        block("States", State, self.states)
+        block("Dialogs", Dialog, self.dialogs, True)
+        block("DialogMsgs", DialogMsg, self.dialog_msgs)
+        block("DialogAnswers", DialogAnswer, self.dialog_answers)
 
-        for i in range(s.get_int()):
-            e = State(self, s.get_widestr())
-            e.load(s)
-            self.states.append(e)
+        bp.close()
 
-        for i in range(s.get_int()):
-            e = Dialog(self, s.get_widestr())
-            e.load(s)
-            self.dialogs.append(e)
+    def restore(self, f: TextIO):
+        self._restore(BlockParReader(f))
 
-        for i in range(s.get_int()):
-            e = DialogMsg(self, str(i))
-            e.load(s)
-            self.dialog_msgs.append(e)
+    def restore_jsonl(self, f: TextIO):
+        """
+        Восстанавливает скрипт из дампа в формате JSON lines
+        """
+        from rscript.file.jsonl import JsonLinesReader
+        self._restore(JsonLinesReader(f))
 
-        for i in range(s.get_int()):
-            e = DialogAnswer(self, str(i))
-            e.load(s)
-            self.dialog_answers.append(e)
+    def _record_sections(self):
+        """
+        Разделы, состоящие из элементов: {имя: (класс элемента, список)}
+        """
+        return {
+            "GlobalVars": (Var, self.globalvars),
+            "LocalVars": (Var, self.localvars),
+            "Stars": (Star, self.stars),
+            "Places": (Place, self.places),
+            "Items": (Item, self.items),
+            "Groups": (Group, self.groups),
+            "GroupLinks": (GroupLink, self.grouplinks),
+            "States": (State, self.states),
+            "Dialogs": (Dialog, self.dialogs),
+            "DialogMsgs": (DialogMsg, self.dialog_msgs),
+            "DialogAnswers": (DialogAnswer, self.dialog_answers),
+        }
+
+    def _restore(self, reader: Union[BlockParReader, 'JsonLinesReader'],
+                 *, complete: bool = True,
+                 records: Callable[[str, type, Iterable], None] = None
+                 ) -> Set[str]:
+        """
+        :param complete: дамп должен содержать версию и все разделы
+        :param records: читает раздел из элементов по его имени, классу
+                        элементов и содержимому - паре (имя, блок) на
+                        элемент (см. rscript.file.cache)
+        :return: имена прочитанных разделов
+        """
+        sections = self._record_sections()
+        found = set()
+
+        if records is None:
+            def records(name, cls, content):
+                items = sections[name][1]
+                restore = cls.codec(self.version).restore
+                for ename, block in content:
+                    e = cls(self, ename)
+                    restore(e, block.to_blockpar())
+                    items.append(e)
+
+        # Дамп читается последовательно, в памяти держится только
+        # текущий восстанавливаемый элемент
+        for name, content in reader:
+            found.add(name)
+            if name in sections:
+                records(name, sections[name][0], content)
+            elif name == "Version":
+                self.version = int(content)
+            elif name == "GlobalCode":
+                self.globalcode = content
+            elif name == "Constellations":
+                self.constellations = int(content)
+            elif name == "InitCode":
+                self.initcode = content
+            elif name == "TurnCode":
+                self.turncode = content
+            elif name == "DialogBegin":
+                self.dialogbegincode = content
+            else:
+                raise ValueError(
+                    f"CompiledScript.restore. Unknown section {name}")
+
+        if complete:
+            self._check_sections(found)
+        return found
+
+    @staticmethod
+    def _check_sections(found: Set[str]):
+        missing = [name for name in ("Version",) + CompiledScript.sections
+                   if name not in found]
+        if missing:
+            raise ValueError("CompiledScript.restore. Missing sections: " +
+                             ", ".join(missing))
+
+    def dump_shards(self, directory: str) -> int:
+        """
+        Сохраняет дамп по частям: по файлу на раздел и по файлу на каждый
+        элемент разделов с кодом, плюс манифест (см. rscript.file.shards)
 
-    def dump(self, f: TextIO):
-        bp = BlockPar(sort=False)
+        :return: количество перезаписанных частей
+        """
+        from rscript.file.shards import dump_shards
+        return dump_shards(self, directory)
 
-        bp.add_par("Version", str(self.version))
+    def restore_shards(self, directory: str, *, jobs: int = None,
+                       cache: str = None) -> int:
+        """
+        Восстанавливает скрипт из дампа, сохранённого по частям. Большое
+        число частей читается параллельно
+
+        :param jobs: число процессов; 1 - читать в этом процессе, None -
+                     выбрать по числу частей
+        :param cache: файл с уже прочитанными частями; перечитываются
+                      только части, изменившиеся с прошлого раза
+        :return: количество перечитанных частей
+        """
+        from rscript.file.shards import restore_shards
+        return restore_shards(self, directory, jobs=jobs, cache=cache)
 
-        nbp = bp.add_block("GlobalVars", False)
-        for e in self.globalvars:
-            e.dump(nbp)
+    def export_groups(self):
+        """
+        Возвращает группы в виде структурированного массива NumPy
+        (см. rscript.file.columns.GROUP_DTYPE)
+        """
+        from rscript.file.columns import groups_to_array
+        return groups_to_array(self.groups)
 
-        bp.add_par("GlobalCode", self.globalcode)
+    def import_groups(self, table):
+        """
+        Заменяет группы скрипта содержимым структурированного массива
+        """
+        from rscript.file.columns import groups_from_array
+        self.groups = groups_from_array(self, table)
 
-        nbp = bp.add_block("LocalVars", False)
-        for e in self.localvars:
-            e.dump(nbp)
+    def export_grouplinks(self):
+        """
+        Возвращает связи групп в виде структурированного массива NumPy
+        (см. rscript.file.columns.GROUPLINK_DTYPE)
+        """
+        from rscript.file.columns import grouplinks_to_array
+        return grouplinks_to_array(self.grouplinks)
 
-        bp.add_par("Constellations", str(self.constellations))
+    def import_grouplinks(self, table):
+        """
+        Заменяет связи групп содержимым структурированного массива
+        """
+        from rscript.file.columns import grouplinks_from_array
+        self.grouplinks = grouplinks_from_array(self, table)
 
-        nbp = bp.add_block("Stars", False)
-        for e in self.stars:
-            e.dump(nbp)
+    def group_graph(self):
+        """
+        Строит граф связей групп (см. rscript.file.graph.GroupGraph).
+        Граф не отслеживает последующие изменения скрипта
+        """
+        from rscript.file.graph import GroupGraph
+        return GroupGraph(self)
 
-        nbp = bp.add_block("Places", False)
-        for e in self.places:
-            e.dump(nbp)
+    def star_graph(self, holes=True):
+        """
+        Строит граф звёздных связей (см. rscript.file.graph.StarGraph).
+        Граф не отслеживает последующие изменения скрипта
+        """
+        from rscript.file.graph import StarGraph
+        return StarGraph(self, holes=holes)
 
-        nbp = bp.add_block("Items", False)
-        for e in self.items:
-            e.dump(nbp)
 
-        nbp = bp.add_block("Groups", False)
-        for e in self.groups:
-            e.dump(nbp)
+def _pair_slots(*names: str) -> Tuple[str, ...]:
+    return tuple(f"_{n}_{b}" for n in names for b in ("min", "max"))
 
-        nbp = bp.add_block("GroupLinks", False)
-        for e in self.grouplinks:
-            e.dump(nbp)
 
-        bp.add("InitCode", self.initcode)
+class _MinMaxView(MinMax):
+    """
+    MinMax, привязанный к записи: границы читаются из её слотов и
+    записываются в них же, так что ``group.count.min = 5`` меняет группу
+    """
+    __slots__ = "_obj", "_slot"
 
-        bp.add("TurnCode", self.turncode)
+    def __init__(self, obj, slot: '_MinMaxSlot'):
+        self._obj = obj
+        self._slot = slot
 
-        bp.add("DialogBegin", self.dialogbegincode)
+    @property
+    def min(self):
+        return self._slot._min.__get__(self._obj)
 
-        nbp = bp.add_block("States", False)
-        for i, e in enumerate(self.states):
-            e.dump(nbp)
+    @min.setter
+    def min(self, value):
+        self._slot._min.__set__(self._obj, value)
 
-        nbp = bp.add_block("Dialogs")
-        for e in self.dialogs:
-            e.dump(nbp)
+    @property
+    def max(self):
+        return self._slot._max.__get__(self._obj)
 
-        nbp = bp.add_block("DialogMsgs", False)
-        for e in self.dialog_msgs:
-            e.dump(nbp)
+    @max.setter
+    def max(self, value):
+        self._slot._max.__set__(self._obj, value)
 
-        nbp = bp.add_block("DialogAnswers", False)
-        for e in self.dialog_answers:
-            e.dump(nbp)
 
-        bp.save_txt(f)
-        del bp
+class _MinMaxSlot:
+    """
+    Свойство типа MinMax, границы которого хранятся в слотах записи
+    ``_<имя>_min`` и ``_<имя>_max``.
 
-    def restore(self, f: TextIO):
-        root = BlockPar(sort=False)
-        root.load_txt(f)
+    При чтении возвращается MinMax, привязанный к записи (см. _MinMaxView)
+    """
+    __slots__ = "_min", "_max"
 
-        self.version = int(root.get_par("Version"))
+    def __set_name__(self, owner, name):
+        self._min = owner.__dict__[f"_{name}_min"]
+        self._max = owner.__dict__[f"_{name}_max"]
 
-        for name, block in root.get_block("GlobalVars"):
-            e = Var(self, name)
-            e.restore(block)
-            self.globalvars.append(e)
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return _MinMaxView(obj, self)
 
-        self.globalcode = root.get_par("GlobalCode")
+    def __set__(self, obj, value: MinMax):
+        self._min.__set__(obj, value.min)
+        self._max.__set__(obj, value.max)
 
-        for name, block in root.get_block("LocalVars"):
-            e = Var(self, name)
-            e.restore(block)
-            self.localvars.append(e)
 
-        self.constellations = int(root.get_par("Constellations"))
+class _StatusView(Status):
+    """
+    Status, привязанный к записи: и границы, и части целиком
+    записываются в её слоты
+    """
+    __slots__ = "_obj", "_slot"
 
-        for name, block in root.get_block("Stars"):
-            e = Star(self, name)
-            e.restore(block)
-            self.stars.append(e)
+    def __init__(self, obj, slot: '_StatusSlot'):
+        self._obj = obj
+        self._slot = slot
 
-        for name, block in root.get_block("Places"):
-            e = Place(self, name)
-            e.restore(block)
-            self.places.append(e)
+    def _part(i):
+        def get(self):
+            return self._slot._parts[i].__get__(self._obj)
 
-        for name, block in root.get_block("Items"):
-            e = Item(self, name)
-            e.restore(block)
-            self.items.append(e)
+        def set(self, value):
+            self._slot._parts[i].__set__(self._obj, value)
 
-        for name, block in root.get_block("Groups"):
-            e = Group(self, name)
-            e.restore(block)
-            self.groups.append(e)
+        return property(get, set)
 
-        for name, block in root.get_block("GroupLinks"):
-            e = GroupLink(self, name)
-            e.restore(block)
-            self.grouplinks.append(e)
+    trader = _part(0)
+    warrior = _part(1)
+    pirate = _part(2)
+    del _part
 
-        self.initcode = root.get_par("InitCode")
-        self.turncode = root.get_par("TurnCode")
-        self.dialogbegincode = root.get_par("DialogBegin")
 
-        for name, block in root.get_block("States"):
-            e = State(self, name)
-            e.restore(block)
-            self.states.append(e)
+class _StatusSlot:
+    """
+    Свойство типа Status, границы которого хранятся в слотах записи
+    ``_<имя>_trader_min``, ``_<имя>_trader_max`` и т.д.
+    """
+    __slots__ = "_parts",
 
-        for name, block in root.get_block("Dialogs"):
-            e = Dialog(self, name)
-            e.restore(block)
-            self.dialogs.append(e)
+    def __set_name__(self, owner, name):
+        self._parts = tuple(_MinMaxSlot() for _ in range(3))
+        for part, p in zip(self._parts, ("trader", "warrior", "pirate")):
+            part.__set_name__(owner, f"{name}_{p}")
 
-        for name, block in root.get_block("DialogMsgs"):
-            e = DialogMsg(self, name)
-            e.restore(block)
-            self.dialog_msgs.append(e)
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return _StatusView(obj, self)
 
-        for name, block in root.get_block("DialogAnswers"):
-            e = DialogAnswer(self, name)
-            e.restore(block)
-            self.dialog_answers.append(e)
+    def __set__(self, obj, value: Status):
+        trader, warrior, pirate = self._parts
+        trader.__set__(obj, value.trader)
+        warrior.__set__(obj, value.warrior)
+        pirate.__set__(obj, value.pirate)
 
 
 class CompiledPoint(ABC):
     """
     Элемент скомпилированного скрипта
     """
-    
+    __slots__ = "_script", "name"
+
+    # Схема полей (см. rscript.file.schema). По ней для каждой версии
+    # скрипта генерируются функции load, save, dump, restore и skip
+    _schema: Tuple[Field, ...] = ()
+
+    # Классы элементов по имени, для вложенных элементов схем
+    _classes: Dict[str, type] = {}
+
     def __init__(self, script: CompiledScript, name: str = ""):
         self._script = script
         self.name = name
 
-    @abstractmethod
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        CompiledPoint._classes[cls.__name__] = cls
+        cls._codecs = {}
+
+    @classmethod
+    def codec(cls, version: int) -> Codec:
+        """
+        Функции элемента для версии скрипта. Генерируются при первом
+        обращении; вызывающий код может взять их один раз на весь раздел
+        """
+        codec = cls._codecs.get(version)
+        if codec is None:
+            if version not in CompiledScript.supported:
+                raise Exception(f"{cls.__name__}. Unsupported version")
+            codec = cls._codecs[version] = generate(
+                cls.__name__, cls._schema, version, CompiledPoint._classes)
+        return codec
+
     def save(self, s: Stream):
         """
         Сохраняет элемент скомпилированного скрипта в двоичном представлении
 
         :param s: файловый поток родительского скрипта
         """
-        pass
+        self.codec(self._script.version).save(self, s)
 
-    @abstractmethod
     def load(self, s: Stream):
         """
         Восстанавливает элемент скомпилированного скрипта из двоичного представления
         
         :param s: файловый поток родительского скрипта
         """
-        pass
+        self.codec(self._script.version).load(self, s)
 
-    @abstractmethod
-    def dump(self, root: BlockPar):
+    def dump(self, root: Union[BlockPar, BlockParWriter]):
         """
         Сохраняет элемент скомпилированного скрипта в дамп в формате блокпар
 
-        :param root: родительский блок дампа
+        :param root: родительский блок дампа (дерево или потоковая запись)
         """
-        pass
+        self.codec(self._script.version).dump(self, root)
 
-    @abstractmethod
     def restore(self, source: BlockPar):
         """
         Восстанавливает элемент скомпилированного скрипта из дампа в формате блокпар
 
         :param source: блок дампа с содержимым элемента
         """
-        pass
+        self.codec(self._script.version).restore(self, source)
 
 
 class Var(CompiledPoint):
+    __slots__ = "type", "value"
+
+    _schema = (
+        Field("type", Enum(var_, byte=True), "Type"),
+        Field("value", Variant("type", var_, {
+            var_.INTEGER: INT,
+            var_.DWORD: UINT,
+            var_.FLOAT: DOUBLE,
+            var_.STRING: STR,
+            var_.ARRAY: ARRAY,
+        }), "Value"),
+    )
+
     def __init__(self, script, name):
         super().__init__(script, name)
         self.type: var_ = var_(0)
         self.value: Union[int, float, str] = 0
 
-    def save(self, s):
-        s.add_byte(int(self.type))
-        if self.type is var_.INTEGER:
-            s.add_int(self.value)
-        elif self.type is var_.DWORD:
-            s.add_uint(self.value)
-        elif self.type is var_.FLOAT:
-            s.add_double(self.value)
-        elif self.type is var_.STRING:
-            s.add_widestr(self.value)
-        elif self.type is var_.ARRAY:
-            s.add_int(self.value)
-            for i in range(self.value):
-                s.add_widestr('')
-                s.add_byte(0)
-
-    def load(self, s):
-        self.type = var_(s.get_byte())
-        if self.type is var_.INTEGER:
-            self.value = s.get_int()
-        elif self.type is var_.DWORD:
-            self.value = s.get_uint()
-        elif self.type is var_.FLOAT:
-            self.value = s.get_double()
-        elif self.type is var_.STRING:
-            self.value = s.get_widestr()
-        elif self.type is var_.ARRAY:
-            self.value = s.get_int()
-            for i in range(self.value):
-                s.get_widestr()
-                s.get_byte()
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("Type", str(self.type))
-        bp.add_par("Value", str(self.value))
-
-    def restore(self, source):
-        self.type = var_.from_str(source.get_par("Type"))
-        if self.type is var_.INTEGER:
-            self.value = int(source.get_par("Value"))
-        elif self.type is var_.DWORD:
-            self.value = int(source.get_par("Value"))
-        elif self.type is var_.FLOAT:
-            self.value = float(source.get_par("Value"))
-        elif self.type is var_.STRING:
-            self.value = source.get_par("Value")
-        elif self.type is var_.ARRAY:
-            self.value = int(source.get_par("Value"))
-
 
 class Star(CompiledPoint):
+    __slots__ = ("constellation", "is_subspace", "no_kling", "no_come_kling",
+                 "starlinks", "planets", "ships")
+
+    _schema = (
+        Field("constellation", INT, "Constellation"),
+        Field("is_subspace", BOOL, "IsSubspace", until=7),
+        Field("no_kling", BOOL, "NoKling"),
+        Field("no_come_kling", BOOL, "NoComeKling"),
+        Field("starlinks", Records("StarLink"), "StarLinks"),
+        Field("planets", Records("Planet", named=True), "Planets"),
+        Field("ships", Records("Ship"), "Ships"),
+    )
+
     def __init__(self, script, name):
         super().__init__(script, name)
         self.constellation: int = 0
@@ -428,302 +643,121 @@ class Star(CompiledPoint):
         self.planets: List[Planet] = []
         self.ships: List[Ship] = []
 
-    def save(self, s):
-        s.add_int(self.constellation)
-        if self._script.version < 7:
-            s.add_bool(self.is_subspace)
-        s.add_bool(self.no_kling)
-        s.add_bool(self.no_come_kling)
-
-        s.add_uint(len(self.starlinks))
-        for e in self.starlinks:
-            e.save(s)
-
-        s.add_uint(len(self.planets))
-        for e in self.planets:
-            s.add_widestr(e.name)
-            e.save(s)
-
-        s.add_uint(len(self.ships))
-        for e in self.ships:
-            e.save(s)
-
-    def load(self, s):
-        self.constellation = s.get_int()
-        if self._script.version < 7:
-            self.is_subspace = s.get_bool()  # always false for 6?
-        self.no_kling = s.get_bool()
-        self.no_come_kling = s.get_bool()
-
-        for i in range(s.get_uint()):
-            e = StarLink(self._script, str(i))
-            e.load(s)
-            self.starlinks.append(e)
-
-        for i in range(s.get_uint()):
-            e = Planet(self._script, s.get_widestr())
-            e.load(s)
-            self.planets.append(e)
-
-        for i in range(s.get_uint()):
-            e = Ship(self._script, str(i))
-            e.load(s)
-            self.ships.append(e)
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("Constellation", str(self.constellation))
-        if self._script.version < 7:
-            bp.add_par("IsSubspace", str(self.is_subspace))
-        bp.add_par("NoKling", str(self.no_kling))
-        bp.add_par("NoComeKling", str(self.no_come_kling))
-
-        nbp = bp.add_block("StarLinks", False)
-        for sl in self.starlinks:
-            sl.dump(nbp)
-
-        nbp = bp.add_block("Planets", False)
-        for p in self.planets:
-            p.dump(nbp)
-
-        nbp = bp.add_block("Ships", False)
-        for s in self.ships:
-            s.dump(nbp)
-
-    def restore(self, source):
-        self.constellation = int(source.get_par("Constellation"))
-        if self._script.version < 7:
-            self.is_subspace = str_to_bool(source.get_par("IsSubspace"))
-        self.no_kling = str_to_bool(source.get_par("NoKling"))
-        self.no_come_kling = str_to_bool(source.get_par("NoComeKling"))
-
-        for name, block in source.get_block("StarLinks"):
-            e = StarLink(self._script, name)
-            e.restore(block)
-            self.starlinks.append(e)
-
-        for name, block in source.get_block("Planets"):
-            e = Planet(self._script, name)
-            e.restore(block)
-            self.planets.append(e)
-
-        for name, block in source.get_block("Ships"):
-            e = Ship(self._script, name)
-            e.restore(block)
-            self.ships.append(e)
-
 
 class StarLink(CompiledPoint):
+    __slots__ = ("end_star", "angle", "deviation", "is_hole",
+                 *_pair_slots("distance", "relation"))
+
+    distance = _MinMaxSlot()
+    relation = _MinMaxSlot()
+
+    _schema = (
+        Field("end_star", Ref("stars"), "EndStar"),
+        Field("angle", INT, "Angle", until=7),
+        Field("distance", Pair.INT, "Distance"),
+        Field("relation", Pair.INT, "Relation", until=7),
+        Field("deviation", INT, "Deviation", until=7),
+        Field("is_hole", BOOL, "IsHole"),
+    )
+
     def __init__(self, script, name):
         super().__init__(script, name)
         self.end_star: int = 0
         self.angle: int = 0
-        self.distance: MinMax[int] = MinMax(0, 0)
-        self.relation: MinMax[int] = MinMax(0, 0)
+        self._distance_min, self._distance_max = 0, 0
+        self._relation_min, self._relation_max = 0, 0
         self.deviation: int = 0
         self.is_hole: bool = False
 
-    def save(self, s):
-        s.add_int(self.end_star)
-        if self._script.version < 7:
-            s.add_int(self.angle)
-        s.add_int(self.distance.min)
-        s.add_int(self.distance.max)
-        if self._script.version < 7:
-            s.add_int(self.relation.min)
-            s.add_int(self.relation.max)
-            s.add_int(self.deviation)
-        s.add_bool(self.is_hole)
-
-    def load(self, s):
-        self.end_star = s.get_int()
-        if self._script.version < 7:
-            self.angle = s.get_int()
-        self.distance = MinMax(s.get_int(), s.get_int())
-        if self._script.version < 7:
-            self.relation = MinMax(s.get_int(), s.get_int())
-            self.deviation = s.get_int()
-        self.is_hole = s.get_bool()
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("EndStar", str(self._script.stars[self.end_star].name) + \
-                              '(' + str(self.end_star) + ')')
-        if self._script.version < 7:
-            bp.add_par("Angle", str(self.angle))
-        bp.add_par("Distance", str(self.distance))
-        if self._script.version < 7:
-            bp.add_par("Relation", str(self.relation))
-            bp.add_par("Deviation", str(self.deviation))
-        bp.add_par("IsHole", str(self.is_hole))
-
-    def restore(self, source):
-        end_star = source.get_par("EndStar")
-        start = end_star.find('(') + 1
-        end = end_star.find(')')
-        self.end_star = int(end_star[start:end])
-        if self._script.version < 7:
-            self.angle = int(source.get_par("Angle"))
-        self.distance = MinMax.from_str(source.get_par("Distance"), int)
-        if self._script.version < 7:
-            self.relation = MinMax.from_str(source.get_par("Relation"), int)
-            self.deviation = int(source.get_par("Deviation"))
-        self.is_hole = str_to_bool(source.get_par("IsHole"))
-
 
 class Planet(CompiledPoint):
+    __slots__ = ("race", "owner", "economy", "government", "dialog",
+                 *_pair_slots("range"))
+
+    range = _MinMaxSlot()
+
+    _schema = (
+        Field("race", Enum(r_), "Race"),
+        Field("owner", Enum(o_), "Owner"),
+        Field("economy", Enum(e_), "Economy"),
+        Field("government", Enum(g_), "Government"),
+        Field("range", Pair.INT, "Range"),
+        Field("dialog", STR, "Dialog"),
+    )
+
     def __init__(self, script, name):
         super().__init__(script, name)
         self.race: Race = Race(0)
         self.owner: o_ = o_(0)
         self.economy: e_ = e_(0)
         self.government: g_ = g_(0)
-        self.range: MinMax[int] = MinMax(0, 0)
+        self._range_min, self._range_max = 0, 0
         self.dialog: str = ""
 
-    def save(self, s):
-        s.add_uint(int(self.race))
-        s.add_uint(int(self.owner))
-        s.add_uint(int(self.economy))
-        s.add_uint(int(self.government))
-        s.add_int(self.range.min)
-        s.add_int(self.range.max)
-        s.add_widestr(self.dialog)
-
-    def load(self, s):
-        self.race = r_(s.get_uint())
-        self.owner = o_(s.get_uint())
-        self.economy = e_(s.get_uint())
-        self.government = g_(s.get_uint())
-        self.range = MinMax(s.get_int(), s.get_int())
-        self.dialog = s.get_widestr()
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("Race", str(self.race))
-        bp.add_par("Owner", str(self.owner))
-        bp.add_par("Economy", str(self.economy))
-        bp.add_par("Government", str(self.government))
-        bp.add_par("Range", str(self.range))
-        bp.add_par("Dialog", str(self.dialog))
-
-    def restore(self, source):
-        self.race = r_.from_str(source.get_par("Race"))
-        self.owner = o_.from_str(source.get_par("Owner"))
-        self.economy = e_.from_str(source.get_par("Economy"))
-        self.government = g_.from_str(source.get_par("Government"))
-        self.range = MinMax.from_str(source.get_par("Range"), int)
-        self.dialog = source.get_par("Dialog")
-
 
 class Ship(CompiledPoint):
+    __slots__ = ("count", "owner", "type", "is_player", "weapon", "cargohook",
+                 "emptyspace", "ruins",
+                 *_pair_slots("speed", "rating", "score", "strength",
+                              "status_trader", "status_warrior",
+                              "status_pirate"))
+
+    speed = _MinMaxSlot()
+    rating = _MinMaxSlot()
+    status = _StatusSlot()
+    score = _MinMaxSlot()
+    strength = _MinMaxSlot()
+
+    _schema = (
+        Field("count", INT, "Count"),
+        Field("owner", Enum(o_), "Owner"),
+        Field("type", Enum(t_), "Type"),
+        Field("is_player", BOOL, "IsPlayer"),
+        Field("speed", Pair.INT, "Speed"),
+        Field("weapon", Enum(w_), "Weapon"),
+        Field("cargohook", INT, "CargoHook"),
+        Field("emptyspace", INT, "EmptySpace"),
+        Field("rating", Pair.INT, "Rating", until=7),
+        Field("status", STATUS, "Status"),
+        Field("score", Pair.INT, "Score", until=7),
+        Field("strength", Pair.SINGLE, "Strength"),
+        Field("ruins", STR, "Ruins"),
+    )
+
     def __init__(self, script, name):
         super().__init__(script, name)
         self.count: int = 0
         self.owner: o_ = o_(0)
         self.type: t_ = t_(0)
         self.is_player: bool = False
-        self.speed: MinMax[int] = MinMax(0, 0)
+        self._speed_min, self._speed_max = 0, 0
         self.weapon: w_ = w_(0)
         self.cargohook: int = 0
         self.emptyspace: int = 0
-        self.rating: MinMax[int] = MinMax(0, 0)
-        self.status: Status = Status(MinMax(0, 0),
-                                     MinMax(0, 0),
-                                     MinMax(0, 0),)
-        self.score: MinMax[int] = MinMax(0, 0)
-        self.strength: MinMax[float] = MinMax(0.0, 0.0)
+        self._rating_min, self._rating_max = 0, 0
+        self._status_trader_min, self._status_trader_max = 0, 0
+        self._status_warrior_min, self._status_warrior_max = 0, 0
+        self._status_pirate_min, self._status_pirate_max = 0, 0
+        self._score_min, self._score_max = 0, 0
+        self._strength_min, self._strength_max = 0.0, 0.0
         self.ruins: str = ""
 
-    def save(self, s):
-        s.add_int(self.count)
-        s.add_uint(int(self.owner))
-        s.add_uint(int(self.type))
-        s.add_bool(self.is_player)
-        s.add_int(self.speed.min)
-        s.add_int(self.speed.max)
-        s.add_uint(int(self.weapon))
-        s.add_int(self.cargohook)
-        s.add_int(self.emptyspace)
-        if self._script.version < 7:
-            s.add_int(self.rating.min)
-            s.add_int(self.rating.max)
-        s.add_int(self.status.trader.min)
-        s.add_int(self.status.trader.max)
-        s.add_int(self.status.warrior.min)
-        s.add_int(self.status.warrior.max)
-        s.add_int(self.status.pirate.min)
-        s.add_int(self.status.pirate.max)
-        if self._script.version < 7:
-            s.add_int(self.score.min)
-            s.add_int(self.score.max)
-        s.add_single(self.strength.min)
-        s.add_single(self.strength.max)
-        s.add_widestr(self.ruins)
-
-    def load(self, s):
-        self.count = s.get_int()
-        self.owner = o_(s.get_uint())
-        self.type = t_(s.get_uint())
-        self.is_player = s.get_bool()
-        self.speed = MinMax(s.get_int(), s.get_int())
-        self.weapon = w_(s.get_uint())
-        self.cargohook = s.get_int()
-        self.emptyspace = s.get_int()
-        if self._script.version < 7:
-            self.rating = MinMax(s.get_int(), s.get_int())
-        self.status = Status(MinMax(s.get_int(), s.get_int()),
-                             MinMax(s.get_int(), s.get_int()),
-                             MinMax(s.get_int(), s.get_int()))
-        if self._script.version < 7:
-            self.score = MinMax(s.get_int(), s.get_int())
-        self.strength = MinMax(s.get_single(), s.get_single())
-        self.ruins = s.get_widestr()
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("Count", str(self.count))
-        bp.add_par("Owner", str(self.owner))
-        bp.add_par("Type", str(self.type))
-        bp.add_par("IsPlayer", str(self.is_player))
-        bp.add_par("Speed", str(self.speed))
-        bp.add_par("Weapon", str(self.weapon))
-        bp.add_par("CargoHook", str(self.cargohook))
-        bp.add_par("EmptySpace", str(self.emptyspace))
-        if self._script.version < 7:
-            bp.add_par("Rating", str(self.rating))
-        st = bp.add_block("Status", False)
-        st.add_par("Trader", str(self.status.trader))
-        st.add_par("Warrior", str(self.status.warrior))
-        st.add_par("Pirate", str(self.status.pirate))
-        if self._script.version < 7:
-            bp.add_par("Score", str(self.score))
-        bp.add_par("Strength", str(self.strength))
-        bp.add_par("Ruins", str(self.ruins))
-
-    def restore(self, source):
-        self.count = int(source.get_par("Count"))
-        self.owner = o_.from_str(source.get_par("Owner"))
-        self.type = t_.from_str(source.get_par("Type"))
-        self.is_player = str_to_bool(source.get_par("IsPlayer"))
-        self.speed = MinMax.from_str(source.get_par("Speed"), int)
-        self.weapon = w_.from_str(source.get_par("Weapon"))
-        self.cargohook = int(source.get_par("CargoHook"))
-        self.emptyspace = int(source.get_par("EmptySpace"))
-        if self._script.version < 7:
-            self.rating = MinMax.from_str(source.get_par("Rating"), int)
-        status = source.get_block("Status")
-        self.status = Status(MinMax.from_str(status.get_par("Trader"), int),
-                             MinMax.from_str(status.get_par("Warrior"), int),
-                             MinMax.from_str(status.get_par("Pirate"), int))
-        del status
-        if self._script.version < 7:
-            self.score = MinMax.from_str(source.get_par("Score"), int)
-        self.strength = MinMax.from_str(source.get_par("Strength"), float)
-        self.ruins = source.get_par("Ruins")
-
 
 class Place(CompiledPoint):
+    __slots__ = "star", "type", "object", "angle", "distance", "radius"
+
+    _schema = (
+        Field("star", STR, "Star"),
+        Field("type", Enum(pt_), "Type"),
+        Field("object", STR, "Object", when="self.type is not pt_.FREE"),
+        Field("angle", SINGLE, "Angle", when="self.type is pt_.FREE"),
+        Field("distance", SINGLE, "Distance",
+              when="self.type in (pt_.FREE, pt_.TO_STAR, pt_.FROM_SHIP)"),
+        Field("radius", INT, "Radius", when="self.type is not pt_.IN_PLANET"),
+        Field("angle", SINGLE, "Angle",
+              when="self.type in (pt_.TO_STAR, pt_.FROM_SHIP)"),
+    )
+
     def __init__(self, script, name):
         super().__init__(script, name)
         self.star: str = ""
@@ -733,65 +767,22 @@ class Place(CompiledPoint):
         self.distance: float = 0.0
         self.radius: int = 0
 
-    def save(self, s):
-        s.add_widestr(self.star)
-        s.add_uint(int(self.type))
-        if self.type is not pt_.FREE:
-            s.add_widestr(self.object)
-        if self.type is pt_.FREE:
-            s.add_single(self.angle)
-        if self.type in (pt_.FREE, pt_.TO_STAR, pt_.FROM_SHIP):
-            s.add_single(self.distance)
-        if self.type is not pt_.IN_PLANET:
-            s.add_int(self.radius)
-        if self.type in (pt_.TO_STAR, pt_.FROM_SHIP):
-            s.add_single(self.angle)
-
-    def load(self, s):
-        self.star = s.get_widestr()
-        self.type = pt_(s.get_uint())
-        if self.type is not pt_.FREE:
-            self.object = s.get_widestr()
-        if self.type is pt_.FREE:
-            self.angle = s.get_single()
-        if self.type in (pt_.FREE, pt_.TO_STAR, pt_.FROM_SHIP):
-            self.distance = s.get_single()
-        if self.type is not pt_.IN_PLANET:
-            self.radius = s.get_int()
-        if self.type in (pt_.TO_STAR, pt_.FROM_SHIP):
-            self.angle = s.get_single()
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("Star", str(self.star))
-        bp.add_par("Type", str(self.type))
-        if self.type is not pt_.FREE:
-            bp.add_par("Object", str(self.object))
-        if self.type is pt_.FREE:
-            bp.add_par("Angle", str(self.angle))
-        if self.type in (pt_.FREE, pt_.TO_STAR, pt_.FROM_SHIP):
-            bp.add_par("Distance", str(self.distance))
-        if self.type is not pt_.IN_PLANET:
-            bp.add_par("Radius", str(self.radius))
-        if self.type in (pt_.TO_STAR, pt_.FROM_SHIP):
-            bp.add_par("Angle", str(self.angle))
-
-    def restore(self, source):
-        self.star = source.get_par("Star")
-        self.type = pt_.from_str(source.get_par("Type"))
-        if self.type is not pt_.FREE:
-            self.object = source.get_par("Object")
-        if self.type is pt_.FREE:
-            self.angle = float(source.get_par("Angle"))
-        if self.type in (pt_.FREE, pt_.TO_STAR, pt_.FROM_SHIP):
-            self.distance = float(source.get_par("Distance"))
-        if self.type is not pt_.IN_PLANET:
-            self.radius = int(source.get_par("Radius"))
-        if self.type in (pt_.TO_STAR, pt_.FROM_SHIP):
-            self.angle = float(source.get_par("Angle"))
-
 
 class Item(CompiledPoint):
+    __slots__ = ("place", "kind", "type", "size", "level", "radius", "owner",
+                 "useless")
+
+    _schema = (
+        Field("place", STR, "Place"),
+        Field("kind", Enum(ic_), "Class"),
+        Field("type", UINT, "Type"),
+        Field("size", INT, "Size"),
+        Field("level", INT, "Level"),
+        Field("radius", INT, "Radius"),
+        Field("owner", Enum(Race), "Owner"),
+        Field("useless", STR, "Useless"),
+    )
+
     def __init__(self, script, name):
         super().__init__(script, name)
         self.place: str = ""
@@ -803,224 +794,104 @@ class Item(CompiledPoint):
         self.owner: Race = Race(0)
         self.useless: str = ""
 
-    def save(self, s):
-        s.add_widestr(self.place)
-        s.add_uint(int(self.kind))
-        s.add_uint(int(self.type))
-        s.add_int(self.size)
-        s.add_int(self.level)
-        s.add_int(self.radius)
-        s.add_uint(int(self.owner))
-        s.add_widestr(self.useless)
-
-    def load(self, s):
-        self.place = s.get_widestr()
-        self.kind = ic_(s.get_uint())
-        self.type = s.get_uint()
-        self.size = s.get_int()
-        self.level = s.get_int()
-        self.radius = s.get_int()
-        self.owner = Race(s.get_uint())
-        self.useless = s.get_widestr()
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("Place", str(self.place))
-        bp.add_par("Class", str(self.kind))
-        bp.add_par("Type", str(self.type))
-        bp.add_par("Size", str(self.size))
-        bp.add_par("Level", str(self.level))
-        bp.add_par("Radius", str(self.radius))
-        bp.add_par("Owner", str(self.owner))
-        bp.add_par("Useless", str(self.useless))
-
-    def restore(self, source):
-        self.place = source.get_par("Place")
-        self.kind = ic_.from_str(source.get_par("Class"))
-        self.type = int(source.get_par("Type"))
-        self.size = int(source.get_par("Size"))
-        self.level = int(source.get_par("Level"))
-        self.radius = int(source.get_par("Radius"))
-        self.owner = Race.from_str(source.get_par("Owner"))
-        self.useless = source.get_par("Useless")
-
 
 class Group(CompiledPoint):
+    __slots__ = ("planet", "state", "owner", "type", "weapon", "cargohook",
+                 "emptyspace", "friendship", "add_player", "search_distance",
+                 "dialog", "ruins",
+                 *_pair_slots("count", "speed", "rating", "score", "strength",
+                              "status_trader", "status_warrior",
+                              "status_pirate"))
+
+    count = _MinMaxSlot()
+    speed = _MinMaxSlot()
+    rating = _MinMaxSlot()
+    score = _MinMaxSlot()
+    status = _StatusSlot()
+    strength = _MinMaxSlot()
+
+    _schema = (
+        Field("planet", STR, "Planet"),
+        Field("state", Ref("states"), "State"),
+        Field("owner", Enum(o_), "Owner"),
+        Field("type", Enum(t_), "Type"),
+        Field("count", Pair.INT, "Count"),
+        Field("speed", Pair.INT, "Speed"),
+        Field("weapon", Enum(w_), "Weapon"),
+        Field("cargohook", INT, "CargoHook"),
+        Field("emptyspace", INT, "EmptySpace"),
+        Field("friendship", Enum(f_), "Friendship", until=7),
+        Field("add_player", BOOL, "AddPlayer"),
+        Field("rating", Pair.INT, "Rating", until=7),
+        Field("score", Pair.INT, "Score", until=7),
+        Field("status", STATUS, "Status"),
+        Field("search_distance", INT, "SearchDist"),
+        Field("dialog", STR, "Dialog"),
+        Field("strength", Pair.SINGLE, "Strength"),
+        Field("ruins", STR, "Ruins"),
+    )
+
     def __init__(self, script, name):
         super().__init__(script, name)
         self.planet: str = ""
         self.state: int = 0
         self.owner: o_ = o_(0)
         self.type: t_ = t_(0)
-        self.count: MinMax[int] = MinMax(0, 0)
-        self.speed: MinMax[int] = MinMax(0, 0)
+        self._count_min, self._count_max = 0, 0
+        self._speed_min, self._speed_max = 0, 0
         self.weapon: w_ = w_(0)
         self.cargohook: int = 0
         self.emptyspace: int = 0
         self.friendship: f_ = f_(0)
         self.add_player: bool = False
-        self.rating: MinMax[int] = MinMax(0, 0)
-        self.score: MinMax[int] = MinMax(0, 0)
-        self.status: Status = Status(MinMax(0, 0),
-                                     MinMax(0, 0),
-                                     MinMax(0, 0), )
+        self._rating_min, self._rating_max = 0, 0
+        self._score_min, self._score_max = 0, 0
+        self._status_trader_min, self._status_trader_max = 0, 0
+        self._status_warrior_min, self._status_warrior_max = 0, 0
+        self._status_pirate_min, self._status_pirate_max = 0, 0
         self.search_distance: int = 0
         self.dialog: str = ""
-        self.strength: MinMax[float] = MinMax(0.0, 0.0)
+        self._strength_min, self._strength_max = 0.0, 0.0
         self.ruins: str = ""
 
-    def save(self, s):
-        s.add_widestr(self.planet)
-        s.add_int(self.state)
-        s.add_uint(int(self.owner))
-        s.add_uint(int(self.type))
-        s.add_int(self.count.min)
-        s.add_int(self.count.max)
-        s.add_int(self.speed.min)
-        s.add_int(self.speed.max)
-        s.add_uint(int(self.weapon))
-        s.add_int(self.cargohook)
-        s.add_int(self.emptyspace)
-        if self._script.version < 7:
-            s.add_uint(int(self.friendship))
-        s.add_bool(self.add_player)
-        if self._script.version < 7:
-            s.add_int(self.rating.min)
-            s.add_int(self.rating.max)
-            s.add_int(self.score.min)
-            s.add_int(self.score.max)
-        s.add_int(self.status.trader.min)
-        s.add_int(self.status.trader.max)
-        s.add_int(self.status.warrior.min)
-        s.add_int(self.status.warrior.max)
-        s.add_int(self.status.pirate.min)
-        s.add_int(self.status.pirate.max)
-        s.add_int(self.search_distance)
-        s.add_widestr(self.dialog)
-        s.add_single(self.strength.min)
-        s.add_single(self.strength.max)
-        s.add_widestr(self.ruins)
-
-    def load(self, s):
-        self.planet = s.get_widestr()
-        self.state = s.get_int()
-        self.owner = o_(s.get_uint())
-        self.type = t_(s.get_uint())
-        self.count = MinMax(s.get_int(), s.get_int())
-        self.speed = MinMax(s.get_int(), s.get_int())
-        self.weapon = w_(s.get_uint())
-        self.cargohook = s.get_int()
-        self.emptyspace = s.get_int()
-        if self._script.version < 7:
-            self.friendship = f_(s.get_uint())
-        self.add_player = s.get_bool()
-        if self._script.version < 7:
-            self.rating = MinMax(s.get_int(), s.get_int())
-            self.score = MinMax(s.get_int(), s.get_int())
-        self.status = Status(MinMax(s.get_int(), s.get_int()),
-                             MinMax(s.get_int(), s.get_int()),
-                             MinMax(s.get_int(), s.get_int()))
-        self.search_distance = s.get_int()
-        self.dialog = s.get_widestr()
-        self.strength = MinMax(s.get_single(), s.get_single())
-        self.ruins = s.get_widestr()
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("Planet", str(self.planet))
-        bp.add_par("State", str(self._script.states[self.state].name) + \
-                        '(' + str(self.state) + ')')
-        bp.add_par("Owner", str(self.owner))
-        bp.add_par("Type", str(self.type))
-        bp.add_par("Count", str(self.count))
-        bp.add_par("Speed", str(self.speed))
-        bp.add_par("Weapon", str(self.weapon))
-        bp.add_par("CargoHook", str(self.cargohook))
-        bp.add_par("EmptySpace", str(self.emptyspace))
-        if self._script.version < 7:
-            bp.add_par("Friendship", str(self.friendship))
-        bp.add_par("AddPlayer", str(self.add_player))
-        if self._script.version < 7:
-            bp.add_par("Rating", str(self.rating))
-            bp.add_par("Score", str(self.score))
-        st = bp.add_block("Status", False)
-        st.add_par("Trader", str(self.status.trader))
-        st.add_par("Warrior", str(self.status.warrior))
-        st.add_par("Pirate", str(self.status.pirate))
-        bp.add_par("SearchDist", str(self.search_distance))
-        bp.add_par("Dialog", str(self.dialog))
-        bp.add_par("Strength", str(self.strength))
-        bp.add_par("Ruins", str(self.ruins))
-
-    def restore(self, source):
-        self.planet = source.get_par("Planet")
-        state = source.get_par("State")
-        start = state.find('(') + 1
-        end = state.find(')')
-        self.state = int(state[start:end])
-        self.owner = o_.from_str(source.get_par("Owner"))
-        self.type = t_.from_str(source.get_par("Type"))
-        self.count = MinMax.from_str(source.get_par("Count"), int)
-        self.speed = MinMax.from_str(source.get_par("Speed"), int)
-        self.weapon = w_.from_str(source.get_par("Weapon"))
-        self.cargohook = int(source.get_par("CargoHook"))
-        self.emptyspace = int(source.get_par("EmptySpace"))
-        if self._script.version < 7:
-            self.friendship = f_.from_str(source.get_par("Friendship"))
-        self.add_player = str_to_bool(source.get_par("AddPlayer"))
-        if self._script.version < 7:
-            self.rating = MinMax.from_str(source.get_par("Rating"), int)
-            self.score = MinMax.from_str(source.get_par("Score"), int)
-        status = source.get_block("Status")
-        self.status = Status(MinMax.from_str(status.get_par("Trader"), int),
-                             MinMax.from_str(status.get_par("Warrior"), int),
-                             MinMax.from_str(status.get_par("Pirate"), int))
-        del status
-        self.search_distance = int(source.get_par("SearchDist"))
-        self.dialog = source.get_par("Dialog")
-        self.strength = MinMax.from_str(source.get_par("Strength"), float)
-        self.ruins = source.get_par("Ruins")
-
 
 class GroupLink(CompiledPoint):
+    __slots__ = "begin", "end", "relations", *_pair_slots("war_weight")
+
+    war_weight = _MinMaxSlot()
+
+    _schema = (
+        Field("begin", INT, "Begin"),
+        Field("end", INT, "End"),
+        Field("relations", EnumPair(rel_), "Relations"),
+        Field("war_weight", Pair.SINGLE, "WarWeight"),
+    )
+
     def __init__(self, script, name):
         super().__init__(script, name)
         self.begin: int = 0
         self.end: int = 0
         self.relations: Tuple[rel_, rel_] = (rel_(0), rel_(0))
-        self.war_weight: MinMax[float] = MinMax(0.0, 0.0)
-
-    def save(self, s):
-        s.add_int(self.begin)
-        s.add_int(self.end)
-        s.add_int(int(self.relations[0]))
-        s.add_int(int(self.relations[1]))
-        s.add_single(self.war_weight.min)
-        s.add_single(self.war_weight.max)
-
-    def load(self, s):
-        self.begin = s.get_int()
-        self.end = s.get_int()
-        self.relations = (rel_(s.get_uint()), rel_(s.get_uint()))
-        self.war_weight = MinMax(s.get_single(), s.get_single())
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("Begin", str(self.begin))
-        bp.add_par("End", str(self.end))
-        bp.add_par("Relations", str(self.relations))
-        bp.add_par("WarWeight", str(self.war_weight))
-
-    def restore(self, source):
-        self.begin = int(source.get_par("Begin"))
-        self.end = int(source.get_par("End"))
-        relations = source.get_par("Relations").strip('()').split(',')
-        self.relations = (rel_.from_str(relations[0].strip()),
-                          rel_.from_str(relations[1].strip()))
-        self.war_weight = MinMax.from_str(source.get_par("WarWeight"), float)
+        self._war_weight_min, self._war_weight_max = 0.0, 0.0
 
 
 class State(CompiledPoint):
+    __slots__ = ("type", "object", "attack", "take_item", "take_all",
+                 "out_msg", "in_msg", "ether", "code")
+
+    _schema = (
+        Field("type", Enum(mt_), "Type"),
+        Field("object", STR, "Object",
+              when="self.type not in (mt_.NONE, mt_.FREE)"),
+        Field("attack", STRLIST, "Attack"),
+        Field("take_item", STR, "TakeItem"),
+        Field("take_all", BOOL, "TakeAll"),
+        Field("out_msg", STR, "OutMsg"),
+        Field("in_msg", STR, "InMsg"),
+        Field("ether", STR, "Ether"),
+        Field("code", STR, "Code"),
+    )
+
     def __init__(self, script, name):
         super().__init__(script, name)
         self.type: mt_ = mt_(0)
@@ -1033,130 +904,45 @@ class State(CompiledPoint):
         self.ether: str = ""
         self.code: str = ""
 
-    def save(self, s):
-        s.add_uint(int(self.type))
-        if self.type not in (mt_.NONE, mt_.FREE):
-            s.add_widestr(self.object)
-        s.add_uint(len(self.attack))
-        for e in self.attack:
-            s.add_widestr(e)
-        s.add_widestr(self.take_item)
-        s.add_bool(self.take_all)
-        s.add_widestr(self.out_msg)
-        s.add_widestr(self.in_msg)
-        s.add_widestr(self.ether)
-        s.add_widestr(self.code)
-
-    def load(self, s):
-        self.type = mt_(s.get_uint())
-        if self.type not in (mt_.NONE, mt_.FREE):
-            self.object = s.get_widestr()
-        for i in range(s.get_uint()):
-            self.attack.append(s.get_widestr())
-        self.take_item = s.get_widestr()
-        self.take_all = s.get_bool()
-        self.out_msg = s.get_widestr()
-        self.in_msg = s.get_widestr()
-        self.ether = s.get_widestr()
-        self.code = s.get_widestr()
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("Type", str(self.type))
-        if self.type not in (mt_.NONE, mt_.FREE):
-            bp.add_par("Object", str(self.object))
-        attack = bp.add_block("Attack", False)
-        for i, a in enumerate(self.attack):
-            attack.add_par(str(i), str(a))
-        bp.add_par("TakeItem", str(self.take_item))
-        bp.add_par("TakeAll", str(self.take_all))
-        bp.add_par("OutMsg", str(self.out_msg))
-        bp.add_par("InMsg", str(self.in_msg))
-        bp.add_par("Ether", str(self.ether))
-        bp.add_par("Code", self.code)
-
-    def restore(self, source):
-        self.type = mt_.from_str(source.get_par("Type"))
-        if self.type not in (mt_.NONE, mt_.FREE):
-            self.object = source.get_par("Object")
-        for par in source.get_block("Attack"):
-            self.attack.append(par.content)
-        self.take_item = source.get_par("TakeItem")
-        self.take_all = str_to_bool(source.get_par("TakeAll"))
-        self.out_msg = source.get_par("OutMsg")
-        self.in_msg = source.get_par("InMsg")
-        self.ether = source.get_par("Ether")
-
-        self.code = source.get_par("Code")
-
 
 class Dialog(CompiledPoint):
+    __slots__ = "code",
+
+    _schema = (
+        Field("code", STR, "Code"),
+    )
+
     def __init__(self, script, name):
         super().__init__(script, name)
         self.code: str = ""
 
-    def save(self, s):
-        s.add_widestr(self.code)
 
-    def load(self, s):
-        self.code = s.get_widestr()
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("Code", self.code)
-
-    def restore(self, source):
-        self.code = source.get_par("Code")
+class DialogMsg(CompiledPoint):
+    __slots__ = "command", "code"
 
+    _schema = (
+        Field("command", STR, "Name"),
+        Field("code", STR, "Code"),
+    )
 
-class DialogMsg(CompiledPoint):
     def __init__(self, script, name):
         super().__init__(script, name)
         self.command: str = ""
         self.code: str = ""
 
-    def save(self, s):
-        s.add_widestr(self.command)
-        s.add_widestr(self.code)
-
-    def load(self, s):
-        self.command = s.get_widestr()
-        self.code = s.get_widestr()
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("Name", str(self.command))
-        bp.add_par("Code", self.code)
 
-    def restore(self, source):
-        self.command = source.get_par("Name")
-        self.code = source.get_par("Code")
+class DialogAnswer(CompiledPoint):
+    __slots__ = "command", "answer", "code"
 
+    _schema = (
+        Field("command", STR, "Command"),
+        Field("answer", STRIPPED, "Answer"),
+        Field("code", STR, "Code"),
+    )
 
-class DialogAnswer(CompiledPoint):
     def __init__(self, script, name):
         super().__init__(script, name)
         self.command: str = ""
         self.answer: str = ""
         self.code: str = ""
 
-    def save(self, s):
-        s.add_widestr(self.command)
-        s.add_widestr(self.answer)
-        s.add_widestr(self.code)
-
-    def load(self, s):
-        self.command = s.get_widestr()
-        self.answer = s.get_widestr().strip()
-        self.code = s.get_widestr()
-
-    def dump(self, root):
-        bp = root.add_block(str(self.name), False)
-        bp.add_par("Command", str(self.command))
-        bp.add_par("Answer", str(self.answer))
-        bp.add_par("Code", self.code)
-
-    def restore(self, source):
-        self.command = source.get_par("Command")
-        self.answer = source.get_par("Answer")
-        self.code = source.get_par("Code")
@@ -0,0 +1,296 @@
+__all__ = [
+    "MANIFEST", "dump_shards", "restore_shards",
+]
+
+import io
+import marshal
+import os
+import re
+from typing import List, Optional, Tuple
+
+from rangers.blockpar import BlockPar
+from rscript.file.bptext import BlockParReader, BlockParWriter, Section
+from rscript.file.scr import CompiledScript
+
+# Bumped whenever stored shard cache changes
+_FORMAT = 2
+
+MANIFEST = "manifest.txt"
+
+_ENCODING = 'cp1251'
+
+# Script wide values, kept together in one shard
+_SCRIPT = "Script"
+_VALUES = ("GlobalCode", "Constellations", "InitCode", "TurnCode",
+           "DialogBegin")
+
+# Code-heavy sections get a shard per record
+_PER_RECORD = ("States", "Dialogs", "DialogMsgs", "DialogAnswers")
+
+# Sections written as sorted blocks by CompiledScript.dump
+_SORTED = ("Dialogs",)
+
+# Fewer shards to read are read in this process, unless jobs is given
+_PARALLEL = 64
+
+# Characters kept as is in file names of record shards
+_UNSAFE = re.compile(r"[^\w\-. ]|^[. ]|[. ]$")
+
+
+def _write(directory, name, text) -> bool:
+    """
+    Writes shard unless the file already has the same content, so mtime
+    of unchanged shards is kept
+    """
+    data = text.encode(_ENCODING)
+    path = os.path.join(directory, *name.split('/'))
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def _record_text(script, section, e):
+    out = io.StringIO(newline='')
+    bp = BlockParWriter(out)
+    bp.add_par("Version", str(script.version))
+    e.dump(bp.add_block(section, section in _SORTED))
+    bp.close()
+    return out.getvalue()
+
+
+def _file_name(name: str, used: set) -> str:
+    """
+    File name of a record shard: the record name with characters unsafe
+    in file names written as %XX; names equal but for case get a ~N suffix
+    """
+    file = _UNSAFE.sub(lambda m: "".join(f"%{b:02X}" for b in
+                                         m.group().encode('utf-8')),
+                       name) or "%"
+    key = file.casefold()
+    n = 1
+    while key in used:
+        n += 1
+        key = f"{file}~{n}".casefold()
+    used.add(key)
+    return file if n == 1 else f"{file}~{n}"
+
+
+def dump_shards(script: CompiledScript, directory: str) -> int:
+    """
+    Writes the dump of the script as a directory of shards.
+
+    Script wide values go to Script.txt, every section to <Section>.txt,
+    except non-empty sections with code, which get <Section>/<name>.txt
+    per record, so adding or removing a record leaves shards of the others
+    as they are. Records of DialogMsgs and DialogAnswers are named by index.
+    Each shard is a complete dump restorable by itself; the manifest lists
+    shards in the order of records. Shards whose content has not changed
+    are not rewritten, stale record shards are removed.
+
+    :return: number of written shards
+    """
+    shards = []
+    written = 0
+
+    def shard(section, name, text):
+        nonlocal written
+        shards.append((section, name))
+        written += _write(directory, name, text)
+
+    out = io.StringIO(newline='')
+    script.dump(out, _VALUES)
+    shard(_SCRIPT, _SCRIPT + ".txt", out.getvalue())
+
+    sections = script._record_sections()
+    for section in CompiledScript.sections:
+        if section not in sections:
+            continue
+        records = sections[section][1]
+        # A section without records still gets its shard, so restore
+        # finds every section
+        if section in _PER_RECORD and records:
+            names = set()
+            used = set()
+            for e in records:
+                name = f"{section}/{_file_name(e.name, used)}.txt"
+                names.add(name)
+                shard(section, name, _record_text(script, section, e))
+        else:
+            names = set()
+            out = io.StringIO(newline='')
+            script.dump(out, (section,))
+            shard(section, section + ".txt", out.getvalue())
+        if section in _PER_RECORD:
+            folder = os.path.join(directory, section)
+            if os.path.isdir(folder):
+                for file in os.listdir(folder):
+                    if file.endswith(".txt") and \
+                            f"{section}/{file}" not in names:
+                        os.remove(os.path.join(folder, file))
+            if records:
+                path = os.path.join(directory, section + ".txt")
+                if os.path.exists(path):
+                    os.remove(path)
+
+    out = io.StringIO(newline='')
+    bp = BlockParWriter(out)
+    bp.add_par("Version", str(script.version))
+    nbp = bp.add_block("Shards", False)
+    for section, name in shards:
+        nbp.add_par(section, name)
+    bp.close()
+    written += _write(directory, MANIFEST, out.getvalue())
+    return written
+
+
+def _read_manifest(directory) -> Tuple[int, List[str]]:
+    version = None
+    shards = []
+    with open(os.path.join(directory, MANIFEST), 'rt', encoding=_ENCODING,
+              newline='') as f:
+        for name, content in BlockParReader(f):
+            if name == "Version":
+                version = int(content)
+            elif name == "Shards":
+                shards = [value for _, value in content]
+    if version not in CompiledScript.supported:
+        raise Exception("restore_shards. Unsupported version")
+    return version, shards
+
+
+def _tree(section: Section):
+    """
+    Contents of a block as (sorted, [(name, value or tree), ...]), which
+    travels between processes and into the cache
+    """
+    return section.sorted, [
+        (name, _tree(value) if isinstance(value, Section) else value)
+        for name, value in section]
+
+
+def _blockpar(tree, root: BlockPar = None) -> BlockPar:
+    sort, items = tree
+    if root is None:
+        root = BlockPar(sort=sort)
+    for name, value in items:
+        if isinstance(value, tuple):
+            _blockpar(value, root.add_block(name, value[0]))
+        else:
+            root.add_par(name, value)
+    return root
+
+
+class _Block:
+    """
+    Block of a record read from a shard, as CompiledScript._restore
+    takes it
+    """
+    __slots__ = "_tree",
+
+    def __init__(self, tree):
+        self._tree = tree
+
+    def to_blockpar(self) -> BlockPar:
+        return _blockpar(self._tree)
+
+
+def _read_shard(path):
+    """
+    Reads a shard into plain values, so it travels between processes and
+    into the cache
+
+    :return: [(name, value), ...] of script values and
+             [(section, [(record name, tree), ...]), ...] of records in
+             the order of the shard
+    """
+    sections = CompiledScript()._record_sections()
+    content = []
+    with open(path, 'rt', encoding=_ENCODING, newline='') as f:
+        for name, value in BlockParReader(f):
+            if name in sections:
+                content.append((name, [(ename, _tree(block))
+                                       for ename, block in value]))
+            elif name != "Version":
+                content.append((name, value))
+    return content
+
+
+def _load_cache(path, version):
+    try:
+        with open(path, 'rb') as f:
+            fmt, cached_version, entries = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+    if fmt != _FORMAT or cached_version != version or \
+            not isinstance(entries, dict):
+        return {}
+    return entries
+
+
+def restore_shards(script: CompiledScript, directory: str, *,
+                   jobs: Optional[int] = None, cache: str = None) -> int:
+    """
+    Restores the script from a dump written by dump_shards. Many shards
+    are read in parallel processes, a few in this one. Like restore, fails
+    with ValueError when shards of the manifest miss some sections.
+
+    :param jobs: number of processes; 1 reads in this process, None picks
+                 by the number of shards to read
+    :param cache: file of already read shards; a shard is read again only
+                  when its mtime or size has changed
+    :return: number of read shards
+    """
+    version, shards = _read_manifest(directory)
+    script.version = version
+
+    old = _load_cache(cache, version) if cache is not None else {}
+    entries = {}
+    todo = []
+    for name in dict.fromkeys(shards):
+        path = os.path.join(directory, *name.split('/'))
+        st = os.stat(path)
+        entry = old.get(name)
+        if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+            entries[name] = entry
+        else:
+            todo.append((name, path, st))
+
+    paths = [path for _, path, _ in todo]
+    if jobs == 1 or len(paths) <= 1 or \
+            (jobs is None and len(paths) < _PARALLEL):
+        results = map(_read_shard, paths)
+        pool = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        results = pool.map(_read_shard, paths, chunksize=16)
+    try:
+        for (name, _, st), content in zip(todo, results):
+            entries[name] = (st.st_mtime_ns, st.st_size, content)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # Records are restored here from the read blocks, as from a dump
+    # read in one piece
+    found = {"Version"}
+    for name in shards:
+        found |= script._restore(
+            [(section, [(ename, _Block(tree)) for ename, tree in value])
+             if isinstance(value, list) else (section, value)
+             for section, value in entries[name][2]],
+            complete=False)
+    script._check_sections(found)
+
+    if cache is not None:
+        tmp = cache + '.tmp'
+        with open(tmp, 'wb') as f:
+            marshal.dump((_FORMAT, version, entries), f)
+        os.replace(tmp, cache)
+    return len(todo)
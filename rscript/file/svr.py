@@ -49,6 +49,14 @@ class SourceScript:
         # end.pos = near_point(begin.pos)
         return gl
 
+    def layout(self, **kwargs):
+        """
+        Computes positions of all graph points at once,
+        see rscript.file.layout.layout (requires numpy)
+        """
+        from rscript.file.layout import layout
+        layout(self, **kwargs)
+
     def find(self, name):
         if name == "": return None
         for gp in self.graphpoints:
@@ -0,0 +1,221 @@
+__all__ = [
+    "Document", "TextIndex", "text_fields", "ct_keys", "load_lang",
+]
+
+import marshal
+import os
+import re
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from rangers.blockpar import BlockPar
+from rscript.file.bptext import BlockParReader
+from rscript.file.scr import CompiledScript
+from rscript.file.usage import code_blocks
+from rscript.lang.ast import TokenType, insignificant
+from rscript.lang.lexer import Lexer
+
+# Bumped whenever stored index changes
+_FORMAT = 1
+
+_word = re.compile(r"\w+")
+_query = re.compile(r'"([^"]*)"|(\S+)')
+
+Document = namedtuple("Document", "script section record field text")
+
+
+def text_fields(script: CompiledScript) -> Iterator[Tuple[str, str, str, str]]:
+    """
+    Player-facing text of the script as (section, record, field, text)
+    """
+    for e in script.states:
+        yield "States", e.name, "OutMsg", e.out_msg
+        yield "States", e.name, "InMsg", e.in_msg
+        yield "States", e.name, "Ether", e.ether
+    for e in script.dialog_msgs:
+        yield "DialogMsgs", e.name, "Command", e.command
+    for e in script.dialog_answers:
+        yield "DialogAnswers", e.name, "Answer", e.answer
+
+
+def ct_keys(code: str) -> List[str]:
+    """
+    String keys passed to CT() in the code
+    """
+    tokens = [t for t in Lexer(code).iter_tokens() if t.type not in insignificant]
+    result = []
+    for i in range(len(tokens) - 2):
+        t = tokens[i]
+        if t.type is TokenType.IDENTIFIER and t.lexeme == "CT" and \
+                tokens[i + 1].type is TokenType.LPAREN and \
+                tokens[i + 2].type is TokenType.STRING:
+            result.append(tokens[i + 2].literal)
+    return result
+
+
+def load_lang(f: TextIO) -> BlockPar:
+    """
+    Reads a language file in BlockPar text format
+    """
+    return BlockParReader(f).to_blockpar()
+
+
+def _resolve(lang, key):
+    """
+    Text of a dotted key in the language BlockPar, the same way CT() finds
+    it, or None
+    """
+    result = lang
+    try:
+        for p in key.split('.'):
+            result = result[p][0].content
+    except (IndexError, KeyError, TypeError, AttributeError):
+        return None
+    return result if isinstance(result, str) else None
+
+
+def _words(text):
+    return _word.findall(text.lower())
+
+
+def _script_texts(path):
+    """
+    Raw texts of a script: fields as they are and CT() keys from code.
+    None when the script can't be read
+    """
+    script = CompiledScript()
+    try:
+        with open(path, 'rb') as f:
+            script.load(f)
+        texts = [t for t in text_fields(script) if t[3]]
+        for section, record, code in code_blocks(script):
+            for key in ct_keys(code):
+                texts.append((section, record, "CT", key))
+    except Exception:
+        return None
+    return texts
+
+
+class TextIndex:
+    """
+    Full-text index of player-facing text of compiled scripts.
+
+    Every text field (and every CT() key found in code) is a document.
+    Words are lower-cased \\w+ runs; a term keeps the (document, position)
+    pairs of its occurrences packed in an unsigned int array. Terms are
+    kept sorted, so a prefix query is a range of them, and positions make
+    phrase queries possible.
+    """
+
+    def __init__(self):
+        self.docs: List[Document] = []
+        self.failed: List[str] = []
+        self._terms: List[str] = []
+        self._postings: List[bytes] = []
+
+    def build(self, paths: Iterable[str], *, lang: BlockPar = None,
+              jobs: Optional[int] = None):
+        """
+        Indexes scripts, reading them in parallel processes
+
+        :param lang: language BlockPar to resolve keys of texts with;
+                     a text that is not a key is indexed as is
+        """
+        paths = list(paths)
+        docs = []
+        occurrences = {}
+        self.failed = []
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for path, texts in zip(paths, pool.map(_script_texts, paths,
+                                                   chunksize=4)):
+                if texts is None:
+                    self.failed.append(path)
+                    continue
+                for section, record, field, text in texts:
+                    if lang is not None:
+                        resolved = _resolve(lang, text)
+                        if resolved is not None:
+                            text = resolved
+                    doc = len(docs)
+                    docs.append(Document(path, section, record, field, text))
+                    for pos, word in enumerate(_words(text)):
+                        occurrences.setdefault(word, []).extend((doc, pos))
+
+        self.docs = docs
+        self._terms = sorted(occurrences)
+        self._postings = [array('I', occurrences[t]).tobytes()
+                          for t in self._terms]
+
+    def load(self, path: str):
+        """
+        Reads index file; missing or incompatible file gives an empty index
+        """
+        try:
+            with open(path, 'rb') as f:
+                fmt, docs, terms, postings = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if fmt == _FORMAT:
+            self.docs = [Document(*d) for d in docs]
+            self._terms = terms
+            self._postings = postings
+
+    def save(self, path: str):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            marshal.dump((_FORMAT, [tuple(d) for d in self.docs],
+                          self._terms, self._postings), f)
+        os.replace(tmp, path)
+
+    def _occurrences(self, term):
+        i = bisect_left(self._terms, term)
+        if i < len(self._terms) and self._terms[i] == term:
+            return array('I', self._postings[i])
+        return array('I')
+
+    def _term_docs(self, term) -> Set[int]:
+        return set(self._occurrences(term)[::2])
+
+    def _prefix_docs(self, prefix) -> Set[int]:
+        result = set()
+        i = bisect_left(self._terms, prefix)
+        while i < len(self._terms) and self._terms[i].startswith(prefix):
+            result.update(array('I', self._postings[i])[::2])
+            i += 1
+        return result
+
+    def _phrase_docs(self, words) -> Set[int]:
+        if not words:
+            return set()
+        found = self._occurrences(words[0])
+        candidates = set(zip(found[::2], found[1::2]))
+        for shift, word in enumerate(words[1:], 1):
+            found = self._occurrences(word)
+            at = set(zip(found[::2], found[1::2]))
+            candidates = {(d, p) for d, p in candidates if (d, p + shift) in at}
+            if not candidates:
+                break
+        return {d for d, _ in candidates}
+
+    def search(self, query: str) -> List[Document]:
+        """
+        Documents matching every part of the query. Parts are words,
+        word prefixes ending with '*' and "quoted phrases"
+        """
+        result = None
+        for phrase, word in _query.findall(query):
+            if phrase:
+                docs = self._phrase_docs(_words(phrase))
+            elif word.endswith('*'):
+                docs = self._prefix_docs(word[:-1].lower())
+            else:
+                words = _words(word)
+                docs = self._phrase_docs(words) if len(words) > 1 else \
+                    self._term_docs(words[0]) if words else set()
+            result = docs if result is None else result & docs
+            if not result:
+                break
+        return [self.docs[d] for d in sorted(result or ())]
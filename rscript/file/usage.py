@@ -0,0 +1,241 @@
+__all__ = [
+    "Usage", "UsageIndex", "code_blocks", "scan_code",
+]
+
+import marshal
+import os
+import struct
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rscript.file.scr import CompiledScript
+from rscript.lang.ast import TokenType, insignificant
+from rscript.lang.lexer import Lexer
+
+# Bumped whenever stored postings change
+_FORMAT = 2
+
+Usage = namedtuple("Usage", "script section record line column kind")
+
+# Errors of reading a broken or unsupported script, other errors are bugs
+_LOAD_ERRORS = (OSError, EOFError, ValueError, struct.error)
+
+# kinds of identifier usage
+CALL = "call"
+WRITE = "write"
+READ = "read"
+
+
+def code_blocks(script: CompiledScript) -> Iterator[Tuple[str, str, str]]:
+    """
+    All code of the script as (section, record, code). Script wide code
+    has section "Script" and the name of the code as record
+    """
+    yield "Script", "GlobalCode", script.globalcode
+    yield "Script", "InitCode", script.initcode
+    yield "Script", "TurnCode", script.turncode
+    yield "Script", "DialogBegin", script.dialogbegincode
+    for e in script.states:
+        yield "States", e.name, e.code
+    for e in script.dialogs:
+        yield "Dialogs", e.name, e.code
+    for e in script.dialog_msgs:
+        yield "DialogMsgs", e.name, e.code
+    for e in script.dialog_answers:
+        yield "DialogAnswers", e.name, e.code
+
+
+def scan_code(code: str) -> List[Tuple[str, int, int, str]]:
+    """
+    Identifiers of the code as (name, line, column, kind). Kind is taken
+    from the next significant token: call before '(', write before '=',
+    read otherwise
+    """
+    tokens = [t for t in Lexer(code).iter_tokens() if t.type not in insignificant]
+    result = []
+    for i, t in enumerate(tokens):
+        if t.type is not TokenType.IDENTIFIER:
+            continue
+        after = tokens[i + 1].type if i + 1 < len(tokens) else None
+        if after is TokenType.LPAREN:
+            kind = CALL
+        elif after is TokenType.ASSIGN:
+            kind = WRITE
+        else:
+            kind = READ
+        result.append((t.lexeme, t.line, t.column, kind))
+    return result
+
+
+def _digest(path):
+    h = blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.digest()
+
+
+def _index_file(path):
+    """
+    :return: digest of the file, postings by name:
+             {name: [(section, record, line, column, kind), ...]}
+             and None, or None, None and the reason when the script
+             can't be read
+    """
+    script = CompiledScript()
+    try:
+        digest = _digest(path)
+        with open(path, 'rb') as f:
+            script.load(f)
+    except _LOAD_ERRORS as e:
+        return None, None, str(e) or type(e).__name__
+    postings = {}
+    for section, record, code in code_blocks(script):
+        for name, line, column, kind in scan_code(code):
+            postings.setdefault(name, []).append(
+                (section, record, line, column, kind))
+    return digest, postings, None
+
+
+def _under(path, roots):
+    path = os.path.normpath(path)
+    for root in roots:
+        if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+            return True
+    return False
+
+
+class UsageIndex:
+    """
+    Inverted index of identifiers used in code of compiled scripts.
+
+    Postings are kept by identifier and then by script: {name: {path:
+    [(section, record, line, column, kind), ...]}}, so a query is a dict
+    lookup. An update only rescans scripts whose size, mtime and then
+    content digest have changed, and replaces postings of these scripts.
+    """
+
+    def __init__(self):
+        # path -> (mtime_ns, size, digest, names used in the script)
+        self._files: Dict[str, tuple] = {}
+        self._names: Dict[str, Dict[str, list]] = {}
+        # path -> why the script can't be read, after the latest update
+        self.failed: Dict[str, str] = {}
+
+    def load(self, path: str):
+        """
+        Reads index file; missing or incompatible file gives an empty index
+        """
+        try:
+            with open(path, 'rb') as f:
+                fmt, files, names = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if fmt == _FORMAT and isinstance(files, dict) and \
+                isinstance(names, dict):
+            self._files = files
+            self._names = names
+
+    def save(self, path: str):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            marshal.dump((_FORMAT, self._files, self._names), f)
+        os.replace(tmp, path)
+
+    def _remove(self, path):
+        entry = self._files.pop(path, None)
+        if entry is None:
+            return
+        for name in entry[3]:
+            scripts = self._names.get(name)
+            if scripts is not None:
+                scripts.pop(path, None)
+                if not scripts:
+                    del self._names[name]
+
+    def _add(self, path, st, digest, postings):
+        self._remove(path)
+        self._files[path] = (st.st_mtime_ns, st.st_size, digest,
+                             tuple(postings))
+        for name, usages in postings.items():
+            self._names.setdefault(name, {})[path] = usages
+
+    def update(self, paths: Iterable[str], *,
+               roots: Iterable[str] = None,
+               jobs: Optional[int] = None) -> int:
+        """
+        Brings the index in line with the scripts: changed and new scripts
+        are rescanned in parallel processes. Indexed scripts that are under
+        the roots but not among the paths are dropped, scripts elsewhere
+        are kept
+
+        :param paths: scripts found under the roots
+        :param roots: scanned files and directories, the paths by default
+        :return: number of rescanned scripts
+        """
+        paths = list(dict.fromkeys(paths))
+        roots = [os.path.normpath(root)
+                 for root in (paths if roots is None else roots)]
+        self.failed = {}
+
+        listed = set(paths)
+        for path in list(self._files):
+            if path not in listed and _under(path, roots):
+                self._remove(path)
+
+        todo = []
+        for path in paths:
+            entry = self._files.get(path)
+            try:
+                st = os.stat(path)
+                if entry is not None and \
+                        entry[:2] == (st.st_mtime_ns, st.st_size):
+                    continue
+                if entry is not None and entry[2] == _digest(path):
+                    self._files[path] = (st.st_mtime_ns, st.st_size) + \
+                        entry[2:]
+                    continue
+            except FileNotFoundError as e:
+                self._remove(path)
+                self.failed[path] = e.strerror
+                continue
+            todo.append((path, st))
+
+        if len(todo) > 1 and jobs != 1:
+            pool = ProcessPoolExecutor(max_workers=jobs)
+            results = pool.map(_index_file, [p for p, _ in todo], chunksize=4)
+        else:
+            pool = None
+            results = map(_index_file, [p for p, _ in todo])
+        try:
+            for (path, st), (digest, postings, error) in zip(todo, results):
+                if postings is None:
+                    self._remove(path)
+                    self.failed[path] = error
+                else:
+                    self._add(path, st, digest, postings)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return len(todo)
+
+    def find(self, name: str, kind: Optional[str] = None) -> List[Usage]:
+        """
+        Every usage of the identifier, optionally of one kind
+        ("call", "write" or "read")
+        """
+        result = []
+        for path, postings in self._names.get(name, {}).items():
+            for section, record, line, column, k in postings:
+                if kind is None or k == kind:
+                    result.append(Usage(path, section, record,
+                                        line, column, k))
+        return result
+
+    def names(self) -> List[str]:
+        """
+        All indexed identifiers
+        """
+        return sorted(self._names)
@@ -1,13 +1,14 @@
 __all__ = [
     "Point", "Rect", "MinMax", "Status",
-    "str_to_bool", "str_to_heredoc",
-    "bytes_xor", "bytes_to_int", "bytes_to_uint",
+    "str_to_bool", "str_to_heredoc", "script_files",
+    "bytes_xor", "xor_key", "xor_key_into", "xor_stream_into",
+    "bytes_to_int", "bytes_to_uint",
     "int_to_bytes", "uint_to_bytes", "rgb_to_dword",
     "random_point", "near_point",
 ]
 
-from typing import Type, TypeVar, Generic
-from random import randint
+import os
+from typing import Iterable, List, Type, TypeVar, Generic
 
 
 def sin(x):
@@ -105,11 +106,93 @@ def str_to_bool(s):
 
 def bytes_xor(a, b):
     """
+    XOR of two buffers, truncated to the shorter one
+
     :type a: bytes
     :type b: bytes
     :rtype : bytes
     """
-    return bytes(_a ^ _b for (_a, _b) in zip(a, b))
+    n = min(len(a), len(b))
+    return (int.from_bytes(a[:n], 'little') ^
+            int.from_bytes(b[:n], 'little')).to_bytes(n, 'little')
+
+
+# Whole buffers are XORed in chunks of about this size, which keeps
+# temporary objects small and the work in C
+_XOR_CHUNK = 1 << 18
+
+_numpy = None
+
+
+def _xor_part(part, pattern):
+    """
+    part ^= pattern for a writable memoryview, with NumPy if it is
+    installed and as big integers otherwise
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    if _numpy:
+        a = _numpy.frombuffer(part, _numpy.uint8)
+        _numpy.bitwise_xor(a, _numpy.frombuffer(pattern, _numpy.uint8), out=a)
+    else:
+        part[:] = (int.from_bytes(part, 'little') ^
+                   int.from_bytes(pattern, 'little')).to_bytes(len(part),
+                                                                'little')
+
+
+def xor_key_into(buf, key):
+    """
+    XORs a writable buffer with a repeating key in place
+
+    :type buf: bytearray|memoryview
+    :type key: bytes
+    """
+    if not key:
+        raise ValueError("xor_key_into. Empty key")
+    mv = memoryview(buf).cast('B')
+    step = max(_XOR_CHUNK // len(key), 1) * len(key)
+    pattern = key * (step // len(key))
+    for start in range(0, len(mv), step):
+        part = mv[start:start + step]
+        _xor_part(part, pattern[:len(part)])
+
+
+def xor_key(data, key):
+    """
+    XOR of data with a repeating key
+
+    :type data: bytes
+    :type key: bytes
+    :rtype: bytes
+    """
+    buf = bytearray(data)
+    xor_key_into(buf, key)
+    return bytes(buf)
+
+
+def xor_stream_into(buf, stream):
+    """
+    XORs a writable buffer with a keystream in place
+
+    :type buf: bytearray|memoryview
+    :param stream: iterable of keystream chunks of any size
+    :type stream: Iterable[bytes]
+    """
+    mv = memoryview(buf).cast('B')
+    pos = 0
+    chunks = iter(stream)
+    while pos < len(mv):
+        chunk = next(chunks, None)
+        if chunk is None:
+            raise ValueError("xor_stream_into. Keystream is too short")
+        chunk = chunk[:len(mv) - pos]
+        _xor_part(mv[pos:pos + len(chunk)], chunk)
+        pos += len(chunk)
 
 
 def bytes_to_int(a):
@@ -133,16 +216,36 @@ def str_to_heredoc(s):
     return '\x0d\x0a'.join(result)
 
 
+def script_files(paths: Iterable[str]) -> List[str]:
+    """
+    Compiled scripts given by paths: files as they are, directories
+    replaced by *.scr files in them sorted by name
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith('.scr'):
+                    files.append(os.path.join(path, name))
+        else:
+            files.append(path)
+    return files
+
+
 def rgb_to_dword(r, g, b):
     return (b << 16) | (g << 8) | r
 
 
 def random_point(rect=Rect(80, 0, 800, 1000)):
+    from random import randint
     return Point(randint(rect.left, rect.right),
                  randint(rect.top, rect.bottom))
 
 
-def near_point(pos=random_point(), radius=60):
+def near_point(pos=None, radius=60):
+    from random import randint
+    if pos is None:
+        pos = random_point()
     angle = randint(0, 360)
     sh_x = cos(angle) * radius
     sh_y = sin(angle) * radius
@@ -0,0 +1,111 @@
+__all__ = [
+    "Problem", "validate", "validate_files",
+]
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from rscript.file.scr import CompiledScript
+
+
+class Problem:
+    """
+    Broken reference found in a compiled script
+    """
+    __slots__ = "section", "record", "field", "message"
+
+    def __init__(self, section: str, record: str, field: str, message: str):
+        self.section = section
+        self.record = record
+        self.field = field
+        self.message = message
+
+    def __repr__(self):
+        return f"Problem({self.section!r}, {self.record!r}, " \
+               f"{self.field!r}, {self.message!r})"
+
+    def __str__(self):
+        return f"{self.section}.{self.record}.{self.field}: {self.message}"
+
+
+def validate(script: CompiledScript) -> List[Problem]:
+    """
+    Checks all cross-references of the script and returns every problem.
+
+    Name tables are built once, so the check takes linear time.
+    """
+    problems = []
+
+    def check_index(section, e, field, value, target, count):
+        if not 0 <= value < count:
+            problems.append(Problem(
+                section, e.name, field,
+                f"index {value} is out of {target} range 0..{count - 1}"))
+
+    def check_name(section, e, field, value, target, names):
+        if value != "" and value not in names:
+            problems.append(Problem(
+                section, e.name, field, f"unknown {target} '{value}'"))
+
+    stars = {e.name for e in script.stars}
+    planets = {p.name for e in script.stars for p in e.planets}
+    places = {e.name for e in script.places}
+    items = {e.name for e in script.items}
+    groups = {e.name for e in script.groups}
+    dialogs = {e.name for e in script.dialogs}
+
+    for e in script.stars:
+        for sl in e.starlinks:
+            check_index("Stars", e, f"StarLinks.{sl.name}.EndStar",
+                        sl.end_star, "star", len(script.stars))
+        for p in e.planets:
+            check_name("Stars", e, f"Planets.{p.name}.Dialog",
+                       p.dialog, "dialog", dialogs)
+
+    for e in script.places:
+        check_name("Places", e, "Star", e.star, "star", stars)
+
+    for e in script.items:
+        check_name("Items", e, "Place", e.place, "place", places)
+
+    for e in script.groups:
+        check_name("Groups", e, "Planet", e.planet, "planet", planets)
+        check_index("Groups", e, "State", e.state, "state", len(script.states))
+        check_name("Groups", e, "Dialog", e.dialog, "dialog", dialogs)
+
+    for e in script.grouplinks:
+        check_index("GroupLinks", e, "Begin", e.begin, "group",
+                    len(script.groups))
+        check_index("GroupLinks", e, "End", e.end, "group",
+                    len(script.groups))
+
+    for e in script.states:
+        for i, a in enumerate(e.attack):
+            check_name("States", e, f"Attack.{i}", a, "group", groups)
+        check_name("States", e, "TakeItem", e.take_item, "item", items)
+
+    return problems
+
+
+def _validate_file(path: str) -> List[Problem]:
+    script = CompiledScript()
+    try:
+        with open(path, 'rb') as f:
+            script.load(f)
+    except Exception as e:
+        return [Problem("", "", "", f"can't load script: {e}")]
+    return validate(script)
+
+
+def validate_files(paths: Iterable[str], *,
+                   jobs: Optional[int] = None) -> Dict[str, List[Problem]]:
+    """
+    Validates compiled scripts in parallel processes
+
+    :param jobs: number of worker processes, CPU count by default
+    :return: problems of every script by its path
+    """
+    paths = list(paths)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return dict(zip(paths, pool.map(_validate_file, paths,
+                                        chunksize=4)))
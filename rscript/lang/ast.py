@@ -1,9 +1,10 @@
-__all__ = ["Visitor", "TokenType", "Token", "insignificant", "Expr", "Stmt",
-           "LiteralExpr", "VariableExpr", "AccessExpr", "CallExpr", "ArrayExpr",
-           "GroupExpr", "UnaryExpr", "BinaryExpr", "AssignExpr", "VarDeclExpr",
-           "ExpressionStmt", "VarDeclStmt", "FunctionStmt", "ClassStmt",
-           "IfStmt", "WhileStmt", "ForStmt", "TryStmt", "ThrowStmt",
-           "KeywordStmt", "BlockStmt", "ExprType", "StmtType"]
+__all__ = ["Visitor", "Transformer", "TokenType", "Token", "insignificant",
+           "Expr", "Stmt", "LiteralExpr", "VariableExpr", "AccessExpr",
+           "CallExpr", "ArrayExpr", "GroupExpr", "UnaryExpr", "BinaryExpr",
+           "AssignExpr", "VarDeclExpr", "ExpressionStmt", "VarDeclStmt",
+           "FunctionStmt", "ClassStmt", "IfStmt", "WhileStmt", "ForStmt",
+           "TryStmt", "ThrowStmt", "KeywordStmt", "BlockStmt", "ExprType",
+           "StmtType"]
 
 from abc import ABC, abstractmethod
 from enum import Enum
@@ -434,7 +435,74 @@ class KeywordStmt(Stmt):
         return visitor.visit_keyword_stmt(self)
 
 
+def _handler_name(node_cls):
+    """
+    visit_token for Token, visit_<name>_expr for <Name>Expr and
+    visit_<name>_stmt for <Name>Stmt
+    """
+    if node_cls is Token:
+        return "visit_token"
+    name = node_cls.__name__
+    return f"visit_{name[:-4].lower()}_{name[-4:].lower()}"
+
+
+def _node_classes(cls=CodeUnit):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _node_classes(sub)
+
+
+# Handler of every node class, used by Visitor.visit
+_handler_names = {
+    node_cls: _handler_name(node_cls)
+    for node_cls in (Token,) + tuple(c for base in (Expr, Stmt)
+                                     for c in base.__subclasses__())
+}
+
+
+def _dispatch(visitor):
+    """
+    Table of handlers of a visitor class keyed by node class, subclasses of
+    node classes included. It is a plain dict, which is indexed faster than
+    a dict subclass.
+    """
+    table = {}
+    for node_cls in _node_classes():
+        for c in node_cls.__mro__:
+            name = _handler_names.get(c)
+            if name is not None:
+                table[node_cls] = getattr(visitor, name)
+                break
+    return table
+
+
+def _visit(dispatch):
+    # the table is bound as a default argument: a local lookup is cheaper
+    # than self.dispatch
+    def visit(self, unit, _dispatch=dispatch):
+        return _dispatch[type(unit)](self, unit)
+    visit.per_class = True
+    return visit
+
+
 class Visitor(ABC):
+    """
+    visit(unit) costs as much as unit.accept(self); only hot loops calling
+    dispatch[type(unit)](self, unit) directly run faster
+    """
+    dispatch: dict
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.dispatch = _dispatch(cls)
+        if getattr(cls.visit, "per_class", False):
+            cls.visit = _visit(cls.dispatch)
+
+    def visit(self, unit):
+        return self.dispatch[type(unit)](self, unit)
+
+    visit.per_class = True
+
     @abstractmethod
     def visit_token(self, tok):
         """:type tok: Token"""
@@ -544,3 +612,31 @@ class Visitor(ABC):
     def visit_keyword_stmt(self, stmt):
         """:type stmt: KeywordStmt"""
         pass
+
+
+class Transformer(Visitor):
+    """
+    Post-order: children are replaced by their results, handlers that are
+    not overridden keep the unit
+    """
+
+    def transform(self, unit):
+        children = getattr(unit, "children", None)
+        if children:
+            for i, child in enumerate(children):
+                result = self.transform(child)
+                if result is not child:
+                    children[i] = result
+        return self.dispatch[type(unit)](self, unit)
+
+    def _keep(self, unit):
+        return unit
+
+    visit_token = visit_literal_expr = visit_variable_expr = _keep
+    visit_access_expr = visit_call_expr = visit_array_expr = _keep
+    visit_group_expr = visit_unary_expr = visit_binary_expr = _keep
+    visit_assign_expr = visit_vardecl_expr = _keep
+    visit_expression_stmt = visit_block_stmt = visit_vardecl_stmt = _keep
+    visit_function_stmt = visit_class_stmt = visit_if_stmt = _keep
+    visit_for_stmt = visit_while_stmt = visit_try_stmt = _keep
+    visit_throw_stmt = visit_keyword_stmt = _keep
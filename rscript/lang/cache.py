@@ -0,0 +1,145 @@
+__all__ = [
+    "AstCache",
+]
+
+import marshal
+import os
+import tempfile
+from enum import Enum
+from hashlib import blake2b
+
+from rscript.lang import ast
+from rscript.lang.ast import Token
+from rscript.lang.lexer import Lexer
+from rscript.lang.parser import Parser
+
+# Bumped whenever the serialized form of units changes
+_FORMAT = 1
+
+_classes = tuple(sorted((getattr(ast, name) for name in ast.__all__
+                         if isinstance(getattr(ast, name), type)
+                         and issubclass(getattr(ast, name), ast.CodeUnit)),
+                        key=lambda cls: cls.__name__))
+_class_ids = {cls: i for i, cls in enumerate(_classes)}
+_enums = (ast.TokenType, ast.ExprType, ast.StmtType)
+_enum_ids = {cls: i for i, cls in enumerate(_enums)}
+_members = tuple({m.value: m for m in cls} for cls in _enums)
+_new = object.__new__
+_fields = {}
+
+
+def _slots(cls):
+    names = _fields.get(cls)
+    if names is None:
+        names = []
+        for c in reversed(cls.__mro__):
+            for name in c.__dict__.get("__slots__", ()):
+                if name != "children" and name not in names:
+                    names.append(name)
+        names = _fields[cls] = tuple(names)
+    return names
+
+
+def _encode(unit):
+    """
+    Token as (type, lexeme, literal, line, column), other units as
+    (class id, field values, children) of marshal friendly values. Enum
+    field values are stored as [enum id, value] lists, no other field is
+    a list
+    """
+    if type(unit) is Token:
+        return (unit.type.value, unit.lexeme, unit.literal,
+                unit.line, unit.column)
+    fields = []
+    for name in _slots(type(unit)):
+        v = getattr(unit, name)
+        if isinstance(v, Enum):
+            v = [_enum_ids[type(v)], v.value]
+        fields.append(v)
+    children = getattr(unit, "children", None)
+    if children is not None:
+        children = [_encode(child) for child in children]
+    return _class_ids[type(unit)], tuple(fields), children
+
+
+def _decode(data):
+    if len(data) == 5:
+        # tokens are the bulk of units, so they take the short way
+        tok = _new(Token)
+        tok.type = _members[0][data[0]]
+        tok.lexeme, tok.literal, tok.line, tok.column = data[1:]
+        return tok
+    cls_id, fields, children = data
+    cls = _classes[cls_id]
+    unit = _new(cls)
+    for name, v in zip(_slots(cls), fields):
+        if type(v) is list:
+            v = _members[v[0]][v[1]]
+        setattr(unit, name, v)
+    if children is not None:
+        unit.children = [_decode(child) for child in children]
+    return unit
+
+
+class AstCache:
+    """
+    On-disk cache of parsed code.
+
+    Units are stored in marshal form in files named after a hash of the code
+    text, the parser version and the cache format, so a change of either
+    makes old entries unreachable. Entries are written to a temporary file
+    and renamed in place, so concurrent writers never expose a partial file
+    and readers treat unreadable entries as misses.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(code: str) -> str:
+        h = blake2b(digest_size=20)
+        h.update(f"{Parser.version}:{_FORMAT}:".encode())
+        h.update(code.encode('utf-8', 'surrogatepass'))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.ast')
+
+    def parse(self, code: str):
+        """
+        Units of the code, from the cache or from the lexer and parser
+
+        :rtype: list[Token|Expr|Stmt]
+        """
+        path = self._path(self.key(code))
+        try:
+            with open(path, 'rb') as f:
+                units = [_decode(data) for data in marshal.load(f)]
+        except (OSError, EOFError, ValueError, TypeError, IndexError):
+            units = None
+        if units is not None:
+            self.hits += 1
+            return units
+
+        self.misses += 1
+        units = Parser(Lexer(code).iter_tokens()).parse()
+        self._store(path, marshal.dumps([_encode(unit) for unit in units]))
+        return units
+
+    def _store(self, path, data):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
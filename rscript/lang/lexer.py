@@ -66,6 +66,21 @@ class Lexer:
                                   self._start-self._line_start))
         return self._tokens
 
+    def iter_tokens(self):
+        """
+        Yields the same tokens as tokenize() while they are scanned, so
+        only the tokens of the current scan step are held by the lexer
+        """
+        tokens = self._tokens
+        while not self._at_and():
+            self._start = self._current
+            self._scan_token()
+            if tokens:
+                yield from tokens
+                tokens.clear()
+        yield Token(TokenType.END, "", None, self._line_no,
+                    self._start-self._line_start)
+
     def _scan_token(self):
         c = self._advance()
 
@@ -225,8 +240,7 @@ class Lexer:
         self._add_token(TokenType.STRING, text)
 
     def _number(self):
-        source = self._source[self._start:]
-        match = _number.match(source)
+        match = _number.match(self._source, self._start)
         if match:
             group = match.lastgroup
             value = match[group]
@@ -13,11 +13,19 @@ class Parser:
     :type _start: int
     :type _current: int
     """
+    # Bumped whenever the produced units change, invalidates cached trees
+    version = 1
+
     def __init__(self, tokens):
         """
-        :type tokens: list[Token]
+        :type tokens: list[Token]|Iterator[Token]
+
+        Tokens are pulled only when the parser looks at them, so with
+        Lexer.iter_tokens() lexing and parsing interleave. Units are built
+        at the tail of the buffer, which keeps reductions cheap.
         """
-        self._tokens = tokens.copy()
+        self._tokens = []
+        self._pending = iter(tokens)
         self._start = 0
         self._current = 0
 
@@ -26,6 +34,21 @@ class Parser:
             self._statement()
         return self._tokens
 
+    def iter_parse(self):
+        """
+        Yields the same units as parse() as soon as each top level
+        statement is parsed. Yielded units are dropped from the parser, so
+        with a lazy token source only the statement being parsed and its
+        lookahead are kept in memory.
+        """
+        while not self._at_end():
+            self._statement()
+            done = self._tokens[:self._current]
+            del self._tokens[:self._current]
+            self._current = 0
+            yield from done
+        yield from self._tokens
+
     def _advance(self):
         """
         :rtype: Token
@@ -97,7 +120,23 @@ class Parser:
         """
         :rtype: Token
         """
-        return self._tokens[self._current]
+        try:
+            return self._tokens[self._current]
+        except IndexError:
+            return self._pull()
+
+    def _pull(self):
+        """
+        Reads tokens from the source up to the current one
+
+        :rtype: Token
+        """
+        tokens = self._tokens
+        for token in self._pending:
+            tokens.append(token)
+            if len(tokens) > self._current:
+                return token
+        raise IndexError("Parser. Token source ended without END token")
 
     def _previous(self):
         """
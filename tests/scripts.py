@@ -0,0 +1,131 @@
+"""
+Compiled scripts for tests, built through the record API
+"""
+
+import io
+
+from rscript.file.enums import *
+from rscript.file.scr import (CompiledScript, Var, Star, StarLink, Planet,
+                              Ship, Place, Item, Group, GroupLink, State,
+                              Dialog, DialogMsg, DialogAnswer)
+from rscript.file.utils import MinMax, Status
+
+
+def make_script(version: int = 7, groups: int = 8,
+                dialogs=("Dlg0", "Dlg1")) -> CompiledScript:
+    """
+    Script with records in every section. Code has several lines, so
+    heredocs are dumped too
+    """
+    sc = CompiledScript()
+    sc.version = version
+
+    for i, (type, value) in enumerate(((var_.INTEGER, 3), (var_.DWORD, 7),
+                                       (var_.FLOAT, 1.5),
+                                       (var_.STRING, "text"),
+                                       (var_.ARRAY, 2))):
+        e = Var(sc, f"g{i}")
+        e.type = type
+        e.value = value
+        sc.globalvars.append(e)
+    e = Var(sc, "l0")
+    e.type = var_.INTEGER
+    e.value = -4
+    sc.localvars.append(e)
+
+    sc.globalcode = "a = 1;\r\nb = 2;"
+    sc.constellations = 2
+
+    for i in range(4):
+        star = Star(sc, f"Star{i}")
+        star.constellation = i % 2
+        star.no_kling = bool(i % 2)
+        link = StarLink(sc, "0")
+        link.end_star = (i + 1) % 4
+        link.distance = MinMax(10, 20 + i)
+        link.is_hole = i == 3
+        star.starlinks.append(link)
+        planet = Planet(sc, f"Planet{i}")
+        planet.race = r_.MALOC | r_.PELENG
+        planet.owner = o_.USE | o_.KLING
+        planet.range = MinMax(0, 100)
+        planet.dialog = "Dlg0"
+        star.planets.append(planet)
+        ship = Ship(sc, "0")
+        ship.type = t_.PIRATE | t_.USE
+        ship.status = Status(MinMax(0, 1), MinMax(2, 3), MinMax(4, 5))
+        ship.strength = MinMax(1.5, 2.5)
+        star.ships.append(ship)
+        sc.stars.append(star)
+
+    place = Place(sc, "Place0")
+    place.star = "Star0"
+    place.type = pt_.TO_STAR
+    place.object = "Star1"
+    place.distance = 0.5
+    place.angle = 30.0
+    sc.places.append(place)
+
+    item = Item(sc, "Item0")
+    item.place = "Place0"
+    item.type = 5
+    sc.items.append(item)
+
+    for i in range(groups):
+        g = Group(sc, f"Group{i}")
+        g.state = i % 3
+        g.owner = o_.USE | o_.PIRATECLAN
+        g.type = t_.USE | (t_.PIRATE if i % 2 else t_.WARRIOR)
+        g.count = MinMax(1, i + 1)
+        g.strength = MinMax(float(i), float(i) * 2)
+        g.dialog = dialogs[0] if i % 4 == 0 and dialogs else ""
+        g.status = Status(MinMax(0, i), MinMax(1, 2), MinMax(3, 4))
+        sc.groups.append(g)
+    for i in range(groups - 1):
+        link = GroupLink(sc, str(i))
+        link.begin = i
+        link.end = i + 1
+        link.relations = (rel_.WAR, rel_(i % 6))
+        link.war_weight = MinMax(0.0, float(i))
+        sc.grouplinks.append(link)
+
+    sc.initcode = "Init();"
+    sc.turncode = "if (a) {\r\n    ChangeState(x);\r\n}"
+    sc.dialogbegincode = ""
+
+    for i in range(3):
+        st = State(sc, f"State{i}")
+        st.type = mt_.MOVE if i else mt_.NONE
+        st.object = "Star1" if i else ""
+        st.attack = ["Group1", "Group2"][:i]
+        st.code = f"x = {i};\r\nCT(\"a.b\");"
+        st.out_msg = "out"
+        st.ether = "ether"
+        sc.states.append(st)
+
+    for name in dialogs:
+        d = Dialog(sc, name)
+        d.code = f"{name}();"
+        sc.dialogs.append(d)
+    msg = DialogMsg(sc, "0")
+    msg.command = "Msg0"
+    msg.code = "m = 1;"
+    sc.dialog_msgs.append(msg)
+    answer = DialogAnswer(sc, "0")
+    answer.command = "Answer0"
+    answer.answer = "Yes"
+    answer.code = "exit;"
+    sc.dialog_answers.append(answer)
+    return sc
+
+
+def binary(script: CompiledScript) -> bytes:
+    f = io.BytesIO()
+    script.save(f)
+    return f.getvalue()
+
+
+def text(script: CompiledScript) -> str:
+    f = io.StringIO(newline='')
+    script.dump(f)
+    return f.getvalue()
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from rscript.file.aio import aload_many
+from rscript.file.scr import CompiledScript
+from scripts import make_script, binary
+
+
+def load(path):
+    script = CompiledScript()
+    with open(path, 'rb') as f:
+        script.load(f)
+    return script
+
+
+def collect(paths, **kwargs):
+    async def run():
+        return [item async for item in aload_many(paths, **kwargs)]
+    return asyncio.run(run())
+
+
+class LoadManyTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.paths = []
+        for i in range(7):
+            # Different sizes so that loads finish out of order
+            script = make_script(6 + i % 2, groups=40 - i * 5)
+            self.paths.append(self.write(tmp.name, f"s{i}.scr",
+                                         binary(script)))
+        self.dir = tmp.name
+
+    def write(self, directory, name, data):
+        path = os.path.join(directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_load(self):
+        result = collect(self.paths, limit=3)
+        self.assertEqual([path for path, _ in result], self.paths)
+        for path, script in result:
+            with self.subTest(path=os.path.basename(path)):
+                self.assertEqual(binary(script), binary(load(path)))
+
+    def test_error(self):
+        broken = self.write(self.dir, "broken.scr", b"\x05\x00\x00\x00")
+        paths = self.paths[:2] + [broken] + self.paths[2:]
+        with self.assertRaises(ValueError):
+            collect(paths, limit=3)
+        with self.assertRaises(FileNotFoundError):
+            collect([os.path.join(self.dir, "missing.scr")] + self.paths,
+                    limit=2)
+
+    def test_limit(self):
+        with self.assertRaises(ValueError):
+            collect(self.paths, limit=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+
+from rscript.lang.ast import *
+from rscript.lang.ast import _handler_names
+from rscript.lang.lexer import Lexer
+from rscript.lang.parser import Parser
+
+
+class _Names(Transformer):
+
+    def _name(self, unit):
+        return type(unit).__name__
+
+    visit_token = visit_literal_expr = visit_binary_expr = _name
+    visit_if_stmt = visit_expression_stmt = visit_call_expr = _name
+
+
+class _Upper(Transformer):
+    """
+    Replaces tokens by upper case copies, records the order of handlers
+    """
+
+    def __init__(self):
+        self.order = []
+
+    def visit_token(self, tok):
+        self.order.append(tok)
+        return Token(tok.type, tok.lexeme.upper(), tok.literal, tok.line,
+                     tok.column)
+
+    def visit_binary_expr(self, expr):
+        self.order.append(expr)
+        return expr
+
+
+def _units(units):
+    stack = list(units)
+    while stack:
+        unit = stack.pop()
+        yield unit
+        stack.extend(getattr(unit, "children", ()))
+
+
+class VisitorTest(unittest.TestCase):
+
+    def test_handler_names(self):
+        self.assertEqual(set(_handler_names.values()),
+                         Visitor.__abstractmethods__)
+
+    def test_visit_same_as_accept(self):
+        units = Parser(Lexer("if (a == 1 + 2) { f(b); }\n")
+                       .iter_tokens()).parse()
+        stack = list(units)
+        visitor = _Names()
+        while stack:
+            unit = stack.pop()
+            self.assertEqual(visitor.visit(unit), unit.accept(visitor))
+            stack.extend(getattr(unit, "children", ()))
+
+    def test_own_visit_kept(self):
+        class Counting(_Names):
+            def visit(self, unit):
+                return "counted"
+
+        class Derived(Counting):
+            pass
+
+        self.assertEqual(Derived().visit(Token(TokenType.END, "", None, 0, 0)),
+                         "counted")
+        self.assertIn(Token, Derived.dispatch)
+
+
+
+class TransformerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stmt, = Parser(Lexer("x = a + b;\n").iter_tokens()).parse()[:-1]
+
+    def test_post_order(self):
+        binary = next(u for u in _units([self.stmt])
+                      if isinstance(u, BinaryExpr))
+        tokens = [u for u in _units([binary]) if isinstance(u, Token)]
+        transformer = _Upper()
+        transformer.transform(self.stmt)
+        order = transformer.order
+        self.assertTrue(all(order.index(tok) < order.index(binary)
+                            for tok in tokens))
+        # Results are put in place of the children
+        self.assertEqual(sorted(u.lexeme for u in _units([binary])
+                                if isinstance(u, Token) and u.lexeme.strip()),
+                         ["+", "A", "B"])
+
+    def test_keep(self):
+        units = list(_units([self.stmt]))
+        self.assertIs(Transformer().transform(self.stmt), self.stmt)
+        self.assertEqual(list(_units([self.stmt])), units)
+        self.assertIs(_Upper().transform(self.stmt), self.stmt)
+        self.assertTrue(all(u.lexeme.isupper() or not u.lexeme.isalpha()
+                            for u in _units([self.stmt])
+                            if isinstance(u, Token)))
+
+
+if __name__ == '__main__':
+    unittest.main()
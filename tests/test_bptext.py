@@ -0,0 +1,100 @@
+import io
+import unittest
+
+from rangers.blockpar import BlockPar
+
+from rscript.file.bptext import BlockParWriter, BlockParReader
+from scripts import make_script
+
+
+class _Tree(BlockPar):
+    """
+    BlockPar tree that CompiledScript._dump can fill like a writer
+    """
+
+    def close(self):
+        pass
+
+
+def save_txt(script):
+    tree = _Tree(sort=False)
+    script._dump(tree)
+    f = io.StringIO(newline='')
+    tree.save_txt(f)
+    return f.getvalue()
+
+
+def write(script):
+    f = io.StringIO(newline='')
+    script.dump(f)
+    return f.getvalue()
+
+
+class WriterTest(unittest.TestCase):
+
+    def test_script_same_as_save_txt(self):
+        for version in (6, 7):
+            # Dialogs is a sorted block, its records are added unordered
+            script = make_script(version, dialogs=("DlgB", "DlgC", "DlgA"))
+            self.assertEqual(write(script), save_txt(script), version)
+
+    def test_sorted_blocks(self):
+        tree = _Tree(sort=False)
+        f = io.StringIO(newline='')
+        writer = BlockParWriter(f)
+        for bp in (tree, writer):
+            bp.add_par("First", "1")
+            sorted_block = bp.add_block("Sorted")
+            for name in ("b", "a", "c", "a"):
+                child = sorted_block.add_block(name, False)
+                child.add_par("Value", name + "\r\nline")
+                nested = child.add_block("Nested")
+                nested.add_par("z", "1")
+                nested.add_par("y", "2")
+            sorted_block.add_par("0", "par")
+            bp.add_block("Empty")
+            bp.add_par("Last", "2")
+        writer.close()
+        expected = io.StringIO(newline='')
+        tree.save_txt(expected)
+        self.assertEqual(f.getvalue(), expected.getvalue())
+
+    def test_closed_block(self):
+        writer = BlockParWriter(io.StringIO(newline=''))
+        block = writer.add_block("A", False)
+        writer.add_par("B", "1")
+        with self.assertRaises(ValueError):
+            block.add_par("C", "2")
+
+
+class ReaderTest(unittest.TestCase):
+
+    def test_reads_written_text(self):
+        text = write(make_script())
+        names = [name for name, _ in BlockParReader(io.StringIO(text,
+                                                                newline=''))]
+        self.assertEqual(names[:3], ["Version", "GlobalVars", "GlobalCode"])
+        self.assertEqual(names[-1], "DialogAnswers")
+
+    def test_section_text(self):
+        text = ("A ~{\r\n    B ^{\r\n        x=1\r\n    }\r\n"
+                "    c=<<<\r\n}\r\n>>>\r\n}\r\nd=2\r\n")
+        reader = iter(BlockParReader(io.StringIO(text, newline='')))
+        name, section = next(reader)
+        body = section.text()
+        self.assertEqual(body, text[text.index('\n') + 1:text.index('}\r\nd')])
+        tree = section.to_blockpar()
+        self.assertEqual(tree.get_block("B").get_par("x"), "1")
+        self.assertEqual(tree.get_par("c"), "}")
+        self.assertEqual(next(reader), ("d", "2"))
+
+    def test_to_blockpar(self):
+        text = write(make_script())
+        tree = BlockParReader(io.StringIO(text, newline='')).to_blockpar()
+        f = io.StringIO(newline='')
+        tree.save_txt(f)
+        self.assertEqual(f.getvalue(), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import io
+import os
+import tempfile
+import unittest
+
+from rscript.file.cache import RecordCache
+from rscript.file.scr import CompiledScript
+from scripts import make_script, binary, text
+
+
+def build(cache, dump, jsonl=False):
+    script = CompiledScript()
+    f = io.StringIO(dump, newline='')
+    if jsonl:
+        cache.restore_jsonl(script, f)
+    else:
+        cache.restore(script, f)
+    out = io.BytesIO()
+    cache.save(script, out)
+    return out.getvalue()
+
+
+class RecordCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.script = make_script(7)
+        self.dump = text(self.script)
+
+    def test_same_as_save(self):
+        cache = RecordCache()
+        self.assertEqual(build(cache, self.dump), binary(self.script))
+        self.assertEqual(cache.hits, 0)
+
+    def test_changed_record(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "records.cache")
+            cache = RecordCache()
+            build(cache, self.dump)
+            cache.dump(path)
+
+            self.script.groups[3].count.max = 99
+            cache = RecordCache()
+            cache.load(path)
+            self.assertEqual(build(cache, text(self.script)),
+                             binary(self.script))
+            self.assertEqual(cache.misses, 1)
+            self.assertGreater(cache.hits, 0)
+
+    def test_jsonl(self):
+        f = io.StringIO(newline='')
+        self.script.dump_jsonl(f)
+        cache = RecordCache()
+        build(cache, f.getvalue(), True)
+        self.assertEqual(build(cache, f.getvalue(), True),
+                         binary(self.script))
+        self.assertEqual(cache.hits, cache.misses)
+
+
+if __name__ == '__main__':
+    unittest.main()
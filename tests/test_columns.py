@@ -0,0 +1,67 @@
+import unittest
+
+from rscript.file.enums import *
+from scripts import make_script, binary
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class ColumnsTest(unittest.TestCase):
+
+    def test_roundtrip(self):
+        for version in (6, 7):
+            with self.subTest(version=version):
+                script = make_script(version)
+                groups = script.export_groups()
+                grouplinks = script.export_grouplinks()
+                self.assertEqual(len(groups), len(script.groups))
+                self.assertEqual(len(grouplinks), len(script.grouplinks))
+
+                restored = make_script(version, groups=0)
+                restored.import_groups(groups)
+                restored.import_grouplinks(grouplinks)
+                self.assertEqual(binary(restored), binary(script))
+
+    def test_edit(self):
+        script = make_script()
+        groups = script.export_groups()
+        groups["count_max"] *= 2
+        groups["owner"][0] = o_.KLING
+        script.import_groups(groups)
+        self.assertEqual([e.count.max for e in script.groups],
+                         [2 * (i + 1) for i in range(len(script.groups))])
+        self.assertIs(type(script.groups[0].owner), o_)
+        self.assertEqual(script.groups[0].owner, o_.KLING)
+
+        grouplinks = script.export_grouplinks()
+        grouplinks["relation_end"] = rel_.WAR
+        script.import_grouplinks(grouplinks)
+        self.assertEqual({e.relations for e in script.grouplinks},
+                         {(rel_.WAR, rel_.WAR)})
+
+    def test_query(self):
+        script = make_script(groups=20)
+        groups = script.export_groups()
+        mask = (((groups["type"] & t_.PIRATE) != 0)
+                & (groups["count_max"] > 6)
+                & (groups["strength_min"] < 15))
+        self.assertEqual(
+            groups["name"][mask].tolist(),
+            [e.name for e in script.groups
+             if e.type & t_.PIRATE and e.count.max > 6
+             and e.strength.min < 15])
+
+        grouplinks = script.export_grouplinks()
+        mask = grouplinks["relation_end"] == rel_.WAR
+        self.assertEqual(
+            grouplinks["name"][mask].tolist(),
+            [e.name for e in script.grouplinks
+             if e.relations[1] == rel_.WAR])
+
+
+if __name__ == '__main__':
+    unittest.main()
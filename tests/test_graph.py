@@ -0,0 +1,62 @@
+import unittest
+
+from rscript.file.enums import rel_
+from rscript.file.graph import GroupGraph, StarGraph
+from scripts import make_script
+
+
+class GroupGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = GroupGraph(make_script(groups=8))
+
+    def test_adjacency(self):
+        self.assertEqual(self.graph.successors(2), [3])
+        self.assertEqual(self.graph.predecessors(2), [1])
+        self.assertEqual(self.graph.successors(7), [])
+        self.assertEqual(self.graph.reachable(5), [6, 7])
+
+    def test_towards(self):
+        # links i -> i + 1 have relations (WAR, rel_(i % 6))
+        self.assertEqual(self.graph.hostile(3), [2])
+        self.assertEqual(self.graph.towards(0, rel_.WAR), [1])
+        # plain ints compare equal to the enum members
+        self.assertEqual(self.graph.towards(0, 0), [1])
+        self.assertEqual(self.graph.towards(2, int(rel_.NORMAL)), [3])
+
+    def test_components(self):
+        components = self.graph.components()
+        self.assertEqual(sorted(len(c) for c in components), [1] * 8)
+
+
+class StarGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        # ring of 4 stars, link i -> i + 1 has distance 10..20 + i
+        self.script = make_script()
+
+    def test_routes(self):
+        graph = StarGraph(self.script)
+        self.assertEqual(graph.neighbors(0), [1, 3])
+        self.assertEqual(graph.distances(0), [0, 10, 20, 10])
+        self.assertEqual(graph.distance(0, 2, "max"), 41)
+        self.assertEqual(graph.path(0, 1, "hops"), [0, 1])
+        self.assertEqual(len(graph.path(1, 3, "hops")), 3)
+        self.assertEqual(graph.all_pairs()[2], graph.distances(2))
+
+    def test_holes(self):
+        graph = StarGraph(self.script, holes=False)
+        self.assertEqual(graph.path(0, 3), [0, 1, 2, 3])
+
+    def test_bounded_cache(self):
+        graph = StarGraph(self.script, cached=2)
+        for source in range(4):
+            graph.distances(source)
+        graph.all_pairs("max")
+        self.assertEqual(list(graph._routes), [(2, "min"), (3, "min")])
+        graph.distances(2)
+        self.assertEqual(list(graph._routes), [(3, "min"), (2, "min")])
+
+
+if __name__ == '__main__':
+    unittest.main()
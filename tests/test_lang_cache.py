@@ -0,0 +1,58 @@
+import marshal
+import tempfile
+import unittest
+from unittest import mock
+
+from rscript.lang.cache import AstCache, _encode
+from rscript.lang.parser import Parser
+
+CODE = ("if (a == 1 + b) {\r\n    ChangeState(x);\r\n}\r\n"
+        "f(\"text\", 1.5, 12h);\r\n")
+
+
+def encode(units):
+    return [_encode(unit) for unit in units]
+
+
+class AstCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = AstCache(tmp.name)
+
+    def test_hit(self):
+        first = self.cache.parse(CODE)
+        second = self.cache.parse(CODE)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertIsNot(second, first)
+        self.assertEqual(encode(second), encode(first))
+
+    def test_parser_version(self):
+        key = AstCache.key(CODE)
+        self.cache.parse(CODE)
+        with mock.patch.object(Parser, "version", Parser.version + 1):
+            self.assertNotEqual(AstCache.key(CODE), key)
+            self.cache.parse(CODE)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+    def test_corrupt_entry(self):
+        expected = encode(self.cache.parse(CODE))
+        path = self.cache._path(AstCache.key(CODE))
+        with open(path, 'rb') as f:
+            data = f.read()
+        for broken in (data[:len(data) // 2], b"\x00garbage", b"",
+                       marshal.dumps(5), marshal.dumps([(999, (), None)])):
+            with self.subTest(broken=broken[:8]):
+                with open(path, 'wb') as f:
+                    f.write(broken)
+                misses = self.cache.misses
+                self.assertEqual(encode(self.cache.parse(CODE)), expected)
+                self.assertEqual(self.cache.misses, misses + 1)
+                # The entry is written again
+                self.cache.parse(CODE)
+                self.assertEqual(self.cache.misses, misses + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
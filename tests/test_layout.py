@@ -0,0 +1,92 @@
+import unittest
+from unittest import mock
+
+from rscript.file.utils import Rect
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    from rscript.file import layout
+    from rscript.file.svr import SourceScript
+
+RECT = Rect(80, 0, 800, 1000)
+SPACING = 80
+
+
+def add(script, clsname, *links):
+    gp = script.add(clsname)
+    for other in links:
+        script.link(other, gp)
+    return gp
+
+
+def columns(script, layers):
+    """
+    x of every state minus its layer column, the same for all states
+    up to the jitter and rounding
+    """
+    return [gp.pos.x - layer * SPACING for gp, layer in layers]
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class LayoutTest(unittest.TestCase):
+
+    def check(self, script, layers):
+        for gp in script.graphpoints:
+            self.assertTrue(RECT.left <= gp.pos.x < RECT.left + 10 ** 7, gp)
+            self.assertTrue(RECT.top <= gp.pos.y < RECT.top + 10 ** 7, gp)
+        self.assertEqual(min(gp.pos.x for gp in script.graphpoints),
+                         RECT.left)
+        self.assertEqual(min(gp.pos.y for gp in script.graphpoints),
+                         RECT.top)
+        x = columns(script, layers)
+        self.assertLessEqual(max(x) - min(x), 3)
+
+    def test_layout(self):
+        script = SourceScript()
+        s0 = add(script, "TState")
+        s1 = add(script, "TState", s0)
+        s2 = add(script, "TState", s0)
+        s3 = add(script, "TState", s1, s2)
+        script.link(s3, s1)
+        s4 = add(script, "TState")
+        for state in (s0, s3):
+            add(script, "TGroup", state)
+        # Component without states
+        star = add(script, "TStar")
+        for _ in range(5):
+            star = add(script, "TStar", star)
+        add(script, "TPlanet", star)
+        add(script, "TItem")
+
+        script.layout(spacing=SPACING, rect=RECT)
+        self.check(script, [(s0, 0), (s1, 1), (s2, 1), (s3, 2), (s4, 0)])
+
+        positions = [(gp.pos.x, gp.pos.y) for gp in script.graphpoints]
+        script.layout(spacing=SPACING, rect=RECT)
+        self.assertEqual([(gp.pos.x, gp.pos.y) for gp in script.graphpoints],
+                         positions)
+
+    def test_wide(self):
+        script = SourceScript()
+        states = [add(script, "TState")]
+        for _ in range(2000):
+            states.append(add(script, "TState", states[-1]))
+            add(script, "TGroup", states[-1])
+        with mock.patch.object(layout, "_blur", wraps=layout._blur) as blur:
+            script.layout(spacing=SPACING, rect=RECT)
+        shapes = [call.args[0].shape for call in blur.call_args_list]
+        self.assertTrue(shapes)
+        self.assertLessEqual(max(max(shape) for shape in shapes), layout._GRID)
+        self.check(script, list(zip(states, range(len(states)))))
+
+    def test_empty(self):
+        script = SourceScript()
+        script.layout()
+        self.assertEqual(script.graphpoints, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
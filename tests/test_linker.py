@@ -0,0 +1,45 @@
+import unittest
+
+from utils.linker import link, link_all
+from utils.linkbench import make_code
+
+
+def code(index, statements):
+    # The assignment breaks the idiom, only the ifs after it are linked
+    return (make_code(index, index % 3) + f"x{index} = 1;\n"
+            + make_code(index, statements))
+
+
+def result(context):
+    return context.source, context.lang, context.linked
+
+
+class LinkAllTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tasks = [(None, None, code(i, 3 + i)) for i in range(6)]
+
+    def test_parallel(self):
+        serial = [link(*task) for task in self.tasks]
+        self.assertTrue(all(context.linked for context in serial))
+        self.assertEqual(len({len(c.linked) for c in serial}), len(serial))
+
+        contexts = link_all(self.tasks, jobs=2)
+        self.assertEqual([result(c) for c in contexts],
+                         [result(c) for c in serial])
+        self.assertEqual([result(c) for c in link_all(self.tasks, jobs=1)],
+                         [result(c) for c in serial])
+
+    def test_no_shared_state(self):
+        contexts = link_all(self.tasks + self.tasks[::-1], jobs=1)
+        n = len(self.tasks)
+        self.assertEqual([result(c) for c in contexts[:n]],
+                         [result(c) for c in contexts[:n - 1:-1]])
+        self.assertEqual(len({id(c.interpreter) for c in contexts}),
+                         len(contexts))
+        self.assertEqual(len({id(c.linked) for c in contexts}),
+                         len(contexts))
+
+
+if __name__ == '__main__':
+    unittest.main()
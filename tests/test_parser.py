@@ -0,0 +1,71 @@
+import unittest
+
+from rscript.lang.cache import _encode
+from rscript.lang.lexer import Lexer
+from rscript.lang.parser import Parser, ParseError
+
+CODES = [
+    "",
+    "  \r\n// comment\r\n",
+    "a=1;\r\n/* x\r\n */ b = 2; // tail",
+    "x = 12h + 101b + 1.5e3 + 7;",
+    "if(a) {\r\n    ChangeState(x);\r\n} else b=1;\r\nint i=0,j;\r\n"
+    "for(i=0;i<3;i=i+1) {x=x+1;}\r\nwhile(a){break;}",
+    "function f(int a, b) { exit; }\r\nthrow 1;",
+    "".join(f"if (a{i} == {i} + b * (c - {i}))\r\n{{\r\n"
+            f"    DChange('Msg{i}');\r\n    x = f(y{i}, -z.w, 2);\r\n}}\r\n"
+            for i in range(50)),
+]
+
+ERRORS = ["x = (1;", "if (a", "{ a=1;", "f(1,2", "a=1; b"]
+
+
+def encode(units):
+    return [_encode(unit) for unit in units]
+
+
+def error(parse):
+    try:
+        parse()
+    except ParseError as e:
+        return e.message, repr(e.token)
+    return None
+
+
+class StreamingTest(unittest.TestCase):
+    """
+    Parsing from iter_tokens against parsing from the token list
+    """
+
+    def test_tokens(self):
+        for code in CODES:
+            with self.subTest(code=code):
+                self.assertEqual(encode(Lexer(code).iter_tokens()),
+                                 encode(Lexer(code).tokenize()))
+
+    def test_parse(self):
+        for code in CODES:
+            with self.subTest(code=code):
+                expected = encode(Parser(Lexer(code).tokenize()).parse())
+                self.assertEqual(
+                    encode(Parser(Lexer(code).iter_tokens()).parse()),
+                    expected)
+                self.assertEqual(
+                    encode(Parser(Lexer(code).iter_tokens()).iter_parse()),
+                    expected)
+
+    def test_errors(self):
+        for code in ERRORS:
+            with self.subTest(code=code):
+                expected = error(Parser(Lexer(code).tokenize()).parse)
+                self.assertIsNotNone(expected)
+                self.assertEqual(
+                    error(Parser(Lexer(code).iter_tokens()).parse), expected)
+                self.assertEqual(
+                    error(lambda: list(
+                        Parser(Lexer(code).iter_tokens()).iter_parse())),
+                    expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import io
+import unittest
+
+from rscript.file.scr import CompiledScript
+from scripts import make_script, binary, text
+
+
+def restore(dump):
+    script = CompiledScript()
+    script.restore(io.StringIO(dump, newline=''))
+    return script
+
+
+def load(data):
+    script = CompiledScript()
+    script.load(io.BytesIO(data))
+    return script
+
+
+class LoadTest(unittest.TestCase):
+
+    def test_roundtrip(self):
+        for version in (6, 7):
+            with self.subTest(version=version):
+                script = make_script(version)
+                loaded = load(binary(script))
+                self.assertEqual(loaded.version, version)
+                self.assertEqual(binary(loaded), binary(script))
+                self.assertEqual(text(loaded), text(script))
+
+    def test_unsupported_version(self):
+        data = bytearray(binary(make_script()))
+        data[0] = 5
+        with self.assertRaisesRegex(Exception, "Unsupported version"):
+            load(bytes(data))
+
+
+class RestoreTest(unittest.TestCase):
+
+    def test_roundtrip(self):
+        for version in (6, 7):
+            with self.subTest(version=version):
+                script = make_script(version)
+                self.assertEqual(binary(restore(text(script))),
+                                 binary(script))
+
+    def test_jsonl_roundtrip(self):
+        for version in (6, 7):
+            with self.subTest(version=version):
+                script = make_script(version)
+                f = io.StringIO(newline='')
+                script.dump_jsonl(f)
+                restored = CompiledScript()
+                restored.restore_jsonl(
+                    io.StringIO(f.getvalue(), newline=''))
+                self.assertEqual(binary(restored), binary(script))
+
+    def test_unknown_section(self):
+        dump = text(make_script()) + "Bogus=1\r\n"
+        with self.assertRaisesRegex(ValueError, "Bogus"):
+            restore(dump)
+
+    def test_missing_sections(self):
+        dump = text(make_script())
+        with self.assertRaisesRegex(ValueError, "DialogAnswers"):
+            restore(dump[:dump.index("DialogAnswers ")])
+        with self.assertRaisesRegex(ValueError, "Missing"):
+            restore("")
+
+
+if __name__ == '__main__':
+    unittest.main()
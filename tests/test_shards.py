@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from rscript.file.enums import *
+from rscript.file.scr import CompiledScript, State
+from rscript.file.shards import MANIFEST
+from scripts import make_script, binary
+
+
+def restore(directory, **kwargs):
+    script = CompiledScript()
+    script.restore_shards(directory, **kwargs)
+    return script
+
+
+class ShardsTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def test_roundtrip(self):
+        for version in (6, 7):
+            with self.subTest(version=version):
+                script = make_script(version)
+                # Kept by restore, unlike load of the binary form
+                script.dialog_answers[0].answer = " Yes "
+                script.dump_shards(self.dir)
+                restored = restore(self.dir)
+                self.assertEqual(binary(restored), binary(script))
+                self.assertEqual(restored.dialog_answers[0].answer, " Yes ")
+
+    def test_names(self):
+        script = make_script()
+        for name in ("a/b", "A/B", ".", ""):
+            e = State(script, name)
+            e.type = mt_.NONE
+            script.states.append(e)
+        script.dump_shards(self.dir)
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.dir, "States"))),
+            ["%.txt", "%2E.txt", "A%2FB~2.txt", "State0.txt", "State1.txt",
+             "State2.txt", "a%2Fb.txt"])
+        self.assertEqual(binary(restore(self.dir)), binary(script))
+
+    def test_insert(self):
+        script = make_script()
+        script.dump_shards(self.dir)
+        folder = os.path.join(self.dir, "States")
+        before = {name: os.stat(os.path.join(folder, name)).st_mtime_ns
+                  for name in os.listdir(folder)}
+        e = State(script, "New")
+        e.type = mt_.NONE
+        script.states.insert(0, e)
+        script.dump_shards(self.dir)
+        for name, mtime in before.items():
+            self.assertEqual(os.stat(os.path.join(folder, name)).st_mtime_ns,
+                             mtime)
+        self.assertEqual(binary(restore(self.dir)), binary(script))
+
+    def test_empty_section(self):
+        script = make_script()
+        script.dump_shards(self.dir)
+        script.dialog_answers.clear()
+        script.dump_shards(self.dir)
+        self.assertEqual(os.listdir(os.path.join(self.dir, "DialogAnswers")),
+                         [])
+        self.assertEqual(binary(restore(self.dir)), binary(script))
+
+    def test_missing_sections(self):
+        make_script().dump_shards(self.dir)
+        path = os.path.join(self.dir, MANIFEST)
+        with open(path, 'rt', encoding='cp1251', newline='') as f:
+            manifest = f.read()
+        with open(path, 'wt', encoding='cp1251', newline='') as f:
+            f.write(manifest.replace("Stars=Stars.txt\r\n", ""))
+        with self.assertRaisesRegex(ValueError, "Missing sections: Stars"):
+            restore(self.dir)
+
+    def test_cache(self):
+        script = make_script()
+        script.dump_shards(self.dir)
+        cache = os.path.join(self.dir, "shards.cache")
+        restored = CompiledScript()
+        self.assertGreater(restored.restore_shards(self.dir, cache=cache), 0)
+        restored = CompiledScript()
+        self.assertEqual(restored.restore_shards(self.dir, cache=cache), 0)
+        self.assertEqual(binary(restored), binary(script))
+
+
+if __name__ == '__main__':
+    unittest.main()
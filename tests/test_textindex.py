@@ -0,0 +1,94 @@
+import io
+import os
+import tempfile
+import unittest
+
+from rscript.file.textindex import TextIndex, ct_keys, load_lang
+from scripts import make_script, binary
+
+LANG = ("Quest ~{\r\n"
+        "    Greeting=Welcome to the Coalition base\r\n"
+        "}\r\n")
+
+
+class TextIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+        script = make_script()
+        script.states[0].out_msg = "The pirate base is under attack"
+        script.states[1].code = 'CT("Quest.Greeting");'
+        script.dialog_answers[0].answer = "Attack the pirates"
+        self.path = self.write("a.scr", script)
+
+        script = make_script()
+        script.states[0].out_msg = "Base attack repelled"
+        self.other = self.write("b.scr", script)
+
+        self.index = TextIndex()
+        self.index.build([self.path, self.other],
+                         lang=load_lang(io.StringIO(LANG, newline='')),
+                         jobs=1)
+
+    def write(self, name, script):
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(binary(script))
+        return path
+
+    def found(self, query, index=None):
+        return [(d.script, d.section, d.record, d.field)
+                for d in (index or self.index).search(query)]
+
+    def test_ct_keys(self):
+        self.assertEqual(ct_keys('a = CT("x.y"); CT(b); f("z");'), ["x.y"])
+
+    def test_word(self):
+        self.assertEqual(self.found("PIRATE"),
+                         [(self.path, "States", "State0", "OutMsg")])
+        self.assertEqual(len(self.found("base attack")), 2)
+
+    def test_ct_resolved(self):
+        self.assertEqual(self.found("coalition"),
+                         [(self.path, "States", "State1", "CT")])
+        self.assertEqual(self.found("Quest"), [])
+
+    def test_prefix(self):
+        self.assertEqual(self.found("pirat*"),
+                         [(self.path, "States", "State0", "OutMsg"),
+                          (self.path, "DialogAnswers", "0", "Answer")])
+
+    def test_phrase(self):
+        self.assertEqual(self.found('"base is under"'),
+                         [(self.path, "States", "State0", "OutMsg")])
+        self.assertEqual(self.found('"under base"'), [])
+
+    def test_save_load(self):
+        path = os.path.join(self.dir, "text.idx")
+        self.index.save(path)
+        loaded = TextIndex()
+        loaded.load(path)
+        self.assertEqual(loaded.docs, self.index.docs)
+        for query in ("pirat*", '"base is under"', "coalition"):
+            self.assertEqual(self.found(query, loaded), self.found(query))
+
+    def test_missing_index(self):
+        index = TextIndex()
+        index.load(os.path.join(self.dir, "missing.idx"))
+        self.assertEqual(index.search("base"), [])
+
+    def test_failed(self):
+        path = os.path.join(self.dir, "broken.scr")
+        with open(path, 'wb') as f:
+            f.write(b"\x07\x00")
+        index = TextIndex()
+        index.build([path, self.other], jobs=1)
+        self.assertEqual(index.failed, [path])
+        self.assertTrue(index.docs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from rscript.file.usage import UsageIndex
+from scripts import make_script
+
+
+class UsageIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dirs = []
+        for name in ("a", "b"):
+            path = os.path.join(self._tmp.name, name)
+            os.mkdir(path)
+            self.dirs.append(path)
+            with open(os.path.join(path, "1.scr"), 'wb') as f:
+                make_script().save(f)
+
+    def scripts(self, directory):
+        return [os.path.join(directory, name)
+                for name in sorted(os.listdir(directory))]
+
+    def update(self, index, *directories):
+        paths = [p for d in directories for p in self.scripts(d)]
+        return index.update(paths, roots=directories, jobs=1)
+
+    def test_find(self):
+        index = UsageIndex()
+        self.assertEqual(self.update(index, *self.dirs), 2)
+        usages = index.find("CT", "call")
+        self.assertEqual(len(usages), 6)
+        self.assertEqual({u.section for u in usages}, {"States"})
+        self.assertEqual(index.find("x", "call"), [])
+        self.assertIn("ChangeState", index.names())
+        self.assertEqual(self.update(index, *self.dirs), 0)
+
+    def test_other_roots_kept(self):
+        a, b = self.dirs
+        index = UsageIndex()
+        self.update(index, a)
+        self.update(index, b)
+        self.assertEqual({u.script for u in index.find("CT")},
+                         {os.path.join(a, "1.scr"), os.path.join(b, "1.scr")})
+
+        os.remove(os.path.join(a, "1.scr"))
+        self.update(index, a)
+        self.assertEqual({u.script for u in index.find("CT")},
+                         {os.path.join(b, "1.scr")})
+
+    def test_missing_file(self):
+        index = UsageIndex()
+        path = os.path.join(self.dirs[0], "missing.scr")
+        self.assertEqual(index.update([path], jobs=1), 0)
+        self.assertEqual(list(index.failed), [path])
+
+    def test_broken_script(self):
+        path = os.path.join(self.dirs[0], "1.scr")
+        with open(path, 'r+b') as f:
+            f.write(b"\x05")
+        index = UsageIndex()
+        self.assertEqual(self.update(index, *self.dirs), 2)
+        self.assertEqual(list(index.failed), [path])
+        self.assertIn("Unsupported version", index.failed[path])
+
+    def test_bug_not_hidden(self):
+        index = UsageIndex()
+        with mock.patch("rscript.file.usage.scan_code",
+                        side_effect=RuntimeError("bug")):
+            with self.assertRaisesRegex(RuntimeError, "bug"):
+                self.update(index, *self.dirs)
+
+    def test_save_load(self):
+        index = UsageIndex()
+        self.update(index, *self.dirs)
+        path = os.path.join(self._tmp.name, "usage.idx")
+        index.save(path)
+        loaded = UsageIndex()
+        loaded.load(path)
+        self.assertEqual(loaded.find("CT"), index.find("CT"))
+        self.assertEqual(self.update(loaded, *self.dirs), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from rscript.file.utils import script_files
+from rscript.file.validate import validate, validate_files
+from scripts import make_script, binary
+
+
+def fields(problems):
+    return sorted((p.section, p.record, p.field) for p in problems)
+
+
+class ValidateTest(unittest.TestCase):
+
+    def test_valid(self):
+        self.assertEqual(validate(make_script()), [])
+
+    def test_broken_references(self):
+        script = make_script()
+        script.groups[0].state = len(script.states)
+        script.grouplinks[0].begin = -1
+        script.grouplinks[1].end = len(script.groups)
+        script.stars[0].starlinks[0].end_star = 99
+        script.places[0].star = "Nowhere"
+        script.items[0].place = "Nowhere"
+        self.assertEqual(fields(validate(script)), [
+            ("GroupLinks", "0", "Begin"),
+            ("GroupLinks", "1", "End"),
+            ("Groups", "Group0", "State"),
+            ("Items", "Item0", "Place"),
+            ("Places", "Place0", "Star"),
+            ("Stars", "Star0", "StarLinks.0.EndStar"),
+        ])
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            script = make_script()
+            script.places[0].star = "Nowhere"
+            for name, data in (("b.scr", binary(script)),
+                               ("a.SCR", binary(make_script())),
+                               ("c.scr", b"\x05"),
+                               ("notes.txt", b"")):
+                with open(os.path.join(tmp, name), 'wb') as f:
+                    f.write(data)
+            paths = script_files([tmp])
+            self.assertEqual([os.path.basename(p) for p in paths],
+                             ["a.SCR", "b.scr", "c.scr"])
+            result = validate_files(paths, jobs=1)
+            a, b, c = paths
+            self.assertEqual(result[a], [])
+            self.assertEqual(fields(result[b]), [("Places", "Place0", "Star")])
+            self.assertIn("can't load script", str(result[c][0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
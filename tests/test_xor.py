@@ -0,0 +1,94 @@
+import random
+import unittest
+from unittest import mock
+
+from rscript.file import utils
+from rscript.file.utils import bytes_xor, xor_key, xor_key_into, \
+    xor_stream_into
+
+# Around the chunk boundary and a few chunks past it
+SIZES = [0, 1, 7, utils._XOR_CHUNK - 1, utils._XOR_CHUNK,
+         utils._XOR_CHUNK + 1, 3 * utils._XOR_CHUNK + 13]
+
+# None of the lengths but 1 divides the chunk
+KEYS = [1, 3, 7, 1000, utils._XOR_CHUNK + 5]
+
+
+def old_xor(a, b):
+    return bytes(_a ^ _b for (_a, _b) in zip(a, b))
+
+
+def old_xor_key(data, key):
+    return old_xor(data, key * (len(data) // len(key) + 1))
+
+
+class XorTest(unittest.TestCase):
+    numpy = None
+
+    def setUp(self):
+        patch = mock.patch.object(utils, "_numpy", self.numpy)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.random = random.Random(len(SIZES))
+
+    def data(self, n):
+        return self.random.randbytes(n)
+
+    def test_bytes_xor(self):
+        for n, m in ((0, 5), (5, 0), (6, 4), (4, 6),
+                     (utils._XOR_CHUNK + 1, utils._XOR_CHUNK - 3)):
+            with self.subTest(n=n, m=m):
+                a, b = self.data(n), self.data(m)
+                self.assertEqual(bytes_xor(a, b), old_xor(a, b))
+
+    def test_xor_key(self):
+        for n in SIZES:
+            for k in KEYS:
+                with self.subTest(n=n, k=k):
+                    data, key = self.data(n), self.data(k)
+                    self.assertEqual(xor_key(data, key), old_xor_key(data, key))
+
+    def test_xor_key_into(self):
+        data, key = self.data(3 * utils._XOR_CHUNK + 13), self.data(7)
+        expected = old_xor_key(data, key)
+
+        buf = bytearray(data)
+        xor_key_into(buf, key)
+        self.assertEqual(buf, expected)
+
+        # Only the viewed part of the buffer changes
+        buf = bytearray(data)
+        xor_key_into(memoryview(buf)[5:-5], key)
+        self.assertEqual(buf, data[:5] + old_xor_key(data[5:-5], key)
+                         + data[-5:])
+
+        with self.assertRaises(ValueError):
+            xor_key_into(bytearray(data), b"")
+
+    def test_xor_stream_into(self):
+        n = 2 * utils._XOR_CHUNK + 100
+        data, stream = self.data(n), self.data(n + 50)
+        expected = old_xor(data, stream)
+        for sizes in ([n + 50], [1, 2, 3, n], [utils._XOR_CHUNK + 1] * 3):
+            with self.subTest(sizes=sizes[:2]):
+                chunks, pos = [], 0
+                for size in sizes:
+                    chunks.append(stream[pos:pos + size])
+                    pos += size
+                buf = bytearray(data)
+                xor_stream_into(memoryview(buf), iter(chunks))
+                self.assertEqual(buf, expected)
+
+        with self.assertRaises(ValueError):
+            xor_stream_into(bytearray(data), [stream[:n - 1]])
+
+
+class XorFallbackTest(XorTest):
+    """
+    Same checks with NumPy forced off
+    """
+    numpy = False
+
+
+if __name__ == '__main__':
+    unittest.main()
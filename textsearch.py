@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Search dialog and message text of compiled scripts"
+    )
+    parser.add_argument(metavar="QUERY", dest="queries", nargs="*",
+                        help='Words, prefixes ending with * and '
+                             '"quoted phrases"; all parts must match')
+    parser.add_argument("-s", "--scripts", action="append", default=[],
+                        dest="paths", metavar="PATH",
+                        help="Compiled script or directory with scripts, "
+                             "the index is rebuilt from them")
+    parser.add_argument("-i", "--index", default="text.idx",
+                        help="Index file")
+    parser.add_argument("-l", "--lang", default=None,
+                        help="Language file in BlockPar text format to "
+                             "resolve text keys with")
+    parser.add_argument("-e", "--encoding", default="cp1251",
+                        help="Encoding of the language file")
+    parser.add_argument("-j", "--jobs", default=None, type=int, dest="jobs",
+                        help="Number of worker processes")
+    args = parser.parse_args()
+
+    from rscript.file.utils import script_files
+
+    files = script_files(args.paths)
+
+    from rscript.file.textindex import TextIndex, load_lang
+
+    index = TextIndex()
+    if files:
+        lang = None
+        if args.lang:
+            with open(args.lang, 'rt', encoding=args.encoding,
+                      newline='') as f:
+                lang = load_lang(f)
+        index.build(files, lang=lang, jobs=args.jobs)
+        index.save(args.index)
+        print(f"{len(index.docs)} texts indexed", file=sys.stderr)
+        for path in index.failed:
+            print(f"{path}: can't load script", file=sys.stderr)
+    else:
+        index.load(args.index)
+
+    for query in args.queries:
+        for d in index.search(query):
+            text = d.text.replace('\r', ' ').replace('\n', ' ')
+            print(f"{d.script}: {d.section}.{d.record}.{d.field}: {text}")
+
+
+if __name__ == '__main__':
+    main()
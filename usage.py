@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Find usages of identifiers in code of compiled scripts"
+    )
+    parser.add_argument(metavar="NAME", dest="names", nargs="*",
+                        help="Identifiers to find")
+    parser.add_argument("-s", "--scripts", action="append", default=[],
+                        dest="paths", metavar="PATH",
+                        help="Compiled script or directory with scripts, "
+                             "the index is updated from them")
+    parser.add_argument("-i", "--index", default="usage.idx",
+                        help="Index file")
+    parser.add_argument("-k", "--kind", choices=["call", "write", "read"],
+                        default=None, help="Show only usages of this kind")
+    parser.add_argument("-j", "--jobs", default=None, type=int, dest="jobs",
+                        help="Number of worker processes")
+    args = parser.parse_args()
+
+    from rscript.file.utils import script_files
+
+    files = script_files(args.paths)
+
+    from rscript.file.usage import UsageIndex
+
+    index = UsageIndex()
+    index.load(args.index)
+    if files:
+        # scripts indexed from other places are kept
+        count = index.update(files, roots=args.paths, jobs=args.jobs)
+        index.save(args.index)
+        print(f"{count} of {len(files)} scripts indexed", file=sys.stderr)
+        for path, error in index.failed.items():
+            print(f"{path}: can't load script: {error}", file=sys.stderr)
+
+    for name in args.names:
+        for u in index.find(name, args.kind):
+            print(f"{u.script}: {u.section}.{u.record}:{u.line}:{u.column}: "
+                  f"{u.kind} {name}")
+
+
+if __name__ == '__main__':
+    main()
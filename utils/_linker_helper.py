@@ -2,6 +2,13 @@ from rscript.lang.ast import *
 
 
 class Stringifier(Visitor):
+    """
+    Regenerates source text of code units.
+
+    Handlers write text pieces to the current sink instead of returning
+    strings, so the text is produced in one traversal and is not copied
+    again at every nesting level.
+    """
 
     def __init__(self, lang):
         """
@@ -14,14 +21,40 @@ class Stringifier(Visitor):
             self.make_substitution = True
             self.lang = lang
         self.level = -1
+        self._write = None
+
+    def _run(self, write, fn, arg):
+        prev, self._write = self._write, write
+        try:
+            fn(arg)
+        finally:
+            self._write = prev
+
+    def _unit(self, unit):
+        self.dispatch[type(unit)](self, unit)
 
     def process(self, unit):
-        result = unit.accept(self)
-        return result
+        result = []
+        self._run(result.append, self._unit, unit)
+        return ''.join(result)
 
     def process_sequence(self, seq, *, level=-1):
-        self.level = level
         result = []
+        self.write_sequence(seq, result.append, level=level)
+        return ''.join(result)
+
+    def write_sequence(self, seq, sink, *, level=-1):
+        """
+        Writes text of the units to the sink
+
+        :param sink: file-like object or a callable taking str
+        """
+        self.level = level
+        self._run(getattr(sink, "write", sink), self._sequence, seq)
+
+    def _sequence(self, seq):
+        write = self._write
+        dispatch = self.dispatch
         i = 0
         while i < len(seq):
             unit = seq[i]
@@ -34,79 +67,81 @@ class Stringifier(Visitor):
                     self.level = c
                 c -= self.level
                 if c > 0:
-                    result += (unit.lexeme * c)
+                    write(unit.lexeme * c)
             else:
-                result.append(unit.accept(self))
+                dispatch[type(unit)](self, unit)
             i += 1
-        return ''.join(result)
 
     def visit_token(self, tok):
-        return tok.lexeme
+        self._write(tok.lexeme)
 
     def visit_literal_expr(self, expr):
-        return expr.children[expr.value].lexeme
+        self._write(expr.children[expr.value].lexeme)
 
     def visit_variable_expr(self, expr):
-        return expr.children[expr.name].lexeme
+        self._write(expr.children[expr.name].lexeme)
 
     def visit_access_expr(self, expr):
-        return self.process_sequence(expr.children, level=self.level)
+        self._sequence(expr.children)
 
     def visit_call_expr(self, expr):
         if self.make_substitution:
-            return Interpreter(self.lang).evaluate(expr)
-        return self.process_sequence(expr.children, level=self.level)
+            self._write(Interpreter(self.lang).evaluate(expr))
+        else:
+            self._sequence(expr.children)
 
     def visit_array_expr(self, expr):
-        return self.process_sequence(expr.children, level=self.level)
+        self._sequence(expr.children)
 
     def visit_group_expr(self, expr):
-        return self.process_sequence(expr.children, level=self.level)
+        self._sequence(expr.children)
 
     def visit_unary_expr(self, expr):
-        return self.process_sequence(expr.children, level=self.level)
+        self._sequence(expr.children)
 
     def visit_binary_expr(self, expr):
-        return self.process_sequence(expr.children, level=self.level)
+        self._sequence(expr.children)
 
     def visit_assign_expr(self, expr):
-        return self.process_sequence(expr.children, level=self.level)
+        self._sequence(expr.children)
 
     def visit_vardecl_expr(self, expr):
-        return self.process_sequence(expr.children, level=self.level)
+        self._sequence(expr.children)
 
     def visit_expression_stmt(self, stmt):
-        return self.process_sequence(stmt.children, level=self.level)
+        self._sequence(stmt.children)
 
     def visit_block_stmt(self, stmt):
-        return '{' + self.process_sequence(stmt.children, level=self.level) + '}'
+        self._write('{')
+        self._sequence(stmt.children)
+        self._write('}')
 
     def visit_vardecl_stmt(self, stmt):
-        return self.process_sequence(stmt.children, level=self.level)
+        self._sequence(stmt.children)
 
     def visit_function_stmt(self, stmt):
-        return self.process_sequence(stmt.children, level=self.level)
+        self._sequence(stmt.children)
 
     def visit_class_stmt(self, stmt):
-        return self.process_sequence(stmt.children, level=self.level)
+        self._sequence(stmt.children)
 
     def visit_if_stmt(self, stmt):
-        return self.process_sequence(stmt.children, level=self.level)
+        self._sequence(stmt.children)
 
     def visit_for_stmt(self, stmt):
-        return self.process_sequence(stmt.children, level=self.level)
+        self._sequence(stmt.children)
 
     def visit_while_stmt(self, stmt):
-        return self.process_sequence(stmt.children, level=self.level)
+        self._sequence(stmt.children)
 
     def visit_try_stmt(self, stmt):
-        return self.process_sequence(stmt.children, level=self.level)
+        self._sequence(stmt.children)
 
     def visit_throw_stmt(self, stmt):
-        return self.process_sequence(stmt.children, level=self.level)
+        self._sequence(stmt.children)
 
     def visit_keyword_stmt(self, stmt):
-        return self.process_sequence(stmt.children, level=self.level)
+        self._sequence(stmt.children)
 
 
 class Interpreter(Visitor):
@@ -120,7 +155,7 @@ class Interpreter(Visitor):
             self.lang = lang
 
     def evaluate(self, unit):
-        return unit.accept(self)
+        return self.dispatch[type(unit)](self, unit)
 
     def visit_token(self, tok):
         pass
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules the dump/build path must not pull in at import time
+_forbidden = ("json", "asyncio", "concurrent.futures", "numpy", "random")
+
+
+def measure(module, runs):
+    """
+    Runs `python -X importtime -c "import <module>"` several times
+
+    :type module: str
+    :type runs: int
+    :return: best cumulative import time in microseconds and the names of
+             all modules imported along with it
+    :rtype: tuple[int, set[str]]
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    cmd = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+
+    # warm-up run, so that bytecode cache is written and not measured
+    subprocess.run(cmd, env=env, capture_output=True, check=True)
+
+    best = None
+    imported = set()
+    for _ in range(runs):
+        result = subprocess.run(cmd, env=env, capture_output=True,
+                                text=True, check=True)
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            fields = line[len("import time:"):].split('|')
+            if len(fields) != 3 or not fields[1].strip().isdigit():
+                continue
+            name = fields[2].strip()
+            imported.add(name)
+            if fields[2] == ' ' + module:
+                cumulative = int(fields[1])
+                if best is None or cumulative < best:
+                    best = cumulative
+    if best is None:
+        best = 0
+    return best, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check import time of modules against a budget"
+    )
+    parser.add_argument(metavar="MODULE", dest="modules", nargs="*",
+                        default=["rscript.file.scr"],
+                        help="Modules to check")
+    parser.add_argument("-b", "--budget", type=float, default=40.0,
+                        help="Import time budget per module, ms")
+    parser.add_argument("-r", "--runs", type=int, default=5,
+                        help="Number of measurements, the best one is taken")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        cumulative, imported = measure(module, args.runs)
+        ms = cumulative / 1000
+        status = "ok" if ms <= args.budget else "over budget"
+        print(f"{module}: {ms:.1f} ms (budget {args.budget:.1f} ms) {status}")
+        if ms > args.budget:
+            failed = True
+        extra = sorted(m for m in imported
+                       if m in _forbidden or m.split('.')[0] in _forbidden)
+        if extra:
+            print(f"{module}: unexpected imports: {', '.join(extra)}")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
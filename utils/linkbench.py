@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.linker import link_all
+
+
+def make_code(index, statements):
+    """
+    Synthetic script code with DChange/DAdd/ChangeState idioms
+
+    :type index: int
+    :type statements: int
+    :rtype: str
+    """
+    lines = []
+    for i in range(statements):
+        lines.append(f"if (a{index} == {i})")
+        lines.append("{")
+        lines.append(f"    DChange('Msg{i}');")
+        lines.append(f"    DAdd('Answer{i}', {i});")
+        lines.append("    exit;")
+        lines.append("}")
+    lines.append(f"ChangeState('State{index}');")
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure throughput of linking many scripts in parallel"
+    )
+    parser.add_argument("-n", "--scripts", type=int, default=64,
+                        help="Number of scripts")
+    parser.add_argument("-s", "--statements", type=int, default=200,
+                        help="Number of statements in a script")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="Number of workers")
+    args = parser.parse_args()
+
+    tasks = [(None, None, make_code(i, args.statements))
+             for i in range(args.scripts)]
+
+    start = time.perf_counter()
+    link_all(tasks, jobs=1)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    contexts = link_all(tasks, jobs=args.jobs)
+    parallel = time.perf_counter() - start
+
+    if len(contexts) != len(tasks):
+        print("not all scripts were linked")
+        sys.exit(1)
+
+    print(f"{args.scripts} scripts: serial {serial:.3f} s, "
+          f"{args.jobs} processes {parallel:.3f} s, "
+          f"{args.scripts / parallel:.1f} scripts/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,74 @@
+from concurrent.futures import ProcessPoolExecutor
+
 from rscript.lang.ast import *
+from rscript.lang.lexer import Lexer
+from rscript.lang.parser import Parser
 from rscript.file.enums import op_
+from utils._linker_helper import Interpreter
 
 
-class Linker:
-    source = None
-    lang = None
-    interpreter = None
+def _call_of(*names):
+    def match(unit):
+        expr = unit.children[unit.expression]
+        if not isinstance(expr, CallExpr):
+            return False
+        name = expr.children[expr.name]
+        if isinstance(name, VariableExpr):
+            name = name.children[name.name]
+        return name.lexeme in names
+    return match
+
+
+def _keyword(*types):
+    def match(unit):
+        return unit.children[unit.keyword].type in types
+    return match
+
+
+# Units allowed after an IfStmt without else branch for it to be linked
+# as a DChange/DAdd/ChangeState/exit idiom. Units of other types never match
+_tail_patterns = (
+    (IfStmt, lambda unit: unit.else_branch == -1),
+    (ExpressionStmt, _call_of("DChange", "DAdd", "ChangeState")),
+    (KeywordStmt, _keyword(TokenType.EXIT)),
+    (Token, lambda unit: unit.type in (TokenType.SEMICOLON, TokenType.RBRACE)
+        or unit.type in insignificant),
+)
+
+
+def _matches(unit):
+    for cls, match in _tail_patterns:
+        if isinstance(unit, cls):
+            return match(unit)
+    return False
 
-    @classmethod
-    def init(cls, source, lang):
+
+class LinkContext:
+    """
+    State of one linking run. Every script is linked with its own context,
+    so several scripts can be linked at once in threads or processes.
+    """
+
+    def __init__(self, source, lang):
         """
         :type source: svr.SourceScript
         :type lang: blockpar.BlockPar
         """
-        cls.source = source
-        cls.lang = lang
+        self.source = source
+        self.lang = lang
+        self.interpreter = Interpreter(lang)
+        # (level, index) of every IfStmt linked as an idiom
+        self.linked = []
+
+
+class Linker:
 
-    def __init__(self, units, block, pool, *, type=op_.NORMAL, level=0):
+    def __init__(self, context, units, block, pool, *,
+                 type=op_.NORMAL, level=0):
+        """
+        :type context: LinkContext
+        """
+        self._context = context
         self._units = units
         self._block = block
         self._pool = pool
@@ -25,14 +77,18 @@ class Linker:
 
         self._start = 0
         self._current = 0
+        self._last_mismatch = -1
 
     def build(self):
+        self._last_mismatch = self._scan()
         while not self._at_end():
             unit = self._advance()
 
             if isinstance(unit, IfStmt):
                 if unit.else_branch == -1:
                     if self._probe():
+                        self._context.linked.append(
+                            (self._level, self._current - 1))
                         self._if_stmt()
 
     def _advance(self):
@@ -46,37 +102,72 @@ class Linker:
             if unit.type is TokenType.END:
                 return True
 
+    def _scan(self):
+        """
+        Matches every unit against the tail patterns in one forward pass
+
+        :return: index of the last unit that breaks the idiom, -1 if none
+        """
+        last = -1
+        i = 0
+        units = self._units
+        while True:
+            unit = units[i]
+            if isinstance(unit, Token) and unit.type is TokenType.END:
+                return last
+            if not _matches(unit):
+                last = i
+            i += 1
+
     def _probe(self):
-        start = self._current
-        while not self._at_end():
-            unit = self._units[self._current]
-            if isinstance(unit, IfStmt):
-                if unit.else_branch != -1:
-                    return False
-            elif isinstance(unit, ExpressionStmt):
-                expr = unit.children[unit.expression]
-                if isinstance(expr, CallExpr):
-                    name = expr.children[expr.name]
-                    if name.lexeme not in ("DChange", "DAdd", "ChangeState"):
-                        return False
-                else:
-                    return False
-            elif isinstance(unit, KeywordStmt):
-                keyword = unit.children[unit.keyword]
-                if keyword.type is not TokenType.EXIT:
-                    return False
-            elif isinstance(unit, Token):
-                if unit.type not in (TokenType.SEMICOLON, TokenType.RBRACE) \
-                        and unit.type not in insignificant:
-                    return False
-            else:
-                return False
-            self._current += 1
-        self._current = start
-        return True
+        """
+        Whether all units from the current one up to the end of the list
+        form the idiom
+        """
+        return self._current > self._last_mismatch
 
     def _push(self):
         pass
 
     def _if_stmt(self):
         pass
+
+
+def link(source, lang, code, block=None, pool=None):
+    """
+    Parses the code and links it in a fresh context
+
+    :type source: svr.SourceScript
+    :type lang: blockpar.BlockPar
+    :type code: str
+    :rtype: LinkContext
+    """
+    context = LinkContext(source, lang)
+    units = Parser(Lexer(code).iter_tokens()).parse()
+    Linker(context, units, block, pool).build()
+    return context
+
+
+def _link(task):
+    return link(*task)
+
+
+def link_all(tasks, *, jobs=None, executor=None):
+    """
+    Links many scripts in worker processes. Linking is pure Python, so
+    threads would only take turns holding the GIL
+
+    :param tasks: (source, lang, code) for every script; sources and langs
+                  must be picklable
+    :param jobs: number of worker processes when no executor is given,
+                 1 links the scripts in the current process
+    :param executor: concurrent.futures executor to use instead
+    :return: contexts in the order of tasks
+    :rtype: list[LinkContext]
+    """
+    if executor is not None:
+        return list(executor.map(_link, tasks))
+    if jobs == 1 or len(tasks) <= 1:
+        return list(map(_link, tasks))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_link, tasks, chunksize=4))
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+import argparse
+import gc
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rscript.file.enums import *
+from rscript.file.scr import (CompiledScript, CompiledPoint, Star, StarLink,
+                              Planet, Ship, Group, GroupLink, _MinMaxSlot,
+                              _StatusSlot)
+from rscript.file.utils import MinMax, Status
+
+
+def make_star(script, i):
+    e = Star(script, f"Star{i}")
+    link = StarLink(script, "0")
+    link.end_star = i
+    link.distance = MinMax(10, 20)
+    e.starlinks.append(link)
+    planet = Planet(script, f"Planet{i}")
+    planet.range = MinMax(0, 100)
+    e.planets.append(planet)
+    ship = Ship(script, "0")
+    ship.strength = MinMax(1.5, 2.5)
+    e.ships.append(ship)
+    return e
+
+
+def make_group(script, i):
+    e = Group(script, f"Group{i}")
+    e.count = MinMax(1, i + 1)
+    e.strength = MinMax(float(i), float(i) * 2)
+    e.status = Status(MinMax(0, i), MinMax(1, 2), MinMax(3, 4))
+    return e
+
+
+def make_grouplink(script, i):
+    e = GroupLink(script, str(i))
+    e.begin = i
+    e.end = i + 1
+    e.relations = (rel_.WAR, rel_.WAR)
+    e.war_weight = MinMax(0.0, float(i))
+    return e
+
+
+# section -> record factory
+_sections = {
+    "stars": make_star,
+    "groups": make_group,
+    "grouplinks": make_grouplink,
+}
+
+
+class DictRecord:
+    """
+    Baseline record: attributes in __dict__ and MinMax/Status as separate
+    objects, as records were laid out before __slots__
+    """
+
+    def __init__(self, record):
+        for cls in reversed(type(record).__mro__):
+            for name in cls.__dict__.get("__slots__", ()):
+                if not name.endswith(("_min", "_max")):
+                    setattr(self, name, _plain(getattr(record, name)))
+            for name, attr in vars(cls).items():
+                if isinstance(attr, (_MinMaxSlot, _StatusSlot)):
+                    setattr(self, name, _plain(getattr(record, name)))
+
+
+# record class -> its DictRecord subclass. Every record type needs its own
+# class, so instances share dict keys as the old records did
+_dict_classes = {}
+
+
+def as_dict_record(record):
+    cls = type(record)
+    if cls not in _dict_classes:
+        _dict_classes[cls] = type(cls.__name__, (DictRecord,), {})
+    return _dict_classes[cls](record)
+
+
+def _plain(value):
+    if isinstance(value, Status):
+        return Status(*(MinMax(v.min, v.max)
+                        for v in (value.trader, value.warrior, value.pirate)))
+    if isinstance(value, MinMax):
+        return MinMax(value.min, value.max)
+    if isinstance(value, list) and value and \
+            isinstance(value[0], CompiledPoint):
+        return [as_dict_record(e) for e in value]
+    return value
+
+
+def measure(version, section, count, baseline=False):
+    """
+    Loads a script with `count` records in one section
+
+    :param baseline: replace the loaded records with DictRecord copies
+                     before taking the size
+    :return: traced bytes per loaded record
+    :rtype: float
+    """
+    script = CompiledScript()
+    script.version = version
+    make = _sections[section]
+    getattr(script, section).extend(make(script, i) for i in range(count))
+    buf = io.BytesIO()
+    script.save(buf)
+    data = buf.getvalue()
+    del script, buf
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    loaded = CompiledScript()
+    loaded.load(io.BytesIO(data))
+    if baseline:
+        records = getattr(loaded, section)
+        records[:] = [as_dict_record(e) for e in records]
+        del records
+        gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del loaded
+    return size / count
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure memory taken by loaded compiled script records"
+    )
+    parser.add_argument("-n", "--records", type=int, default=2000,
+                        help="Number of records of every type")
+    parser.add_argument("-v", "--version", type=int, default=7,
+                        choices=CompiledScript.supported,
+                        help="Script version")
+    args = parser.parse_args()
+
+    for section in _sections:
+        size = measure(args.version, section, args.records)
+        baseline = measure(args.version, section, args.records, baseline=True)
+        print(f"{section}: {args.records} records, {size:.0f} bytes/record, "
+              f"{baseline:.0f} with __dict__ records "
+              f"({1 - size / baseline:.0%} less)")
+
+
+if __name__ == '__main__':
+    main()
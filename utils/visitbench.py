@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rscript.lang.ast import Transformer
+from rscript.lang.lexer import Lexer
+from rscript.lang.parser import Parser
+
+
+def make_code(statements):
+    lines = []
+    for i in range(statements):
+        lines.append(f"if (a{i} == {i} + b * (c - {i}))")
+        lines.append("{")
+        lines.append(f"    DChange('Msg{i}');")
+        lines.append(f"    x = f(y{i}, -z.w, 2);")
+        lines.append("}")
+    return '\n'.join(lines) + '\n'
+
+
+def flatten(units):
+    """
+    All nodes of the trees, so that only dispatch is measured
+    """
+    nodes = []
+    stack = list(units)
+    while stack:
+        unit = stack.pop()
+        nodes.append(unit)
+        stack.extend(getattr(unit, "children", ()))
+    return nodes
+
+
+def by_accept(visitor, nodes):
+    for unit in nodes:
+        unit.accept(visitor)
+
+
+def by_visit(visitor, nodes):
+    for unit in nodes:
+        visitor.visit(unit)
+
+
+def by_table(visitor, nodes):
+    dispatch = visitor.dispatch
+    for unit in nodes:
+        dispatch[type(unit)](visitor, unit)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare accept() and table dispatch of AST visitors"
+    )
+    parser.add_argument("-s", "--statements", type=int, default=5000,
+                        help="Number of statements in the tree")
+    parser.add_argument("-r", "--runs", type=int, default=5,
+                        help="Number of measurements, the best one is taken")
+    args = parser.parse_args()
+
+    units = Parser(Lexer(make_code(args.statements)).iter_tokens()).parse()
+    nodes = flatten(units)
+    visitor = Transformer()
+    walks = (by_accept, by_visit, by_table)
+    best = dict.fromkeys(walks, float('inf'))
+    # runs of different walks are interleaved to spread out machine noise
+    for _ in range(args.runs):
+        for walk in walks:
+            start = time.perf_counter()
+            walk(visitor, nodes)
+            best[walk] = min(best[walk], time.perf_counter() - start)
+    for walk in walks:
+        print(f"{walk.__name__}: {len(nodes)} nodes, "
+              f"{best[walk] * 1e9 / len(nodes):.0f} ns/node")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check cross-references of compiled scripts"
+    )
+    parser.add_argument(metavar="PATH", dest="paths", nargs="+",
+                        help="Compiled script or directory with scripts")
+    parser.add_argument("-j", "--jobs", default=None, type=int, dest="jobs",
+                        help="Number of worker processes")
+    args = parser.parse_args()
+
+    from rscript.file.utils import script_files
+
+    files = script_files(args.paths)
+
+    from rscript.file.validate import validate_files
+
+    failed = False
+    for path, problems in validate_files(files, jobs=args.jobs).items():
+        for problem in problems:
+            print(f"{path}: {problem}")
+        if problems:
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()